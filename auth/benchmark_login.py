@@ -0,0 +1,65 @@
+"""A script to time the OAuth code exchange of the Google login offline.
+
+Run it with ``python manage.py runscript auth.benchmark_login``. It starts
+a stub login endpoint on localhost and sends the same POST requests the
+login callback sends, once with a new connection per request like
+``requests.post`` and once with the pooled outbound client, one at a time
+and from several threads.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.urls import reverse
+from auth.http_client import OutboundClient
+from auth.stub_server import StubServer, json_route
+
+LOGINS = 500
+THREADS = 8
+
+
+def time_logins(post, url: str, threads: int) -> float:
+    """Send LOGINS code exchanges.
+
+    :param post: a function that sends one exchange to a URL.
+    :param url: the login endpoint.
+    :param threads: the number of threads sending exchanges.
+    :return: the number of exchanges per second.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for response in executor.map(lambda _: post(url), range(LOGINS)):
+            response.raise_for_status()
+    return LOGINS / (time.perf_counter() - start)
+
+
+def run() -> None:
+    """Run the benchmark."""
+    path = reverse("google_login")
+    server = StubServer({("POST", path): json_route({"key": "token"})})
+    url = f"{server.url.rstrip('/')}{path}?process=login"
+    client = OutboundClient(pool_size=THREADS)
+    clients = {
+        "new connection per login": lambda url: requests.post(
+            url, data={"code": "code"}, timeout=10
+        ),
+        "pooled client": lambda url: client.post(
+            "token_exchange", url, data={"code": "code"}
+        ),
+    }
+    try:
+        for threads in (1, THREADS):
+            for name, post in clients.items():
+                server.connections.clear()
+                rate = time_logins(post, url, threads)
+                print(
+                    f"{name}, {threads} thread(s): {rate:.0f} logins/s, "
+                    f"{len(server.connections)} connections"
+                )
+        stats = client.stats()["token_exchange"]
+        print(
+            f"pooled client latency: {stats['mean_seconds'] * 1000:.2f}ms mean, "
+            f"{stats['max_seconds'] * 1000:.2f}ms max, {stats['errors']} errors"
+        )
+    finally:
+        server.stop()
@@ -0,0 +1,121 @@
+"""Module for making outbound HTTP requests from the auth app.
+
+All requests share one requests.Session, so connections to the same host
+are kept open and reused instead of paying a new TCP and TLS handshake for
+every login. Every request has a connect and a read timeout, so a slow
+upstream cannot hold a worker forever, and failed connections are retried
+with a backoff.
+
+Only connection errors are retried. A request that reached the server is
+not sent again, since an OAuth code can only be exchanged once.
+
+The number of calls, errors and their latency are counted per call name in
+the memory of the current process.
+"""
+
+from threading import Lock
+import time
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class OutboundClient:
+    """A pooled HTTP client with timeouts, retries and latency counters."""
+
+    def __init__(
+        self,
+        timeout: tuple[float, float] | None = None,
+        retries: int | None = None,
+        backoff: float | None = None,
+        pool_size: int | None = None,
+    ):
+        """Create a client, the settings are used for the values that are not given.
+
+        :param timeout: the connect and read timeouts in seconds.
+        :param retries: the number of times a failed connection is retried.
+        :param backoff: the backoff factor between retries in seconds.
+        :param pool_size: the number of connections kept open per host.
+        """
+        self.timeout = timeout or (
+            settings.OUTBOUND_CONNECT_TIMEOUT,
+            settings.OUTBOUND_READ_TIMEOUT,
+        )
+        retry = Retry(
+            total=settings.OUTBOUND_RETRIES if retries is None else retries,
+            connect=settings.OUTBOUND_RETRIES if retries is None else retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=settings.OUTBOUND_BACKOFF if backoff is None else backoff,
+        )
+        pool_size = pool_size or settings.OUTBOUND_POOL_SIZE
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats = {}
+        self._lock = Lock()
+
+    def request(self, name: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request and record its latency.
+
+        :param name: the name the call is counted under, e.g. "token_exchange".
+        :param method: the HTTP method.
+        :param url: the URL.
+        :param kwargs: other arguments of requests.Session.request.
+        :return: the response.
+        :raises requests.RequestException: if the request failed or timed out.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = False
+            return response
+        finally:
+            self._record(name, time.perf_counter() - start, failed)
+
+    def post(self, name: str, url: str, **kwargs) -> requests.Response:
+        """Send a POST request and record its latency.
+
+        :param name: the name the call is counted under.
+        :param url: the URL.
+        :param kwargs: other arguments of requests.Session.request.
+        :return: the response.
+        """
+        return self.request(name, "POST", url, **kwargs)
+
+    def _record(self, name: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                name,
+                {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+            )
+            stats["calls"] += 1
+            stats["errors"] += failed
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def stats(self) -> dict[str, dict]:
+        """Return the calls, errors and latency of each call name of this process."""
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "mean_seconds": stats["total_seconds"] / stats["calls"],
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def reset_stats(self) -> None:
+        """Forget the counters."""
+        with self._lock:
+            self._stats = {}
+
+
+outbound = OutboundClient()
@@ -0,0 +1,100 @@
+"""A local HTTP server that stands in for Google and the OAuth endpoints.
+
+Used by the Google login tests and by auth.benchmark_login.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import urlsplit
+
+# a route gets the path, the query string and the body of a request and
+# returns the status code and the JSON body of the response
+Route = Callable[[str, str, bytes], tuple[int, dict]]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer requests with the routes of the server, keeping connections open."""
+
+    protocol_version = "HTTP/1.1"
+    # send the headers and the body without waiting for an ACK, like real servers
+    disable_nagle_algorithm = True
+
+    def handle_request(self):
+        """Answer a request with its route, or 404 if it has none."""
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, url.path))
+            server.connections.add(self.client_address)
+        if server.delay:
+            time.sleep(server.delay)
+        route = server.routes.get((self.command, url.path))
+        status, data = route(url.path, url.query, body) if route else (404, {})
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = handle_request  # noqa: N815
+    do_POST = handle_request  # noqa: N815
+
+    def log_message(self, format, *args):
+        """Do not log requests."""
+
+
+class StubServer(ThreadingHTTPServer):
+    """A local HTTP server running in a thread.
+
+    It records the method and path of every request and the client address
+    of every connection, so tests can check that connections were reused.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, routes: dict[tuple[str, str], Route], delay: float = 0):
+        """Start the server on a free port.
+
+        :param routes: the route of each method and path.
+        :param delay: seconds to wait before answering each request.
+        """
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.routes = routes
+        self.delay = delay
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def handle_error(self, request, client_address):
+        """Ignore clients that closed the connection, e.g. after a timeout."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self.server_address
+        return f"http://{host}:{port}/"
+
+    def stop(self) -> None:
+        """Stop the server and close its socket."""
+        self.shutdown()
+        self.server_close()
+
+
+def json_route(data: dict, status: int = 200) -> Route:
+    """Make a route that always answers with the same JSON body.
+
+    :param data: the body.
+    :param status: the status code.
+    :return: the route.
+    """
+    return lambda path, query, body: (status, data)
@@ -15,9 +15,20 @@ from django.urls import reverse
 from django.contrib import messages
 from rest_framework.views import APIView
 import jwt
-from time import sleep, time
+from jwt import PyJWKClient
 from django.conf import settings
-from decouple import config
+from .http_client import outbound
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+
+# Google's public keys, fetched once and kept for GOOGLE_JWKS_LIFESPAN
+# seconds, or fetched again when a token is signed with a new key
+google_jwks = PyJWKClient(
+    settings.GOOGLE_JWKS_URL,
+    lifespan=settings.GOOGLE_JWKS_LIFESPAN,
+    timeout=settings.GOOGLE_JWKS_TIMEOUT,
+)
 
 
 class GoogleOAuth2IatValidationAdapter(GoogleOAuth2Adapter):
@@ -27,33 +38,45 @@ class GoogleOAuth2IatValidationAdapter(GoogleOAuth2Adapter):
         """
         Override the complete_login method and make the iat check more lenient.
 
-        This method stalls the server time until the token is ready to be
-        validated. Then calls the allauth complete_login to validate the token.
+        The id_token is checked here instead of by allauth, see
+        verify_id_token, and the login is made from its claims. Without an
+        id_token the allauth complete_login fetches the user info.
+        """
+        id_token = response.get("id_token")
+        if not id_token:
+            return super().complete_login(request, app, token, response, **kwargs)
+        data = self.verify_id_token(app, id_token)
+        return self.get_provider().sociallogin_from_response(request, data)
+
+    def verify_id_token(self, app, id_token: str) -> dict:
+        """Verify the id_token and return its claims.
+
+        The clock of Google and of the server may differ a bit, so the iat
+        may be in the future. Instead of waiting until it is not, the
+        timestamps are checked with a leeway of ABSOLUTE_TOLERATED_TIME_DIFF
+        seconds. The signature is checked with Google's cached public keys,
+        so a login does not wait for a request to Google.
+
+        :param app: the Google SocialApp.
+        :param id_token: the id_token from Google.
+        :return: the claims of the token.
+        :raises OAuth2Error: if the token is not valid.
         """
         try:
-            delta_time = (
-                jwt.decode(
-                    response.get("id_token"),
-                    options={"verify_signature": False},
-                    algorithms=["RS256"],
-                )["iat"]
-                - time()
+            signing_key = google_jwks.get_signing_key_from_jwt(id_token)
+            return jwt.decode(
+                id_token,
+                key=signing_key.key,
+                algorithms=["RS256"],
+                audience=app.client_id,
+                issuer=GOOGLE_ISSUERS,
+                leeway=settings.ABSOLUTE_TOLERATED_TIME_DIFF,
+                options={"require": ["iat", "exp"]},
             )
+        except jwt.PyJWKClientError as e:
+            raise OAuth2Error("Failed to get the signing key of id_token") from e
         except jwt.PyJWTError as e:
-            raise OAuth2Error("Invalid id_token during 'iat' validation") from e
-        except KeyError as e:
-            raise OAuth2Error("Failed to get 'iat' from id_token") from e
-
-        # check if the iat is in the future and if it is within acceptable
-        # difference, not the most elegant solution to this since
-        # using a JS library to handle authentication would be better but,
-        # it's the best I can do since we have no front end.
-        if 0 < delta_time <= settings.ABSOLUTE_TOLERATED_TIME_DIFF:
-            sleep(delta_time)
-        else:
-            print(delta_time)
-
-        return super().complete_login(request, app, token, response, **kwargs)
+            raise OAuth2Error("Invalid id_token") from e
 
 
 @method_decorator(login_not_required, name="dispatch")
@@ -73,19 +96,19 @@ class GoogleLoginCallback(APIView):
             messages.error(request, "Google sign in failed: Please login again.")
             return redirect(reverse("manager:main_login"))
 
-        token_endpoint_url = urljoin(
-            config("BASE_URL", default="http://localhost:8000/"),
-            reverse("google_login"),
-        )
+        token_endpoint_url = urljoin(settings.BASE_URL, reverse("google_login"))
 
         params = {
             "process": "login",
         }
 
-        response = requests.post(
-            url=token_endpoint_url, data={"code": code}, params=params
-        )
         try:
+            response = outbound.post(
+                "token_exchange",
+                token_endpoint_url,
+                data={"code": code},
+                params=params,
+            )
             key = response.json()["key"]
             user_id = Token.objects.get(key=key).user_id
             user = User.objects.get(pk=user_id)
@@ -95,7 +118,7 @@ class GoogleLoginCallback(APIView):
                 backend="allauth.account.auth_backends.AuthenticationBackend",
             )
             return redirect(reverse("manager:user_setup"))
-        except (ValueError, IndexError) as e:
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
             print(e)
             messages.error(request, "Authentication Error: Please login again.")
             return redirect(reverse("manager:main_login"))
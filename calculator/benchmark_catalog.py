@@ -0,0 +1,52 @@
+"""A script to time building the catalog tree from the full TCAS data.
+
+Run it with ``python manage.py runscript calculator.benchmark_catalog``
+on a migrated database. Every university and faculty of the TCAS file is
+loaded inside a transaction that is rolled back at the end, so the
+database is left as it was.
+"""
+
+import time
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from calculator.catalog import CatalogDocument, build_catalog
+from calculator.import_data import load_all
+from calculator.models import Faculty, Major, University
+
+
+def time_catalog(**subtree) -> tuple[int, float, CatalogDocument]:
+    """Build and serialize a catalog tree.
+
+    :param subtree: the university, faculty or major id of the subtree.
+    :return: the number of queries, the time taken in seconds and the document.
+    """
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        document = CatalogDocument.from_tree(build_catalog(**subtree))
+    return len(queries), time.perf_counter() - start, document
+
+
+def report(label: str, **subtree) -> None:
+    """Print the queries, time and size of a catalog tree."""
+    queries, seconds, document = time_catalog(**subtree)
+    print(
+        f"{label}: {queries} queries in {seconds * 1000:.1f}ms, "
+        f"{len(document.content):,} bytes, {len(document.gzipped):,} gzipped"
+    )
+
+
+def run() -> None:
+    """Run the benchmark."""
+    with transaction.atomic():
+        load_all(universities=None, faculties=None, force=True)
+        print(
+            f"{University.objects.count()} universities, "
+            f"{Faculty.objects.count()} faculties, "
+            f"{Major.objects.count()} majors"
+        )
+        report("whole tree")
+        university = University.objects.order_by("id").first()
+        report("one university", university=university.id)
+        major = Major.objects.order_by("id").first()
+        report("one major", major=major.id)
+        transaction.set_rollback(True)
@@ -0,0 +1,58 @@
+"""A script to time parsing the TCAS csv file.
+
+Run it with ``python manage.py runscript calculator.benchmark_import``.
+It parses the full TCAS file and a synthetic file of 100,000 rows,
+half of which are duplicates.
+"""
+
+import csv
+import os
+import tempfile
+import time
+from calculator.import_data import MAJOR_FILE, PATH, get_non_duplicate_major_sample
+
+
+def write_synthetic_csv(path: str, rows: int, unique: int) -> None:
+    """Write a TCAS csv file with the given number of rows.
+
+    The rows are copies of the real file with new major codes, so the
+    file has exactly ``unique`` different rows.
+
+    :param path: where to write the file.
+    :param rows: the number of rows in the file.
+    :param unique: the number of different rows in the file.
+    """
+    with open(os.path.join(PATH, MAJOR_FILE), encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        sample = list(reader)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames)
+        writer.writeheader()
+        for i in range(rows):
+            n = i % unique
+            row = dict(sample[n % len(sample)])
+            row["รหัสหลักสูตร"] = f"SYN{n:08d}"
+            writer.writerow(row)
+
+
+def time_parse(path: str | None = None) -> tuple[int, float]:
+    """Parse a TCAS file with every university and faculty.
+
+    :param path: the csv file, defaults to the real TCAS file.
+    :return: the number of unique rows and the time taken in seconds.
+    """
+    start = time.perf_counter()
+    rows = get_non_duplicate_major_sample(path, universities=None, faculties=None)
+    return len(rows), time.perf_counter() - start
+
+
+def run() -> None:
+    """Run the benchmark."""
+    unique, seconds = time_parse()
+    print(f"{MAJOR_FILE}: {unique} unique rows in {seconds:.3f}s")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.csv")
+        write_synthetic_csv(path, 100_000, 50_000)
+        unique, seconds = time_parse(path)
+        print(f"synthetic 100,000 rows: {unique} unique rows in {seconds:.3f}s")
@@ -0,0 +1,84 @@
+"""A script to time the major search index with the full TCAS data.
+
+Run it with ``python manage.py runscript calculator.benchmark_search`` on
+a migrated database. Every major of the TCAS file is loaded inside a
+transaction that is rolled back at the end, so the database is left as it
+was. For a sample of majors it searches a part of the name, the same part
+with one letter left out and the major code, and prints the mean time of a
+search and how often the major, or one with the same name at another
+campus, had the best score. A short part of a name often matches many
+majors equally well.
+"""
+
+import random
+import time
+from django.db import transaction
+from calculator.import_data import load_all
+from calculator.models import Major
+from calculator.search import MAX_LIMIT, MajorSearchIndex, normalize, trigrams
+from calculator.reference_cache import reference_cache
+
+SAMPLE = 200
+
+
+def queries(
+    index: MajorSearchIndex, name: str, code: str, rng: random.Random
+) -> dict[str, str]:
+    """Make the queries to find one major.
+
+    The part of the name is taken from its most specific word, the one with
+    the most trigrams that are not common to many majors, like a student
+    would search for "วิศวกรรมพลังงาน" rather than "วิทยาเขตหลัก".
+
+    :param index: the search index.
+    :param name: the name of the major.
+    :param code: the code of the major.
+    :param rng: the random number generator.
+    :return: the queries by kind.
+    """
+    words = normalize(name).split()
+    word = max(words, key=lambda word: len(trigrams(word) - index.common))
+    result = {"prefix of code": code[:10]}
+    if len(word) >= 5:
+        start = rng.randrange(max(1, len(word) - 8))
+        part = word[start : start + 8]
+        typo = rng.randrange(1, len(part) - 1)
+        result["part of name"] = part
+        result["one letter missing"] = part[:typo] + part[typo + 1 :]
+    return result
+
+
+def run() -> None:
+    """Run the benchmark."""
+    with transaction.atomic():
+        load_all(universities=None, faculties=None, force=True)
+        start = time.perf_counter()
+        index = MajorSearchIndex(reference_cache.stamp())
+        print(
+            f"indexed {len(index.majors)} majors in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        rng = random.Random(67)
+        majors = list(Major.objects.values_list("name", "code"))
+        times = {}
+        found = {}
+        for name, code in rng.sample(majors, min(SAMPLE, len(majors))):
+            for kind, query in queries(index, name, code, rng).items():
+                start = time.perf_counter()
+                results = index.search(query, 10)
+                times.setdefault(kind, []).append(time.perf_counter() - start)
+                results = index.search(query, MAX_LIMIT)
+                found.setdefault(kind, []).append(
+                    any(
+                        result["name"] == name
+                        and result["score"] == results[0]["score"]
+                        for result in results
+                    )
+                )
+        for kind, seconds in times.items():
+            print(
+                f"{kind}: {sum(seconds) / len(seconds) * 1_000_000:.0f}us mean, "
+                f"{max(seconds) * 1_000_000:.0f}us max, "
+                f"best score: {sum(found[kind]) / len(found[kind]):.0%}"
+            )
+        transaction.set_rollback(True)
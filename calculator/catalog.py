@@ -0,0 +1,151 @@
+"""Module for building the University, Faculty, Major and CriteriaSet tree.
+
+The whole tree, or the subtree of one university, faculty or major, is
+built with five queries however big it is, and serialized once to compact
+JSON. The document is kept both plain and gzipped, so sending it again only
+costs copying the bytes.
+"""
+
+import json
+from dataclasses import dataclass
+from django.utils.text import compress_string
+from calculator.models import University, Faculty, Major, CriteriaSet
+
+LEVELS = ("university", "faculty", "major")
+
+
+@dataclass(frozen=True)
+class CatalogDocument:
+    """A serialized catalog tree."""
+
+    content: bytes
+    gzipped: bytes
+
+    @classmethod
+    def from_tree(cls, tree: list[dict]) -> "CatalogDocument":
+        """Serialize a catalog tree.
+
+        :param tree: the tree returned by build_catalog.
+        :return: the document.
+        """
+        content = json.dumps(tree, ensure_ascii=False, separators=(",", ":")).encode()
+        return cls(content, compress_string(content))
+
+
+def _filters(
+    university: int | None, faculty: int | None, major: int | None
+) -> list[dict]:
+    """Get the filters of each level of the tree to keep only a subtree.
+
+    :param university: the id of the university of the subtree.
+    :param faculty: the id of the faculty of the subtree.
+    :param major: the id of the major of the subtree.
+    :return: the filters of the universities, faculties, majors and CriteriaSets.
+    """
+    filters = [{}, {}, {}, {}]
+    paths = {
+        # the lookup from each level to the given level
+        "university": ["id", "university_id", "faculty__university_id"],
+        "faculty": ["faculty__id", "id", "faculty_id"],
+        "major": ["faculty__major__id", "major__id", "id"],
+    }
+    for level, value in zip(LEVELS, (university, faculty, major)):
+        if value is None:
+            continue
+        for level_filters, lookup in zip(filters, paths[level]):
+            level_filters[lookup] = value
+        # a CriteriaSet is always one level below a major
+        filters[3][f"major__{paths[level][2]}"] = value
+    return filters
+
+
+def _attach(rows, parents: dict, parent_field: str, field: str, children: str) -> dict:
+    """Add each row to the children of its parent node.
+
+    :param rows: the rows of one level with the id of their parent.
+    :param parents: the nodes of the level above by id.
+    :param parent_field: the field of the rows with the id of the parent.
+    :param field: the list of children of the parent node.
+    :param children: the name of the list of children of the new nodes.
+    :return: the new nodes by id.
+    """
+    nodes = {}
+    for row in rows:
+        parent = parents.get(row.pop(parent_field))
+        if parent is not None:
+            nodes[row["id"]] = {**row, children: []}
+            parent[field].append(nodes[row["id"]])
+    return nodes
+
+
+def build_catalog(
+    university: int | None = None,
+    faculty: int | None = None,
+    major: int | None = None,
+) -> list[dict]:
+    """Build the University, Faculty, Major and CriteriaSet tree.
+
+    Every CriteriaSet includes its criteria, so picking one needs no request.
+
+    :param university: the id of the only university to include.
+    :param faculty: the id of the only faculty to include.
+    :param major: the id of the only major to include.
+    :return: the universities with their faculties, majors and CriteriaSets.
+    """
+    uni_filter, fac_filter, major_filter, cs_filter = _filters(
+        university, faculty, major
+    )
+    universities = {
+        row["id"]: {**row, "faculties": []}
+        for row in University.objects.filter(**uni_filter)
+        .order_by("id")
+        .values("id", "name")
+    }
+    faculties = _attach(
+        Faculty.objects.filter(**fac_filter)
+        .order_by("id")
+        .values("id", "name", "university_id"),
+        universities,
+        "university_id",
+        "faculties",
+        "majors",
+    )
+    majors = _attach(
+        Major.objects.filter(**major_filter)
+        .order_by("id")
+        .values("id", "code", "name", "faculty_id"),
+        faculties,
+        "faculty_id",
+        "majors",
+        "criteria_sets",
+    )
+    criteria_sets = _attach(
+        CriteriaSet.objects.filter(**cs_filter)
+        .order_by("id")
+        .values("id", "name", "major_id"),
+        majors,
+        "major_id",
+        "criteria_sets",
+        "criteria",
+    )
+    through_filter = {f"criteriaset__{key}": value for key, value in cs_filter.items()}
+    for row in (
+        CriteriaSet.criteria.through.objects.filter(**through_filter)
+        .order_by("criterion_id")
+        .values(
+            "criteriaset_id",
+            "criterion__exam_id",
+            "criterion__weight",
+            "criterion__min_score",
+        )
+    ):
+        criteria_set = criteria_sets.get(row["criteriaset_id"])
+        if criteria_set is not None:
+            criteria_set["criteria"].append(
+                {
+                    "exam": row["criterion__exam_id"],
+                    "weight": row["criterion__weight"],
+                    "min_score": row["criterion__min_score"],
+                }
+            )
+    return list(universities.values())
@@ -1,20 +1,41 @@
 """A script to import admission data from MyTCAS' csv file."""
 
+import ast
 import csv
+import hashlib
+import io
+import json
 import os
 import re
+import time
+from collections import defaultdict
+from collections.abc import Callable, Collection, Iterable, Iterator
+from dataclasses import dataclass
 from enum import Enum
-from functools import reduce
+from functools import wraps
+from itertools import zip_longest
+from django.db import transaction
 from calculator.models import (
     University,
     Faculty,
     Major,
     Exams,
     CriteriaSet,
+    Criterion,
     ScoreHistory,
+    IngestionManifest,
+    DataVersion,
 )
 
 PATH = os.path.join(os.getcwd(), os.path.join("calculator", "data"))
+MAJOR_FILE = "TCAS67_maxmin.csv"
+DEFAULT_YEAR = 2567
+DEMO_UNIVERSITIES = (
+    "จุฬาลงกรณ์มหาวิทยาลัย",
+    "มหาวิทยาลัยเกษตรศาสตร์",
+    "สถาบันเทคโนโลยีพระจอมเกล้าเจ้าคุณทหารลาดกระบัง",
+)
+DEMO_FACULTIES = ("คณะวิศวกรรมศาสตร์", "คณะอักษรศาสตร์", "คณะบริหารธุรกิจ")
 
 
 class MajorClassification(Enum):
@@ -47,25 +68,380 @@ class MajorClassification(Enum):
             return "อื่นๆ"
 
 
-def load_uni_faculty_major() -> None:
-    """Create University, Faculty and Major objects."""
-    data = get_non_duplicate_major_sample()
+@dataclass
+class LoadStats:
+    """The number of rows a loader created and updated in one table."""
+
+    table: str
+    created: int = 0
+    updated: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        """Return a one-line report of the load."""
+        return (
+            f"{self.table}: {self.created} created, {self.updated} updated "
+            f"in {self.seconds:.2f}s"
+        )
+
+
+def timed_load(table: str) -> Callable[..., Callable[..., LoadStats]]:
+    """Time a loader and wrap its (created, updated) counts in LoadStats.
+
+    :param table: the name of the table the loader fills.
+    :return: a decorator for the loader.
+    """
+
+    def decorator(loader: Callable[..., tuple[int, int]]) -> Callable[..., LoadStats]:
+        @wraps(loader)
+        def wrapper(*args, **kwargs) -> LoadStats:
+            start = time.perf_counter()
+            created, updated = loader(*args, **kwargs)
+            return LoadStats(table, created, updated, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+@timed_load("University")
+def load_universities(data: list[dict]) -> tuple[int, int]:
+    """Create the University objects that do not exist yet.
+
+    :param data: rows from get_non_duplicate_major_sample.
+    :return: the number of created and updated rows.
+    """
+    names = {row["university"] for row in data}
+    existing = set(
+        University.objects.filter(name__in=names).values_list("name", flat=True)
+    )
+    new = [University(name=name) for name in sorted(names - existing)]
+    University.objects.bulk_create(new)
+    return len(new), 0
+
+
+@timed_load("Faculty")
+def load_faculties(data: list[dict]) -> tuple[int, int]:
+    """Create the Faculty objects that do not exist yet.
+
+    :param data: rows from get_non_duplicate_major_sample.
+    :return: the number of created and updated rows.
+    """
+    universities = university_map({row["university"] for row in data})
+    keys = {(universities[row["university"]], row["faculty"]) for row in data}
+    existing = set(
+        Faculty.objects.filter(university__in=universities.values()).values_list(
+            "university_id", "name"
+        )
+    )
+    new = [
+        Faculty(university_id=university_id, name=name)
+        for university_id, name in sorted(keys - existing)
+    ]
+    Faculty.objects.bulk_create(new, ignore_conflicts=True)
+    return len(new), 0
+
+
+@timed_load("Major")
+def load_majors(data: list[dict]) -> tuple[int, int]:
+    """Create new Major objects and update the name and faculty of existing ones.
+
+    :param data: rows from get_non_duplicate_major_sample.
+    :return: the number of created and updated rows.
+    """
+    faculties = faculty_map({row["university"] for row in data})
+    majors = {
+        row["major_code"]: (
+            row["major"],
+            faculties[(row["university"], row["faculty"])],
+        )
+        for row in data
+    }
+    existing = {
+        code: (name, faculty_id)
+        for code, name, faculty_id in Major.objects.filter(code__in=majors).values_list(
+            "code", "name", "faculty_id"
+        )
+    }
+    changed = [
+        Major(code=code, name=name, faculty_id=faculty_id)
+        for code, (name, faculty_id) in majors.items()
+        if existing.get(code) != (name, faculty_id)
+    ]
+    Major.objects.bulk_create(
+        changed,
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=["name", "faculty"],
+    )
+    updated = sum(major.code in existing for major in changed)
+    return len(changed) - updated, updated
+
+
+@timed_load("CriteriaSet")
+def load_criteria_sets(keys: set[tuple[str, str]]) -> tuple[int, int]:
+    """Create the CriteriaSet objects that do not exist yet.
+
+    :param keys: (major code, criteria set name) of each CriteriaSet.
+    :return: the number of created and updated rows.
+    """
+    majors = major_map({code for code, _ in keys})
+    existing = set(
+        CriteriaSet.objects.filter(major__in=majors.values()).values_list(
+            "major_id", "name"
+        )
+    )
+    new = {(majors[code], name) for code, name in keys} - existing
+    CriteriaSet.objects.bulk_create(
+        CriteriaSet(major_id=major_id, name=name) for major_id, name in sorted(new)
+    )
+    return len(new), 0
+
+
+@timed_load("Exams")
+def load_exams(rows: list[dict]) -> tuple[int, int]:
+    """Create new Exams objects and update the max score and core of existing ones.
+
+    :param rows: rows of exams.csv.
+    :return: the number of created and updated rows.
+    """
+    exams = {
+        row["name"]: (float(row["max_score"]), parse_bool(row["core"])) for row in rows
+    }
+    existing = {
+        exam.name: exam for exam in Exams.objects.filter(name__in=exams).order_by("-id")
+    }
+    new = []
+    changed = []
+    for name, (max_score, core) in exams.items():
+        exam = existing.get(name)
+        if exam is None:
+            new.append(Exams(name=name, max_score=max_score, core=core))
+        elif (exam.max_score, exam.core) != (max_score, core):
+            exam.max_score, exam.core = max_score, core
+            changed.append(exam)
+    Exams.objects.bulk_create(new)
+    Exams.objects.bulk_update(changed, ["max_score", "core"])
+    return len(new), len(changed)
+
+
+def parse_bool(value: str) -> bool:
+    """Parse a True/False cell of a data file.
+
+    :param value: the cell.
+    :return: the boolean.
+    :raises ValueError: if the cell is not a boolean.
+    """
+    cleaned = value.strip().lower()
+    if cleaned in ("true", "1"):
+        return True
+    if cleaned in ("false", "0", ""):
+        return False
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+
+def parse_criteria(value: str) -> dict[str, tuple[float, float]]:
+    """Parse a criteria cell of criteria.csv.
+
+    The cell is a JSON object that maps each exam name to its weight and
+    min_score. It may be wrapped in a quoted string, which is unquoted with
+    ast.literal_eval, so no code from the file is ever run.
+
+    :param value: the cell.
+    :return: a map of exam name to (weight, min_score).
+    :raises ValueError: if the cell is not valid criteria.
+    """
+    value = value.strip()
+    try:
+        if value[:1] in ("'", '"'):
+            value = ast.literal_eval(value)
+            if not isinstance(value, str):
+                raise ValueError("Criteria must be a JSON object")
+        data = json.loads(value)
+    except SyntaxError as e:
+        raise ValueError(f"Invalid criteria: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Criteria must be a JSON object")
+    criteria = {}
+    for exam_name, criterion in data.items():
+        try:
+            weight = float(criterion["weight"])
+            min_score = float(criterion["min_score"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid criterion for {exam_name}") from e
+        criteria[exam_name.strip()] = (weight, min_score)
+    return criteria
+
+
+@timed_load("Criterion")
+def load_criteria(rows: list[dict]) -> tuple[int, int]:
+    """Add the missing criteria of each CriteriaSet in criteria.csv.
+
+    Every row is parsed and every exam name is checked before anything is
+    written. The exams are looked up in one name to id map.
+
+    :param rows: rows of criteria.csv.
+    :return: the number of created and updated rows.
+    :raises ValueError: if a criteria cell is not valid.
+    :raises Exams.DoesNotExist: if a criteria cell has an unknown exam.
+    """
+    criteria_sets = criteria_set_map({row["major_code"] for row in rows})
+    exams = dict(Exams.objects.values_list("name", "id"))
+    wanted = {}
+    unknown = set()
+    for row in rows:
+        try:
+            criteria = parse_criteria(row["criteria"])
+        except ValueError as e:
+            raise ValueError(f"Criteria of major {row['major_code']}: {e}") from e
+        criteria_set_id = criteria_sets[(row["major_code"], row["criteria_name"])]
+        keys = wanted.setdefault(criteria_set_id, set())
+        for exam_name, (weight, min_score) in criteria.items():
+            if exam_name not in exams:
+                unknown.add(exam_name)
+                continue
+            keys.add((exams[exam_name], weight, min_score))
+    if unknown:
+        names = ", ".join(sorted(unknown))
+        raise Exams.DoesNotExist(f"Exam {names} Not Found.")
+
+    through = CriteriaSet.criteria.through
+    existing = set(
+        through.objects.filter(criteriaset_id__in=wanted).values_list(
+            "criteriaset_id",
+            "criterion__exam_id",
+            "criterion__weight",
+            "criterion__min_score",
+        )
+    )
+    missing = [
+        (criteria_set_id, key)
+        for criteria_set_id, keys in wanted.items()
+        for key in sorted(keys)
+        if (criteria_set_id, *key) not in existing
+    ]
+    criteria = Criterion.objects.bulk_create(
+        Criterion(exam_id=exam_id, weight=weight, min_score=min_score)
+        for _, (exam_id, weight, min_score) in missing
+    )
+    through.objects.bulk_create(
+        through(criteriaset_id=criteria_set_id, criterion_id=criterion.id)
+        for (criteria_set_id, _), criterion in zip(missing, criteria)
+    )
+    return len(criteria), 0
+
+
+SCORE_FIELDS = ("min_score", "max_score", "register", "max_seat", "admitted")
+
+
+def score_values(row: dict) -> tuple:
+    """Get the scores of a row as they are stored in a ScoreHistory.
+
+    The file has some fractional counts, e.g. 41.17 admitted, which are
+    stored as integers, so they are converted like the model fields do.
+
+    :param row: a row from parse_major_row.
+    :return: the values of SCORE_FIELDS.
+    """
+    return tuple(
+        ScoreHistory._meta.get_field(field).to_python(row[field])
+        for field in SCORE_FIELDS
+    )
+
+
+@timed_load("ScoreHistory")
+def load_score_history(data: list[dict], year: int = DEFAULT_YEAR) -> tuple[int, int]:
+    """Create or update the ScoreHistory of each criteria set for a year.
+
+    A criteria set can have several rows with different scores in the same
+    file, so a ScoreHistory is matched on all of its values, not only on its
+    criteria set. The rows given for a criteria set are its complete list:
+    rows that already exist are kept, the others update an existing row of
+    the criteria set that is not in the list, or are created.
+
+    :param data: rows from get_non_duplicate_major_sample.
+    :param year: the year of the admission round.
+    :return: the number of created and updated rows.
+    """
+    criteria_sets = criteria_set_map({row["major_code"] for row in data})
+    scores = defaultdict(dict)
     for row in data:
-        university = University.objects.get_or_create(name=row["university"])[0]
-        faculty = Faculty.objects.get_or_create(
-            name=row["faculty"], university=university
-        )[0]
-        major = Major.objects.get_or_create(
-            name=row["major"], code=row["major_code"], faculty=faculty
-        )[0]
-        criteria_set = CriteriaSet.objects.get_or_create(
-            name=row["criteria_set"], major=major
-        )[0]
-        university.save()
-        faculty.save()
-        major.save()
-        criteria_set.save()
-    print("Successfully imported University, Faculty and Major data")
+        criteria_set_id = criteria_sets[(row["major_code"], row["criteria_set"])]
+        # a dict keeps the file order without duplicates
+        scores[criteria_set_id][score_values(row)] = None
+    existing = defaultdict(list)
+    for history in ScoreHistory.objects.filter(
+        criteria_set__in=scores, year=year
+    ).order_by("id"):
+        existing[history.criteria_set_id].append(history)
+    major_ids = dict(
+        CriteriaSet.objects.filter(id__in=scores).values_list("id", "major_id")
+    )
+    new = []
+    changed = []
+    for criteria_set_id, rows in scores.items():
+        unused = []
+        for history in existing[criteria_set_id]:
+            values = tuple(getattr(history, field) for field in SCORE_FIELDS)
+            if values in rows:
+                del rows[values]
+            else:
+                unused.append(history)
+        for values, history in zip_longest(rows, unused):
+            if values is None:
+                # the file has fewer rows than the database, keep the others
+                break
+            if history is None:
+                new.append(
+                    ScoreHistory(
+                        major_id=major_ids[criteria_set_id],
+                        criteria_set_id=criteria_set_id,
+                        year=year,
+                        **dict(zip(SCORE_FIELDS, values)),
+                    )
+                )
+            else:
+                for field, value in zip(SCORE_FIELDS, values):
+                    setattr(history, field, value)
+                changed.append(history)
+    ScoreHistory.objects.bulk_create(new)
+    ScoreHistory.objects.bulk_update(changed, SCORE_FIELDS)
+    return len(new), len(changed)
+
+
+def university_map(names: set[str]) -> dict[str, int]:
+    """Map university names to their id."""
+    return dict(University.objects.filter(name__in=names).values_list("name", "id"))
+
+
+def faculty_map(universities: set[str]) -> dict[tuple[str, str], int]:
+    """Map (university name, faculty name) to the faculty id."""
+    faculties = Faculty.objects.filter(university__name__in=universities)
+    return {
+        (university, name): faculty_id
+        for university, name, faculty_id in faculties.values_list(
+            "university__name", "name", "id"
+        )
+    }
+
+
+def major_map(codes: set[str]) -> dict[str, int]:
+    """Map major codes to the major id."""
+    majors = dict(Major.objects.filter(code__in=codes).values_list("code", "id"))
+    for code in codes - majors.keys():
+        raise Major.DoesNotExist(f"Major {code} Not Found.")
+    return majors
+
+
+def criteria_set_map(codes: set[str]) -> dict[tuple[str, str], int]:
+    """Map (major code, criteria set name) to the CriteriaSet id."""
+    criteria_sets = CriteriaSet.objects.filter(major__code__in=codes).order_by("-id")
+    return {
+        (code, name): criteria_set_id
+        for code, name, criteria_set_id in criteria_sets.values_list(
+            "major__code", "name", "id"
+        )
+    }
 
 
 def format_major_name(major_name: str, campus: str, major_code: str) -> str:
@@ -81,50 +457,77 @@ def format_major_name(major_name: str, campus: str, major_code: str) -> str:
     )
 
 
-def get_non_duplicate_major_sample() -> None:
-    """Get sample of Unviersity, Faculty and Major.
+def parse_major_row(row: dict) -> dict:
+    """Convert a row of the TCAS csv file into University, Major and score data.
+
+    :param row: a row of the csv file, with the Thai column names.
+    :return: the data used by the loaders.
+    """
+    return {
+        "university": row["สถาบัน"],
+        "faculty": row["คณะ"],
+        "major": format_major_name(row["หลักสูตร"], row["วิทยาเขต"], row["รหัสหลักสูตร"]),
+        "major_code": row["รหัสหลักสูตร"],
+        "criteria_set": row["รายละเอียด"] if row["รายละเอียด"] != "" else row["หลักสูตร"],
+        "min_score": string_to_numeric(row["คะแนนต่ำสุด หลังประมวลผลรอบ 2"]),
+        "max_score": string_to_numeric(row["คะแนนสูงสุด หลังประมวลผลรอบ 2"]),
+        "register": string_to_numeric(row["สมัคร"]),
+        "max_seat": string_to_numeric(row["รับ"]),
+        "admitted": string_to_numeric(row["ผ่าน(รอบ2)"]),
+    }
+
 
-    Due to time constraints, we only create demo for 3 universities.
+def read_major_rows(
+    lines: Iterable[str],
+    universities: Collection[str] | None = DEMO_UNIVERSITIES,
+    faculties: Collection[str] | None = DEMO_FACULTIES,
+) -> Iterator[dict]:
+    """Parse the TCAS csv file one row at a time, skipping duplicate rows.
+
+    Duplicates are found with a set of the parsed values, so the file is
+    read in one pass. Rows of other universities and faculties are skipped
+    before they are parsed.
+
+    :param lines: the lines of the csv file.
+    :param universities: names of the universities to keep, None for all.
+    :param faculties: names of the faculties to keep, None for all.
+    :return: an iterator of unique parsed rows, in file order.
+    """
+    universities = None if universities is None else frozenset(universities)
+    faculties = None if faculties is None else frozenset(faculties)
+    seen = set()
+    for row in csv.DictReader(lines):
+        if universities is not None and row["สถาบัน"] not in universities:
+            continue
+        if faculties is not None and row["คณะ"] not in faculties:
+            continue
+        data = parse_major_row(row)
+        key = tuple(data.values())
+        if key not in seen:
+            seen.add(key)
+            yield data
+
+
+def get_non_duplicate_major_sample(
+    path: str | None = None,
+    universities: Collection[str] | None = DEMO_UNIVERSITIES,
+    faculties: Collection[str] | None = DEMO_FACULTIES,
+) -> list[dict]:
+    """Get the unique University, Faculty and Major rows of the TCAS csv file.
+
+    Due to time constraints, the demo only loads 3 universities.
     (Chulalongkorn, Kasetsart and KMITL)
     and only some faculties.
     (Engineering, Arts and Business Administration)
-    """
-    with open(os.path.join(PATH, "TCAS67_maxmin.csv"), encoding="utf-8-sig") as f:
-        demo_university = (
-            "จุฬาลงกรณ์มหาวิทยาลัย",
-            "มหาวิทยาลัยเกษตรศาสตร์",
-            "สถาบันเทคโนโลยีพระจอมเกล้าเจ้าคุณทหารลาดกระบัง",
-        )
-        demo_faculty = ("คณะวิศวกรรมศาสตร์", "คณะอักษรศาสตร์", "คณะบริหารธุรกิจ")
-        sample_data = filter(
-            lambda x: x["university"] in demo_university
-            and x["faculty"] in demo_faculty,
-            map(
-                lambda row: {
-                    "university": row["สถาบัน"],
-                    "faculty": row["คณะ"],
-                    "major": format_major_name(
-                        row["หลักสูตร"], row["วิทยาเขต"], row["รหัสหลักสูตร"]
-                    ),
-                    "major_code": row["รหัสหลักสูตร"],
-                    "criteria_set": row["รายละเอียด"]
-                    if row["รายละเอียด"] != ""
-                    else row["หลักสูตร"],
-                    "min_score": string_to_numeric(row["คะแนนต่ำสุด หลังประมวลผลรอบ 2"]),
-                    "max_score": string_to_numeric(row["คะแนนสูงสุด หลังประมวลผลรอบ 2"]),
-                    "register": string_to_numeric(row["สมัคร"]),
-                    "max_seat": string_to_numeric(row["รับ"]),
-                    "admitted": string_to_numeric(row["ผ่าน(รอบ2)"]),
-                },
-                csv.DictReader(f),
-            ),
-        )
-
-        non_duplicated_sample = reduce(
-            lambda cum, i: cum + [i] if i not in cum else cum, sample_data, []
-        )
 
-    return non_duplicated_sample
+    :param path: the csv file, defaults to TCAS67_maxmin.csv in the data directory.
+    :param universities: names of the universities to keep, None for all.
+    :param faculties: names of the faculties to keep, None for all.
+    :return: the unique rows, in file order.
+    """
+    path = path or os.path.join(PATH, MAJOR_FILE)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(read_major_rows(f, universities, faculties))
 
 
 def string_to_numeric(n: str) -> float | int:
@@ -141,74 +544,202 @@ def string_to_numeric(n: str) -> float | int:
     return int(cleaned_n)
 
 
-def load_exams() -> None:
-    """Create Exams objects."""
-    with open(os.path.join(PATH, "exams.csv"), encoding="utf-8-sig") as f:
-        rows = csv.DictReader(f)
-        for row in rows:
-            exam = Exams.objects.get_or_create(
-                name=row["name"], max_score=row["max_score"]
-            )[0]
-            exam.core = eval(row["core"])
-            exam.save()
-
-        print("Successfully imported exams data.")
-
-
-def load_criteria() -> None:
-    """Load the score criteria of each major."""
-    with open(os.path.join(PATH, "criteria.csv"), encoding="utf-8-sig") as f:
-        rows = csv.DictReader(f)
-        for row in rows:
-            criteria_set = CriteriaSet.objects.get_or_create(
-                name=row["criteria_name"],
-                major=Major.objects.get(code=row["major_code"]),
-            )[0]
-            criteria = eval(eval(row["criteria"]))
-            for exam_name, criterion in criteria.items():
-                try:
-                    weight = criterion["weight"]
-                    min_score = criterion["min_score"]
-                    criteria_set.criteria.get_or_create(
-                        exam=Exams.objects.get(name=exam_name.strip()),
-                        weight=weight,
-                        min_score=min_score,
-                    )
-                except Exams.DoesNotExist as e:
-                    raise Exams.DoesNotExist(f"Exam {exam_name} Not Found.") from e
-            criteria_set.save()
+def bump_version_if_changed(stats: list[LoadStats]) -> None:
+    """Bump the reference data version if a loader wrote any row.
+
+    The loaders use bulk operations, which do not send the signals that
+    normally bump the version.
 
-        print("Successfully loaded criteria.")
+    :param stats: the results of the loaders.
+    """
+    if any(table.created or table.updated for table in stats):
+        DataVersion.objects.bump()
 
 
-def load_score_history() -> None:
-    """Load the score history."""
-    non_duplicate_sample = get_non_duplicate_major_sample()
-    for row in non_duplicate_sample:
-        try:
-            major = Major.objects.get(code=row["major_code"])
-            ScoreHistory.objects.create(
-                major=major,
-                criteria_set=CriteriaSet.objects.get(
-                    name=row["criteria_set"], major=major
-                ),
-                min_score=row["min_score"],
-                max_score=row["max_score"],
-                register=row["register"],
-                max_seat=row["max_seat"],
-                admitted=row["admitted"],
-                year=2567,
-            )
-        except Major.MultipleObjectsReturned:
-            raise Major.MultipleObjectsReturned(
-                f"University: {row['university']}, faculty:{row['faculty']}"
-            )
-    print("Successfully loaded score history.")
+def year_from_file_name(path: str) -> int | None:
+    """Get the Buddhist year of a TCAS file from its name, e.g. 2567 for TCAS67.
+
+    :param path: the path of the file.
+    :return: the year, None if the name does not contain it.
+    """
+    match = re.search(r"TCAS(\d{2})", os.path.basename(path), re.IGNORECASE)
+    if match is None:
+        return None
+    return 2500 + int(match.group(1))
+
+
+def hash_row(row: dict) -> str:
+    """Hash a parsed row of the TCAS file.
+
+    :param row: a row from parse_major_row.
+    :return: the hex digest of the row.
+    """
+    data = json.dumps(row, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def row_key(row: dict) -> str:
+    """Get the key of a row in the manifest.
+
+    A criteria set can have several rows, so the key is the natural key of
+    its ScoreHistory: the major code, the criteria set and the scores.
+
+    :param row: a row from parse_major_row.
+    :return: the key as a JSON list.
+    """
+    key = [row["major_code"], row["criteria_set"], *score_values(row)]
+    return json.dumps(key, ensure_ascii=False)
+
+
+def manifest_group(key: str) -> tuple[str, str] | None:
+    """Get the major code and criteria set of a manifest key.
+
+    :param key: a key from row_key.
+    :return: the major code and criteria set, None for a key of an older format.
+    """
+    try:
+        major_code, criteria_set = json.loads(key)[:2]
+    except (ValueError, TypeError):
+        return None
+    return major_code, criteria_set
+
+
+def ingest_score_file(
+    year: int,
+    path: str | None = None,
+    universities: Collection[str] | None = DEMO_UNIVERSITIES,
+    faculties: Collection[str] | None = DEMO_FACULTIES,
+    force: bool = False,
+) -> list[LoadStats]:
+    """Load the majors and score history of one year from a TCAS file.
+
+    The IngestionManifest of the year stores the hash of the last file
+    loaded and of each of its rows. If the file and the selection of
+    universities and faculties did not change, nothing else is read or
+    written. Otherwise only the criteria sets with a row whose hash changed
+    are loaded. Rows that are no longer in the file are kept.
+
+    :param year: the year of the admission round.
+    :param path: the csv file, defaults to TCAS67_maxmin.csv in the data directory.
+    :param universities: names of the universities to load, None for all.
+    :param faculties: names of the faculties to load, None for all.
+    :param force: load every row even if the manifest says it did not change.
+    :return: the number of created and updated rows of each table.
+    """
+    path = path or os.path.join(PATH, MAJOR_FILE)
+    with open(path, "rb") as f:
+        content = f.read()
+    selection = [
+        sorted(universities) if universities is not None else None,
+        sorted(faculties) if faculties is not None else None,
+    ]
+    file_hash = hashlib.sha256(content)
+    file_hash.update(json.dumps(selection, ensure_ascii=False).encode())
+    file_hash = file_hash.hexdigest()
+
+    manifest = IngestionManifest.objects.filter(year=year).first()
+    if manifest is None:
+        manifest = IngestionManifest(year=year)
+    elif manifest.file_hash == file_hash and not force:
+        return []
+
+    lines = io.StringIO(content.decode("utf-8-sig"), newline="")
+    data = list(read_major_rows(lines, universities, faculties))
+    row_hashes = {row_key(row): hash_row(row) for row in data}
+    old_hashes = {} if force else manifest.row_hashes
+    # the score history of a criteria set is loaded from all of its rows
+    changed_groups = {
+        (row["major_code"], row["criteria_set"])
+        for row in data
+        if old_hashes.get(row_key(row)) != row_hashes[row_key(row)]
+    }
+    changed = [
+        row
+        for row in data
+        if (row["major_code"], row["criteria_set"]) in changed_groups
+    ]
+
+    with transaction.atomic():
+        stats = [
+            load_universities(changed),
+            load_faculties(changed),
+            load_majors(changed),
+            load_criteria_sets(
+                {(row["major_code"], row["criteria_set"]) for row in changed}
+            ),
+            load_score_history(changed, year),
+        ]
+        manifest.source = os.path.basename(path)
+        manifest.file_hash = file_hash
+        # the rows of a loaded criteria set are replaced by those in the file
+        kept = {}
+        for key, value in manifest.row_hashes.items():
+            group = manifest_group(key)
+            if group is not None and group not in changed_groups:
+                kept[key] = value
+        manifest.row_hashes = {**kept, **row_hashes}
+        manifest.save()
+        bump_version_if_changed(stats)
+    return stats
+
+
+def read_csv(file_name: str) -> list[dict]:
+    """Read a csv file from the data directory.
+
+    :param file_name: name of the file in the data directory.
+    :return: the rows of the file.
+    """
+    with open(os.path.join(PATH, file_name), encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def load_all(
+    path: str | None = None,
+    universities: Collection[str] | None = DEMO_UNIVERSITIES,
+    faculties: Collection[str] | None = DEMO_FACULTIES,
+    year: int | None = None,
+    force: bool = False,
+) -> list[LoadStats]:
+    """Load all admission data.
+
+    Every table is loaded in bulk, in dependency order, inside one transaction.
+    Rows that already exist are matched on their natural key, so loading the
+    data again does not create duplicates. The TCAS csv file is read once,
+    and skipped if it did not change since it was last loaded for the year.
+
+    :param path: the TCAS csv file, defaults to the one in the data directory.
+    :param universities: names of the universities to load, None for all.
+    :param faculties: names of the faculties to load, None for all.
+    :param year: the year of the admission round, defaults to the year in
+        the file name.
+    :param force: load every row of the TCAS file even if it did not change.
+    :return: the number of created and updated rows of each table.
+    """
+    path = path or os.path.join(PATH, MAJOR_FILE)
+    year = year or year_from_file_name(path) or DEFAULT_YEAR
+    with transaction.atomic():
+        score_stats = ingest_score_file(year, path, universities, faculties, force)
+        exam_stats = load_exams(read_csv("exams.csv"))
+        # only the criteria of majors that were loaded
+        criteria_rows = read_csv("criteria.csv")
+        codes = set(
+            Major.objects.filter(
+                code__in={row["major_code"] for row in criteria_rows}
+            ).values_list("code", flat=True)
+        )
+        criteria_rows = [row for row in criteria_rows if row["major_code"] in codes]
+        criteria_stats = [
+            load_criteria_sets(
+                {(row["major_code"], row["criteria_name"]) for row in criteria_rows}
+            ),
+            load_criteria(criteria_rows),
+        ]
+        # ingest_score_file bumped the version for its own tables already
+        bump_version_if_changed([exam_stats, *criteria_stats])
+    return [*score_stats, exam_stats, *criteria_stats]
 
 
 def run() -> None:
     """Run the import script."""
-    load_uni_faculty_major()
-    load_exams()
-    load_criteria()
-    load_score_history()
+    for table in load_all():
+        print(table)
@@ -0,0 +1,61 @@
+"""Management command to load the admission data from the calculator data files."""
+
+import time
+from django.core.management.base import BaseCommand
+from calculator.import_data import DEMO_FACULTIES, DEMO_UNIVERSITIES, load_all
+
+
+class Command(BaseCommand):
+    """Load universities, majors, exams, criteria and score history in bulk."""
+
+    help = "Load the TCAS admission data. Running it again only applies changes."
+
+    def add_arguments(self, parser) -> None:
+        """Add options to choose the file and what part of it to load."""
+        parser.add_argument("--file", help="The TCAS csv file to load.")
+        parser.add_argument(
+            "--university",
+            action="append",
+            help="Name of a university to load, can be repeated. "
+            "Defaults to the demo universities.",
+        )
+        parser.add_argument(
+            "--faculty",
+            action="append",
+            help="Name of a faculty to load, can be repeated. "
+            "Defaults to the demo faculties.",
+        )
+        parser.add_argument(
+            "--year",
+            type=int,
+            help="The year of the admission round, e.g. 2567. "
+            "Defaults to the year in the file name.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Load every row even if the file did not change.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Load every university and faculty in the file.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Load the data and report the rows changed in each table."""
+        universities = options["university"] or DEMO_UNIVERSITIES
+        faculties = options["faculty"] or DEMO_FACULTIES
+        if options["all"]:
+            universities = faculties = None
+        start = time.perf_counter()
+        stats = load_all(
+            options["file"], universities, faculties, options["year"], options["force"]
+        )
+        for table in stats:
+            self.stdout.write(str(table))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded TCAS data in {time.perf_counter() - start:.2f}s"
+            )
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:41
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0007_alter_criteriaset_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(unique=True, validators=[django.core.validators.MaxValueValidator(9999), django.core.validators.MinValueValidator(1899)])),
+                ('source', models.CharField(max_length=200)),
+                ('file_hash', models.CharField(max_length=64)),
+                ('row_hashes', models.JSONField(default=dict)),
+                ('loaded_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
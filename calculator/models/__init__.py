@@ -2,4 +2,6 @@ from .criteria import CriteriaSet, Criterion
 from .exams import Exams
 from .university import University, Faculty, Major
 from .student_exam_score import StudentExamScore
-from .score_history import ScoreHistory
\ No newline at end of file
+from .score_history import ScoreHistory
+from .ingestion_manifest import IngestionManifest
+from .data_version import DataVersion, REFERENCE_DATA, data_version_changed
@@ -0,0 +1,96 @@
+"""A module of the DataVersion model."""
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+from .criteria import CriteriaSet, Criterion
+from .exams import Exams
+from .score_history import ScoreHistory
+from .university import University, Faculty, Major
+
+REFERENCE_DATA = "reference"
+
+# sent with the name of the data after its version was bumped in this process
+data_version_changed = Signal()
+
+
+class DataVersionManager(models.Manager):
+    """Manager to read and bump data versions."""
+
+    def current(self, name: str = REFERENCE_DATA) -> int:
+        """Get the current version of some data.
+
+        :param name: the name of the data.
+        :return: the version, 0 if it was never bumped.
+        """
+        version = self.filter(name=name).values_list("version", flat=True).first()
+        return version or 0
+
+    def bump(self, name: str = REFERENCE_DATA) -> None:
+        """Increase the version of some data after it changed.
+
+        :param name: the name of the data.
+        """
+        # update() does not set auto_now fields
+        changes = {"version": F("version") + 1, "updated_at": timezone.now()}
+        if not self.filter(name=name).update(**changes):
+            try:
+                with transaction.atomic():
+                    self.create(name=name, version=1)
+            except IntegrityError:
+                # created by another process in the meantime
+                self.filter(name=name).update(**changes)
+        data_version_changed.send(sender=self.model, name=name)
+
+
+class DataVersion(models.Model):
+    """A counter that is increased every time some data changes.
+
+    The "reference" version covers the universities, faculties, majors,
+    exams, criteria and score history. Anything computed from that data
+    can be cached until the version changes.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DataVersionManager()
+
+    def __str__(self) -> str:
+        """Return a string representation of the version."""
+        return f"{self.name} version {self.version}"
+
+
+REFERENCE_MODELS = (
+    University,
+    Faculty,
+    Major,
+    Exams,
+    CriteriaSet,
+    Criterion,
+    ScoreHistory,
+)
+
+
+def bump_reference_version(sender, **kwargs) -> None:
+    """Bump the reference data version when a reference object is saved or deleted.
+
+    Bulk operations do not send signals, so the importer bumps the version itself.
+    """
+    if not kwargs.get("raw", False):
+        DataVersion.objects.bump()
+
+
+for model in REFERENCE_MODELS:
+    post_save.connect(bump_reference_version, sender=model)
+    post_delete.connect(bump_reference_version, sender=model)
+
+
+@receiver(m2m_changed, sender=CriteriaSet.criteria.through)
+def bump_reference_version_on_criteria_change(sender, action, **kwargs) -> None:
+    """Bump the reference data version when the criteria of a CriteriaSet change."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        DataVersion.objects.bump()
@@ -0,0 +1,27 @@
+"""A module of the IngestionManifest model."""
+
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+
+
+class IngestionManifest(models.Model):
+    """The last TCAS score file loaded for a year.
+
+    file_hash is the hash of the file and the universities and faculties
+    that were loaded from it. row_hashes maps the key of each row, a JSON
+    list of its major code, criteria set and scores from
+    calculator.import_data.row_key, to the hash of the row, so a new file
+    only writes the criteria sets whose rows changed.
+    """
+
+    year = models.IntegerField(
+        unique=True, validators=[MaxValueValidator(9999), MinValueValidator(1899)]
+    )
+    source = models.CharField(max_length=200)
+    file_hash = models.CharField(max_length=64)
+    row_hashes = models.JSONField(default=dict)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        """Return a string representation of the manifest."""
+        return f"{self.source} for year {self.year}"
@@ -0,0 +1,117 @@
+"""Module for ranking every CriteriaSet by a student's chance of admission.
+
+The weights of every CriteriaSet that has a ScoreHistory are kept in a
+WeightMatrix in the memory of the process, together with the cutoff scores
+of the latest year. The matrix is rebuilt when the reference data version
+changes, so a ranking costs two small queries: one for the version and one
+for the student's scores.
+"""
+
+import heapq
+from threading import Lock
+from django.contrib.auth.models import User
+from calculator.models import CriteriaSet, DataVersion, ScoreHistory
+from calculator.scoring import WeightMatrix, student_scores
+
+DEFAULT_TOP = 20
+MAX_TOP = 500
+
+
+class RankingIndex:
+    """The weights and latest cutoff scores of every CriteriaSet."""
+
+    def __init__(self, version: int):
+        """Load the CriteriaSets, their criteria and their latest ScoreHistory.
+
+        :param version: the reference data version the index is built from.
+        """
+        self.version = version
+        latest = {}
+        for history in ScoreHistory.objects.order_by("criteria_set_id", "year", "id"):
+            latest[history.criteria_set_id] = history
+        self.matrix = WeightMatrix.for_criteria_sets(list(latest))
+        info = {
+            cs["id"]: cs
+            for cs in CriteriaSet.objects.filter(id__in=latest).values(
+                "id",
+                "name",
+                "major",
+                "major__name",
+                "major__faculty__name",
+                "major__faculty__university__name",
+            )
+        }
+        self.rows = []
+        self.cutoffs = []
+        for criteria_set_id in self.matrix.criteria_set_ids:
+            cs = info[criteria_set_id]
+            history = latest[criteria_set_id]
+            self.rows.append(
+                {
+                    "id": criteria_set_id,
+                    "name": cs["name"],
+                    "major": cs["major"],
+                    "major_name": cs["major__name"],
+                    "faculty_name": cs["major__faculty__name"],
+                    "university_name": cs["major__faculty__university__name"],
+                    "year": history.year,
+                    "min_score": history.min_score,
+                    "max_score": history.max_score,
+                }
+            )
+            self.cutoffs.append(history.min_score)
+
+    def rank(self, scores: dict[int, float], top: int = DEFAULT_TOP) -> list[dict]:
+        """Rank the CriteriaSets by the margin of the student's score to the cutoff.
+
+        :param scores: the student's score of each exam.
+        :param top: the number of CriteriaSets to return.
+        :return: the top CriteriaSets with the score, margin and missing exams.
+        """
+        totals = self.matrix.multiply(self.matrix.vector(scores))
+        margins = [total - cutoff for total, cutoff in zip(totals, self.cutoffs)]
+        best = heapq.nlargest(top, range(len(margins)), key=margins.__getitem__)
+        missing = self.matrix.missing_exams(scores)
+        return [
+            {
+                **self.rows[row],
+                "score": totals[row],
+                "margin": margins[row],
+                "missing_exams": missing[row],
+            }
+            for row in best
+        ]
+
+
+_index: RankingIndex | None = None
+_lock = Lock()
+
+
+def get_ranking_index() -> RankingIndex:
+    """Get the ranking index of this process, rebuilt if the data changed."""
+    global _index
+    version = DataVersion.objects.current()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = RankingIndex(version)
+        return _index
+
+
+def clear_ranking_index() -> None:
+    """Forget the ranking index of this process, it is rebuilt on the next use."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def rank_criteria_sets(student: User, top: int = DEFAULT_TOP) -> list[dict]:
+    """Rank every CriteriaSet by the margin of the student's score to its cutoff.
+
+    :param student: the student.
+    :param top: the number of CriteriaSets to return.
+    :return: the top CriteriaSets, best first.
+    """
+    return get_ranking_index().rank(student_scores(student), top)
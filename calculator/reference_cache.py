@@ -0,0 +1,200 @@
+"""Module for caching reference data responses such as universities and exams.
+
+Reference data only changes when it is imported or edited in the admin, and
+every change bumps the "reference" DataVersion. The serialized responses are
+kept in the memory of the process for the current version and sent with an
+ETag made from that version, so clients can revalidate with If-None-Match
+and get a 304 response without a body.
+
+The version itself is read from the database at most once every
+settings.REFERENCE_VERSION_TTL seconds, so a warm process answers most
+reference requests without any query. A bump in the same process is seen
+immediately, a bump in another process (e.g. the importer) within the TTL.
+"""
+
+import time
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable
+from django.conf import settings
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from calculator.models import DataVersion, REFERENCE_DATA, data_version_changed
+
+# the number of responses kept per version, query strings come from clients
+MAX_ENTRIES = 4096
+
+
+class ReferenceCache:
+    """Serialized reference data responses of the current version.
+
+    Everything is kept in the memory of the current process.
+    """
+
+    def __init__(self):
+        """Create an empty cache."""
+        self.hits = 0
+        self.misses = 0
+        self._stamp = None
+        self._checked_at = 0.0
+        self._entries = {}
+        self._lock = Lock()
+
+    def stamp(self) -> str:
+        """Get a stamp of the current reference data version.
+
+        The stamp includes the time of the last bump, so it also changes if
+        the counter is ever reset, e.g. after restoring a database.
+
+        :return: the stamp, "0" if the reference data was never changed.
+        """
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return self._stamp
+        return self._store_stamp(_version_query().first(), now)
+
+    async def astamp(self) -> str:
+        """Get a stamp of the current reference data version in an async view.
+
+        :return: the stamp, "0" if the reference data was never changed.
+        """
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return self._stamp
+        return self._store_stamp(await _version_query().afirst(), now)
+
+    def _is_fresh(self, now: float) -> bool:
+        return (
+            self._stamp is not None
+            and now - self._checked_at < settings.REFERENCE_VERSION_TTL
+        )
+
+    def _store_stamp(self, row: tuple | None, now: float) -> str:
+        stamp = f"{row[0]}.{int(row[1].timestamp() * 1_000_000)}" if row else "0"
+        with self._lock:
+            if stamp != self._stamp:
+                self._entries = {}
+                self._stamp = stamp
+            self._checked_at = now
+        return stamp
+
+    def get(self, stamp: str, key, count_miss: bool = True) -> Any:
+        """Get a cached response body.
+
+        :param stamp: the stamp the body was cached with.
+        :param key: the key of the request.
+        :param count_miss: False if the caller asks again on a miss.
+        :return: the body, None if it is not cached.
+        """
+        entries = self._entries
+        if self._stamp != stamp or key not in entries:
+            self.misses += count_miss
+            return None
+        self.hits += 1
+        return entries[key]
+
+    def set(self, stamp: str, key, data: Any) -> None:
+        """Cache a response body if the version did not change in the meantime.
+
+        :param stamp: the stamp read before the body was built.
+        :param key: the key of the request.
+        :param data: the response body.
+        """
+        with self._lock:
+            if self._stamp == stamp and len(self._entries) < MAX_ENTRIES:
+                self._entries[key] = data
+
+    def clear(self) -> None:
+        """Forget the cached responses and read the version again on the next use."""
+        with self._lock:
+            self._stamp = None
+            self._checked_at = 0.0
+            self._entries = {}
+
+
+def _version_query():
+    return DataVersion.objects.filter(name=REFERENCE_DATA).values_list(
+        "version", "updated_at"
+    )
+
+
+reference_cache = ReferenceCache()
+
+
+def clear_on_version_change(sender, name: str, **kwargs) -> None:
+    """Clear the cache when the reference data version is bumped in this process."""
+    if name == REFERENCE_DATA:
+        reference_cache.clear()
+
+
+data_version_changed.connect(clear_on_version_change)
+
+
+def request_key(request) -> tuple:
+    """Get the cache key of a request from its path and query string.
+
+    :param request: a Django or DRF request.
+    :return: the key.
+    """
+    params = sorted((name, tuple(values)) for name, values in request.GET.lists())
+    return request.path, tuple(params)
+
+
+def reference_headers(stamp: str) -> dict[str, str]:
+    """Get the caching headers of a reference data response.
+
+    :param stamp: the stamp of the reference data version.
+    :return: the ETag and Cache-Control headers.
+    """
+    return {
+        "ETag": f'W/"ref-{stamp}"',
+        "Cache-Control": f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE}",
+    }
+
+
+def is_not_modified(request, etag: str) -> bool:
+    """Check if the client already has the response with the given ETag.
+
+    :param request: the request with an optional If-None-Match header.
+    :param etag: the ETag of the current response.
+    :return: True if a 304 response can be sent.
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # weak comparison, both sides may or may not have the W/ prefix
+    return "*" in etags or any(
+        tag.removeprefix("W/") == etag.removeprefix("W/") for tag in etags
+    )
+
+
+def cache_reference_data(view: Callable) -> Callable:
+    """Cache the response of a view method that only reads reference data.
+
+    Successful responses get an ETag and a Cache-Control header, and a request
+    with a matching If-None-Match header gets a 304 response. Other responses
+    such as 204 and 404 are returned as they are and not cached.
+
+    :param view: a list or retrieve method of a ViewSet.
+    :return: the wrapped method.
+    """
+
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs) -> Response:
+        stamp = reference_cache.stamp()
+        headers = reference_headers(stamp)
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        key = request_key(request)
+        data = reference_cache.get(stamp, key)
+        if data is None:
+            response = view(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            reference_cache.set(stamp, key, data)
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
+
+    return wrapper
@@ -0,0 +1,155 @@
+"""Module for computing a student's score for many CriteriaSets at once.
+
+The weights of the CriteriaSets are loaded into a matrix with one row per
+CriteriaSet and one column per exam. A student's scores are loaded into a
+vector indexed by the same exams, so the score of every CriteriaSet is one
+matrix-vector product. NumPy is used when it is installed, otherwise the
+product is computed in pure Python.
+"""
+
+from collections.abc import Iterable
+from django.contrib.auth.models import User
+from calculator.models import CriteriaSet, StudentExamScore
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+
+class WeightMatrix:
+    """The exam weights of a list of CriteriaSets.
+
+    Weights are scaled by the max score of their exam, so multiplying the
+    matrix with a vector of raw exam scores gives a score out of 100.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, int, str, float, float]]):
+        """Build the matrix from the criteria of each CriteriaSet.
+
+        :param rows: (criteria set id, exam id, exam name, weight, max score)
+            for each Criterion of each CriteriaSet.
+        """
+        self.criteria_set_ids: list[int] = []
+        self.exam_ids: list[int] = []
+        self.exam_names: dict[int, str] = {}
+        row_index: dict[int, int] = {}
+        column_index: dict[int, int] = {}
+        entries = []
+        for criteria_set_id, exam_id, exam_name, weight, max_score in rows:
+            if criteria_set_id not in row_index:
+                row_index[criteria_set_id] = len(self.criteria_set_ids)
+                self.criteria_set_ids.append(criteria_set_id)
+            if exam_id not in column_index:
+                column_index[exam_id] = len(self.exam_ids)
+                self.exam_ids.append(exam_id)
+                self.exam_names[exam_id] = exam_name
+            entries.append(
+                (
+                    row_index[criteria_set_id],
+                    column_index[exam_id],
+                    weight / max_score if max_score else 0.0,
+                )
+            )
+        self.row_index = row_index
+        self.column_index = column_index
+        # the exams of each CriteriaSet, used to report missing scores
+        self.columns: list[list[int]] = [[] for _ in self.criteria_set_ids]
+        weights = [[0.0] * len(self.exam_ids) for _ in self.criteria_set_ids]
+        for row, column, weight in entries:
+            weights[row][column] += weight
+            if column not in self.columns[row]:
+                self.columns[row].append(column)
+        self.weights = numpy.array(weights, dtype=float) if numpy else weights
+
+    @classmethod
+    def for_criteria_sets(cls, criteria_set_ids: Iterable[int]) -> "WeightMatrix":
+        """Load the weights of the given CriteriaSets with one query.
+
+        :param criteria_set_ids: ids of the CriteriaSets.
+        :return: the matrix, CriteriaSets without criteria have no row.
+        """
+        through = CriteriaSet.criteria.through
+        rows = (
+            through.objects.filter(criteriaset_id__in=criteria_set_ids)
+            .order_by("criteriaset_id", "criterion__exam_id")
+            .values_list(
+                "criteriaset_id",
+                "criterion__exam_id",
+                "criterion__exam__name",
+                "criterion__weight",
+                "criterion__exam__max_score",
+            )
+        )
+        return cls(rows)
+
+    def vector(self, scores: dict[int, float]) -> list[float]:
+        """Convert a map of exam id to score into a vector of this matrix's exams.
+
+        :param scores: the student's score of each exam.
+        :return: the score of each column, 0 if the student has no score.
+        """
+        return [scores.get(exam_id, 0.0) for exam_id in self.exam_ids]
+
+    def multiply(self, vector: list[float]) -> list[float]:
+        """Multiply the matrix with a vector of exam scores.
+
+        :param vector: a score for each column.
+        :return: the weighted score of each row.
+        """
+        if not self.criteria_set_ids:
+            return []
+        if numpy:
+            return (self.weights @ numpy.array(vector, dtype=float)).tolist()
+        return [sum(w * x for w, x in zip(row, vector)) for row in self.weights]
+
+    def missing_exams(self, scores: dict[int, float]) -> list[list[str]]:
+        """Get the exams of each row that the student has no score for.
+
+        :param scores: the student's score of each exam.
+        :return: the names of the missing exams of each row.
+        """
+        return [
+            [
+                self.exam_names[self.exam_ids[column]]
+                for column in columns
+                if self.exam_ids[column] not in scores
+            ]
+            for columns in self.columns
+        ]
+
+
+def student_scores(student: User) -> dict[int, float]:
+    """Load all exam scores of a student with one query.
+
+    :param student: the student.
+    :return: a map of exam id to score.
+    """
+    return dict(
+        StudentExamScore.objects.filter(student=student).values_list("exam_id", "score")
+    )
+
+
+def score_criteria_sets(student: User, criteria_sets: Iterable[dict]) -> list[dict]:
+    """Compute the score of a student for each of the given CriteriaSets.
+
+    :param student: the student.
+    :param criteria_sets: dicts with at least the id of each CriteriaSet.
+    :return: each CriteriaSet dict with its score and missing_exams added.
+    """
+    criteria_sets = list(criteria_sets)
+    matrix = WeightMatrix.for_criteria_sets(cs["id"] for cs in criteria_sets)
+    scores = student_scores(student)
+    totals = matrix.multiply(matrix.vector(scores))
+    missing = matrix.missing_exams(scores)
+    results = []
+    for criteria_set in criteria_sets:
+        row = matrix.row_index.get(criteria_set["id"])
+        results.append(
+            {
+                **criteria_set,
+                "score": totals[row] if row is not None else 0.0,
+                "missing_exams": missing[row] if row is not None else [],
+            }
+        )
+    return results
@@ -0,0 +1,206 @@
+"""Module for searching majors by their name, code, faculty and university.
+
+Every major is indexed by the trigrams of its normalized name and code, and
+of the names of its faculty and university. A search counts the trigrams of
+the query that each major has, so prefixes and names with a typo are found
+too. Matches in the name or code of the major count twice as much as
+matches in the faculty or university name.
+
+The index is kept in the memory of the process and rebuilt when the
+reference data version changes.
+"""
+
+import heapq
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+from threading import Lock
+from calculator.models import Major
+from calculator.reference_cache import reference_cache
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# the share of the trigrams of the query a major must have
+MIN_SCORE = 0.5
+# trigrams of more than this share of the majors are only searched if the
+# query has no other trigrams, they slow searches down but hardly help
+COMMON_SHARE = 0.1
+
+# Thai tone marks and other signs above the letters, which are often
+# typed differently or left out
+THAI_MARKS = dict.fromkeys(range(0x0E47, 0x0E4F))
+# words that are part of almost every name
+STOPWORDS = (
+    "หลักสูตร",
+    "สาขาวิชา",
+    "สาขา",
+    "วิชาเอก",
+    "คณะ",
+    "มหาวิทยาลัย",
+    "วิทยาเขต",
+)
+SEPARATORS = re.compile(r"[^\w\u0e00-\u0e7f]+")
+
+
+def normalize(text: str) -> str:
+    """Normalize a name for searching.
+
+    The text is NFKC normalized and case folded, Thai tone marks are removed
+    (so "ำ" becomes "า"), common words are removed and punctuation becomes
+    a single space.
+
+    :param text: the name or query.
+    :return: the normalized text.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().translate(THAI_MARKS)
+    for word in STOPWORDS:
+        text = text.replace(word, " ")
+    return SEPARATORS.sub(" ", text).strip()
+
+
+def trigrams(text: str, prefix: bool = True) -> set[str]:
+    """Get the trigrams of each word of a normalized text.
+
+    :param text: the normalized text.
+    :param prefix: also add a trigram of a space and the first two letters of
+        each word, which lets words of two letters be found.
+    :return: the trigrams.
+    """
+    grams = set()
+    for word in text.split():
+        if prefix:
+            word = f" {word}"
+        grams.update(word[i : i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def query_trigrams(text: str) -> set[str]:
+    """Get the trigrams of a normalized query.
+
+    Words of three letters or more can match anywhere in a Thai name, which
+    has no spaces between words, so only short words must start a word.
+
+    :param text: the normalized query.
+    :return: the trigrams.
+    """
+    grams = set()
+    for word in text.split():
+        grams.update(trigrams(word, prefix=len(word) < 3))
+    return grams
+
+
+class MajorSearchIndex:
+    """A trigram index of every major."""
+
+    def __init__(self, stamp: str):
+        """Load every major with its faculty and university and index them.
+
+        :param stamp: the reference data version stamp the index is built from.
+        """
+        self.stamp = stamp
+        self.majors = []
+        self.names = []
+        names = defaultdict(list)
+        context = defaultdict(list)
+        for row in Major.objects.order_by("id").values(
+            "id",
+            "code",
+            "name",
+            "faculty_id",
+            "faculty__name",
+            "faculty__university_id",
+            "faculty__university__name",
+        ):
+            index = len(self.majors)
+            self.majors.append(
+                {
+                    "id": row["id"],
+                    "code": row["code"],
+                    "name": row["name"],
+                    "faculty": {"id": row["faculty_id"], "name": row["faculty__name"]},
+                    "university": {
+                        "id": row["faculty__university_id"],
+                        "name": row["faculty__university__name"],
+                    },
+                }
+            )
+            name = normalize(f"{row['name']} {row['code']}")
+            self.names.append(name)
+            own = trigrams(name)
+            for gram in own:
+                names[gram].append(index)
+            parents = normalize(
+                f"{row['faculty__name']} {row['faculty__university__name']}"
+            )
+            for gram in trigrams(parents) - own:
+                context[gram].append(index)
+        self.name_postings = {gram: tuple(ids) for gram, ids in names.items()}
+        self.context_postings = {gram: tuple(ids) for gram, ids in context.items()}
+        most = COMMON_SHARE * len(self.majors)
+        self.common = {
+            gram
+            for gram in names.keys() | context.keys()
+            if len(names.get(gram, ())) + len(context.get(gram, ())) > most
+        }
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """Find the majors that best match a query.
+
+        :param query: part of the name or code of a major, its faculty or its
+            university, possibly with typos.
+        :param limit: the maximum number of majors to return.
+        :return: the majors with their score, best first.
+        """
+        query = normalize(query)
+        grams = query_trigrams(query)
+        if not grams:
+            return []
+        grams = grams - self.common or grams
+        name_hits = Counter(
+            chain.from_iterable(self.name_postings.get(gram, ()) for gram in grams)
+        )
+        context_hits = Counter(
+            chain.from_iterable(self.context_postings.get(gram, ()) for gram in grams)
+        )
+        scores = name_hits + name_hits + context_hits
+        best = 2 * len(grams)
+        threshold = MIN_SCORE * best
+        matches = [
+            # a name that contains the whole query ranks first
+            (score + (best if query in self.names[index] else 0), -index, score)
+            for index, score in scores.items()
+            if score >= threshold
+        ]
+        return [
+            {**self.majors[-index], "score": round(score / best, 3)}
+            for _, index, score in heapq.nlargest(limit, matches)
+        ]
+
+
+_index: MajorSearchIndex | None = None
+_lock = Lock()
+
+
+def get_search_index() -> MajorSearchIndex:
+    """Get the search index of this process, rebuilt if the data changed."""
+    global _index
+    stamp = reference_cache.stamp()
+    index = _index
+    if index is not None and index.stamp == stamp:
+        return index
+    with _lock:
+        if _index is None or _index.stamp != stamp:
+            _index = MajorSearchIndex(stamp)
+        return _index
+
+
+def search_majors(query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """Find the majors that best match a query.
+
+    :param query: part of the name or code of a major, its faculty or its
+        university, possibly with typos.
+    :param limit: the maximum number of majors to return.
+    :return: the majors with their score, best first.
+    """
+    return get_search_index().search(query, limit)
@@ -1,5 +1,6 @@
 """Serializers for CriteriaSet and Criterion models."""
 
+from django.db.models import Prefetch, QuerySet
 from rest_framework import serializers
 from calculator.models import CriteriaSet, Criterion
 
@@ -8,6 +9,8 @@ class CriterionSerializer(serializers.ModelSerializer):
     """Serializer for the Criterion model."""
 
     min_score = serializers.FloatField(required=False, default=0)
+    exam_name = serializers.CharField(source="exam.name", read_only=True)
+    exam_max_score = serializers.FloatField(source="exam.max_score", read_only=True)
 
     class Meta:
         """Meta definition of Criterion."""
@@ -26,3 +29,20 @@ class CriteriaSetSerializer(serializers.ModelSerializer):
 
         model = CriteriaSet
         fields = ["id", "name", "criteria"]
+
+    @staticmethod
+    def prefetch(queryset: QuerySet) -> QuerySet:
+        """Prefetch the criteria and their exams of the CriteriaSets.
+
+        Serializing the result runs a fixed number of queries however many
+        CriteriaSets and criteria there are.
+
+        :param queryset: the CriteriaSets to serialize.
+        :return: the queryset with the criteria prefetched.
+        """
+        return queryset.prefetch_related(
+            Prefetch(
+                "criteria",
+                queryset=Criterion.objects.select_related("exam").order_by("id"),
+            )
+        )
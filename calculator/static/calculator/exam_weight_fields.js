@@ -5,14 +5,16 @@ class ExamWeightFields extends AbstractExamFields {
     super(tContainer, aContainer, oContainer);
   }
 
-  async fetchSavedDataJSON(criteriaID) {
-    const response = await fetch(`/api/criteria/${criteriaID}`);
-    if (!response.ok) {
-      return null;
+  async fetchSavedDataJSON(criteriaID, criteria = null) {
+    if (criteria === null) {
+      const response = await fetch(`/api/criteria/${criteriaID}`);
+      if (!response.ok) {
+        return null;
+      }
+      criteria = (await response.json()).criteria;
     }
-    let criteria = await response.json();
     const result = {};
-    for (const obj of criteria.criteria) {
+    for (const obj of criteria) {
       result[obj.exam] = {
         'weight': obj.weight,
         'min_score': obj.min_score,
@@ -30,8 +32,8 @@ class ExamWeightFields extends AbstractExamFields {
     }
   }
 
-  async insertScoreWeight(criteriaID) {
-    const scoreWeight = await this.fetchSavedDataJSON(criteriaID);
+  async insertScoreWeight(criteriaID, criteria = null) {
+    const scoreWeight = await this.fetchSavedDataJSON(criteriaID, criteria);
     const weightInputs = document.querySelectorAll('.exam-weight-input');
     for (const w of weightInputs) {
       const examID = Number((w.id).split("-")[1]);
@@ -2,28 +2,14 @@ import { ExamWeightFields } from './exam_weight_fields.js';
 import { preventNonNumeric } from './abstract_exam_fields.js';
 let currentCriteriaID = 0;
 
-async function fetchUniversities() {
-  const response = await fetch('/api/universities/');
-  const universities = await response.json();
-  return universities;
+async function fetchCatalog() {
+  const response = await fetch('/api/catalog/');
+  const catalog = await response.json();
+  return catalog;
 }
 
-async function fetchFaculties(universityID) {
-  const response = await fetch(`/api/faculties/?university=${universityID}`);
-  const faculties = await response.json();
-  return faculties;
-}
-
-async function fetchMajors(facultyID) {
-  const response = await fetch(`/api/majors/?faculty=${facultyID}`);
-  const majors = await response.json();
-  return majors;
-}
-
-async function fetchCriteriaSet(majorID) {
-  const response = await fetch(`/api/criteria/?major=${majorID}`);
-  const criteriaSet = await response.json();
-  return criteriaSet;
+function findByID(entries, id) {
+  return entries.find((entry) => entry.id === Number(id));
 }
 
 function addSelectOptions(selectElement, data) {
@@ -57,9 +43,11 @@ document.addEventListener('DOMContentLoaded', async () => {
   const majorSelect = document.getElementById('major');
   const criteriaSelect = document.getElementById('criteria');
   const resultsButton = document.getElementById('results-btn');
-  const universities = await fetchUniversities();
+  const universities = await fetchCatalog();
   const weightInputs = document.querySelectorAll('.exam-weight-input');
-  let criteria;
+  let faculties = [];
+  let majors = [];
+  let criteria = [];
   addSelectOptions(universitySelect, universities);
 
   weightInputs.forEach((input) => {
@@ -71,30 +59,32 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
   });
 
-  universitySelect.addEventListener('change', async () => {
+  universitySelect.addEventListener('change', () => {
     removeSelectOptions(facultySelect);
     removeSelectOptions(majorSelect);
     removeSelectOptions(criteriaSelect);
-    const faculties = await fetchFaculties(universitySelect.value);
+    faculties = findByID(universities, universitySelect.value)?.faculties ?? [];
     addSelectOptions(facultySelect, faculties);
   });
 
-  facultySelect.addEventListener('change', async () => {
+  facultySelect.addEventListener('change', () => {
     removeSelectOptions(majorSelect);
     removeSelectOptions(criteriaSelect);
-    const majors = await fetchMajors(facultySelect.value);
+    majors = findByID(faculties, facultySelect.value)?.majors ?? [];
     addSelectOptions(majorSelect, majors);
   });
 
-  majorSelect.addEventListener('change', async () => {
+  majorSelect.addEventListener('change', () => {
     removeSelectOptions(criteriaSelect);
-    criteria = await fetchCriteriaSet(majorSelect.value);
+    criteria = findByID(majors, majorSelect.value)?.criteria_sets ?? [];
     addSelectOptions(criteriaSelect, criteria);
   });
 
   criteriaSelect.addEventListener('change', () => {
     currentCriteriaID = criteriaSelect.value;
-    examContainer.insertScoreWeight(currentCriteriaID);
+    examContainer.insertScoreWeight(
+      currentCriteriaID, findByID(criteria, currentCriteriaID)?.criteria ?? null
+    );
   });
 
   resultsButton.addEventListener('click', async () => {
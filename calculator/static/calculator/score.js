@@ -4,28 +4,21 @@ async function fetchScoreHistory(query) {
   return scoreHistories[0];
 }
 
-async function fetchExam(examID) {
-  const response = await fetch(`/api/exams/${examID}`);
-  const exams = await response.json();
-  return exams;
-}
-
 async function fetchCriteria(criteriaID) {
   const response = await fetch(`/api/criteria/${criteriaID}`);
   const criteria = await response.json();
   return criteria;
 }
 
-async function createMinCriteriaCard(criteriaObj) {
+function createMinCriteriaCard(criteriaObj) {
   const card = document.createElement('div');
-  const exam = await fetchExam(Number(criteriaObj.exam));
-  card.innerHTML = `${exam.name}: ${criteriaObj.min_score}`;
+  card.innerHTML = `${criteriaObj.exam_name}: ${criteriaObj.min_score}`;
   return card;
 }
 
-async function createMultipleMinCriteriaCards(children, parent) {
+function createMultipleMinCriteriaCards(children, parent) {
   for (const child of children) {
-    parent.appendChild(await createMinCriteriaCard(child));
+    parent.appendChild(createMinCriteriaCard(child));
   }
 }
 
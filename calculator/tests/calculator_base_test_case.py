@@ -3,6 +3,7 @@
 from manager.tests import BaseTestCase
 from django.contrib.auth.models import Permission
 from calculator.models import University, Faculty, Major, CriteriaSet, Criterion, Exams
+from calculator.reference_cache import reference_cache
 
 
 class CalculatorBaseTestCase(BaseTestCase):
@@ -14,6 +15,7 @@ class CalculatorBaseTestCase(BaseTestCase):
     def setUp(self):
         """Set Up universities, faculties and majors."""
         super().setUp()
+        reference_cache.clear()
         self.user1.user_permissions.add(
             Permission.objects.get(codename="is_taking_A_levels")
         )
@@ -0,0 +1,101 @@
+"""Tests for the University, Faculty, Major and CriteriaSet tree API."""
+
+import gzip
+import json
+from rest_framework import status
+from calculator.catalog import build_catalog
+from calculator.models import CriteriaSet, Criterion, Exams, Faculty, Major
+from .calculator_base_test_case import CalculatorExtraTestCase
+
+
+class CatalogTest(CalculatorExtraTestCase):
+    """Test the catalog API."""
+
+    def test_whole_tree(self):
+        """The tree has every university, faculty, major and CriteriaSet."""
+        response = self.client.get("/api/catalog/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tree = json.loads(response.content)
+        self.assertEqual([u["name"] for u in tree], ["Kasetsart", "KMITL"])
+        kasetsart, kmitl = tree
+        self.assertEqual(
+            [f["name"] for f in kasetsart["faculties"]], ["Engineering", "Humanity"]
+        )
+        self.assertEqual(
+            [m["code"] for m in kasetsart["faculties"][0]["majors"]], ["2", "4", "6"]
+        )
+        self.assertEqual(kasetsart["faculties"][1]["majors"], [])
+        major = kmitl["faculties"][0]["majors"][0]
+        self.assertEqual(major["name"], "Major #1")
+        self.assertEqual(
+            [cs["id"] for cs in major["criteria_sets"]], [self.cs1.id, self.cs2.id]
+        )
+        self.assertEqual(
+            major["criteria_sets"][1]["criteria"],
+            [
+                {"exam": exam, "weight": weight, "min_score": 20.0}
+                for exam, weight in [(2, 50.0), (4, 30.0), (6, 20.0)]
+            ],
+        )
+
+    def test_subtree(self):
+        """Only the path to the given university, faculty or major is included."""
+        tree = json.loads(self.client.get("/api/catalog/?faculty=3").content)
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(tree[0]["name"], "Kasetsart")
+        self.assertEqual([f["id"] for f in tree[0]["faculties"]], [3])
+
+        tree = json.loads(self.client.get("/api/catalog/?major=1").content)
+        self.assertEqual(tree[0]["name"], "KMITL")
+        majors = tree[0]["faculties"][0]["majors"]
+        self.assertEqual([m["id"] for m in majors], [1])
+        self.assertEqual(len(majors[0]["criteria_sets"]), 2)
+
+        self.assertEqual(build_catalog(university=1000), [])
+
+    def test_invalid_id(self):
+        """An id that is not a number is a bad request."""
+        response = self.client.get("/api/catalog/?major=abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_gzip(self):
+        """The document is sent gzipped to clients that accept it."""
+        plain = self.client.get("/api/catalog/")
+        response = self.client.get(
+            "/api/catalog/", headers={"Accept-Encoding": "gzip, deflate"}
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_cached_document(self):
+        """The document is cached and revalidated like other reference data."""
+        self.client.logout()
+        first = self.client.get("/api/catalog/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/catalog/")
+        self.assertEqual(second.content, first.content)
+        response = self.client.get(
+            "/api/catalog/", headers={"If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        Faculty.objects.create(name="Science", university_id=2)
+        third = self.client.get("/api/catalog/?university=2")
+        self.assertNotEqual(third["ETag"], first["ETag"])
+        self.assertEqual(len(json.loads(third.content)[0]["faculties"]), 2)
+
+    def test_query_count(self):
+        """The tree is built with the same queries however big it is."""
+        # university, faculty, major, CriteriaSet and criteria
+        with self.assertNumQueries(5):
+            build_catalog()
+        exams = [Exams.objects.create(name=f"Extra #{i}") for i in range(5)]
+        for major in Major.objects.all():
+            for _ in range(3):
+                criteria_set = CriteriaSet.objects.create(major=major)
+                criteria_set.criteria.set(
+                    Criterion.objects.create(exam=exam, weight=20) for exam in exams
+                )
+        with self.assertNumQueries(5):
+            tree = build_catalog()
+        self.assertEqual(len(tree[0]["faculties"][0]["majors"][0]["criteria_sets"]), 3)
@@ -2,10 +2,14 @@
 
 from collections.abc import Iterable
 from typing import Any
+from unittest import mock
 from django.contrib.messages import get_messages
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from calculator.models import StudentExamScore, Exams
+from calculator.models import CriteriaSet, Criterion, Exams, Major, StudentExamScore
+from calculator.scoring import WeightMatrix
 from .calculator_base_test_case import CalculatorBaseTestCase
 
 
@@ -147,3 +151,88 @@ class ExamScoreTest(CalculatorBaseTestCase):
         messages = get_messages(response.wsgi_request)
         self.assertTrue(any("DOES NOT EXIST" in str(msg) for msg in messages))
         self.assertEqual(len(messages), 1)
+
+
+class BatchScoreTest(CalculatorBaseTestCase):
+    """Test scoring many CriteriaSets at once."""
+
+    def setUp(self):
+        """Set up exams, scores and CriteriaSets of 2 majors."""
+        super().setUp()
+        self.maths = Exams.objects.create(name="Maths")
+        self.physics = Exams.objects.create(name="Physics", max_score=300)
+        self.chemistry = Exams.objects.create(name="Chemistry")
+        StudentExamScore.objects.create(student=self.user1, exam=self.maths, score=60)
+        StudentExamScore.objects.create(
+            student=self.user1, exam=self.physics, score=150
+        )
+        self.major1, self.major2 = Major.objects.all()[:2]
+        self.cs1 = self.create_criteria_set(
+            self.major1, (self.maths, 50), (self.physics, 50)
+        )
+        self.cs2 = self.create_criteria_set(self.major1, (self.maths, 100))
+        self.cs3 = self.create_criteria_set(
+            self.major2, (self.maths, 50), (self.chemistry, 50)
+        )
+
+    def create_criteria_set(self, major: Major, *criteria) -> CriteriaSet:
+        """Create a CriteriaSet with (exam, weight) criteria."""
+        criteria_set = CriteriaSet.objects.create(major=major)
+        for exam, weight in criteria:
+            criteria_set.criteria.add(
+                Criterion.objects.create(exam=exam, weight=weight)
+            )
+        return criteria_set
+
+    def post(self, data: dict):
+        """Post to the scores API."""
+        return self.client.post(
+            "/api/exam_score/scores/", data, content_type="application/json"
+        )
+
+    def test_score_majors(self):
+        """Every CriteriaSet of the majors is scored."""
+        response = self.post({"majors": [self.major1.id, self.major2.id]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {row["id"]: row for row in response.json()}
+        self.assertAlmostEqual(results[self.cs1.id]["score"], 55)
+        self.assertAlmostEqual(results[self.cs2.id]["score"], 60)
+        self.assertAlmostEqual(results[self.cs3.id]["score"], 30)
+        self.assertEqual(results[self.cs3.id]["missing_exams"], ["Chemistry"])
+        self.assertEqual(results[self.cs1.id]["major_name"], self.major1.name)
+
+    def test_score_criteria_sets(self):
+        """CriteriaSets can be picked by id."""
+        response = self.post({"criteria_sets": [self.cs2.id]})
+        self.assertEqual([row["id"] for row in response.json()], [self.cs2.id])
+
+    def test_pure_python(self):
+        """The scores are the same without NumPy."""
+        expected = self.post({"majors": [self.major1.id, self.major2.id]}).json()
+        with mock.patch("calculator.scoring.numpy", None):
+            matrix = WeightMatrix.for_criteria_sets([self.cs1.id, self.cs3.id])
+        self.assertIsInstance(matrix.weights, list)
+        with mock.patch("calculator.scoring.numpy", None):
+            response = self.post({"majors": [self.major1.id, self.major2.id]})
+        self.assertEqual(response.json(), expected)
+
+    def test_query_count(self):
+        """The number of queries does not depend on the number of CriteriaSets."""
+        for _ in range(30):
+            self.create_criteria_set(self.major1, (self.maths, 40), (self.physics, 60))
+        with CaptureQueriesContext(connection) as context:
+            response = self.post({"majors": [self.major1.id]})
+        self.assertEqual(len(response.json()), 32)
+        self.assertEqual(len([q for q in context if "calculator_" in q["sql"]]), 3)
+
+    def test_invalid_data(self):
+        """The majors and criteria_sets must be lists of ids."""
+        for data in ({"majors": 1}, {"criteria_sets": ["a"]}, {"majors": [True]}):
+            response = self.post(data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_not_logged_in(self):
+        """Scores are only computed for logged in users."""
+        self.client.logout()
+        response = self.post({"majors": [self.major1.id]})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
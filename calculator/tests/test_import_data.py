@@ -0,0 +1,299 @@
+"""Tests for the bulk TCAS data loader."""
+
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from calculator.benchmark_import import time_parse, write_synthetic_csv
+from calculator.import_data import (
+    DEMO_UNIVERSITIES,
+    get_non_duplicate_major_sample,
+    ingest_score_file,
+    load_all,
+    load_criteria,
+    parse_bool,
+    parse_criteria,
+    read_csv,
+    read_major_rows,
+    year_from_file_name,
+)
+from calculator.models import (
+    Criterion,
+    CriteriaSet,
+    Exams,
+    IngestionManifest,
+    Major,
+    ScoreHistory,
+    University,
+)
+
+
+class LoadTcasTest(TestCase):
+    """Test loading the admission data from the data files."""
+
+    def test_load_data(self):
+        """All tables are loaded with a fixed number of queries."""
+        with CaptureQueriesContext(connection) as context:
+            stats = load_all()
+        created = {table.table: table.created for table in stats}
+        self.assertEqual(created["University"], University.objects.count())
+        self.assertEqual(created["University"], 3)
+        self.assertEqual(created["Major"], Major.objects.count())
+        self.assertEqual(created["ScoreHistory"], ScoreHistory.objects.count())
+        self.assertGreater(created["Criterion"], 0)
+        self.assertLess(len(context), 40)
+
+    def test_load_twice(self):
+        """Loading the same data again does not change anything."""
+        load_all()
+        counts = (CriteriaSet.objects.count(), ScoreHistory.objects.count())
+        for table in load_all():
+            self.assertEqual((table.created, table.updated), (0, 0), table.table)
+        self.assertEqual(
+            (CriteriaSet.objects.count(), ScoreHistory.objects.count()), counts
+        )
+
+    def test_load_updates_changed_rows(self):
+        """With force, rows that were changed since the last load are updated."""
+        load_all()
+        history = ScoreHistory.objects.first()
+        history.min_score = 0
+        history.save()
+        Major.objects.filter(code=history.major.code).update(name="Renamed")
+        stats = {table.table: table for table in load_all(force=True)}
+        self.assertEqual(stats["ScoreHistory"].updated, 1)
+        self.assertEqual(stats["Major"].updated, 1)
+        history.refresh_from_db()
+        self.assertNotEqual(history.min_score, 0)
+        self.assertNotEqual(history.major.name, "Renamed")
+
+    def test_command(self):
+        """The load_tcas command reports every table."""
+        out = StringIO()
+        call_command("load_tcas", stdout=out)
+        for table in ("University", "Faculty", "Major", "Exams", "ScoreHistory"):
+            self.assertIn(f"{table}: ", out.getvalue())
+
+
+HEADER = (
+    "สถาบัน,วิทยาเขต,รหัสหลักสูตร,คณะ,หลักสูตร,รายละเอียด,รับ,สมัคร,ผ่าน(รอบ2),"
+    "คะแนนต่ำสุด หลังประมวลผลรอบ 2,คะแนนสูงสุด หลังประมวลผลรอบ 2\n"
+)
+
+
+class ReadMajorRowsTest(TestCase):
+    """Test parsing the TCAS csv file."""
+
+    def test_skip_duplicates(self):
+        """Duplicate rows are skipped and the file order is kept."""
+        lines = [
+            HEADER,
+            'Uni A,Main,A1,Eng,Major 1,,10,"1,000",9,50.5,90\n',
+            "Uni A,Main,A2,Eng,Major 2,Plan,10,100,9,40,80\n",
+            'Uni A,Main,A1,Eng,Major 1,,10,"1,000",9,50.5,90\n',
+            "Uni B,Main,B1,Arts,Major 3,,5,50,5,30,70\n",
+        ]
+        rows = list(read_major_rows(lines, universities=None, faculties=None))
+        self.assertEqual([row["major_code"] for row in rows], ["A1", "A2", "B1"])
+        self.assertEqual(rows[0]["register"], 1000)
+        self.assertEqual(rows[1]["criteria_set"], "Plan")
+
+    def test_filter_university_and_faculty(self):
+        """Only rows of the given universities and faculties are kept."""
+        lines = [
+            HEADER,
+            "Uni A,Main,A1,Eng,Major 1,,10,100,9,50,90\n",
+            "Uni A,Main,A2,Arts,Major 2,,10,100,9,40,80\n",
+            "Uni B,Main,B1,Eng,Major 3,,5,50,5,30,70\n",
+        ]
+        rows = read_major_rows(lines, universities=["Uni A"], faculties=["Eng"])
+        self.assertEqual([row["major_code"] for row in rows], ["A1"])
+
+    def test_demo_sample(self):
+        """By default only the demo universities are read."""
+        rows = get_non_duplicate_major_sample()
+        self.assertTrue(rows)
+        self.assertTrue(all(row["university"] in DEMO_UNIVERSITIES for row in rows))
+
+    def test_synthetic_file(self):
+        """A file of 100,000 rows with 50,000 duplicates is read in one pass."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "synthetic.csv")
+            write_synthetic_csv(path, 100_000, 50_000)
+            unique, _ = time_parse(path)
+        self.assertEqual(unique, 50_000)
+
+
+class IngestScoreFileTest(TestCase):
+    """Test loading the score history of several years."""
+
+    ROWS = [
+        "Uni A,Main,A1,Eng,Major 1,,10,100,9,50.5,90\n",
+        "Uni A,Main,A2,Eng,Major 2,Plan,10,100,9,40,80\n",
+        "Uni B,Main,B1,Arts,Major 3,,5,50,5,30,70\n",
+    ]
+
+    def setUp(self):
+        """Create a directory for the TCAS files."""
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name: str, rows: list[str]) -> str:
+        """Write a TCAS file and return its path."""
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8-sig") as f:
+            f.writelines([HEADER, *rows])
+        return path
+
+    def ingest(self, year: int, path: str, force: bool = False) -> dict:
+        """Load every row of a file, return the stats by table."""
+        stats = ingest_score_file(
+            year, path, universities=None, faculties=None, force=force
+        )
+        return {table.table: (table.created, table.updated) for table in stats}
+
+    def test_several_years(self):
+        """Each year gets its own ScoreHistory, the majors are shared."""
+        self.ingest(2566, self.write("TCAS66.csv", self.ROWS))
+        stats = self.ingest(2567, self.write("TCAS67.csv", self.ROWS))
+        self.assertEqual(stats["Major"], (0, 0))
+        self.assertEqual(stats["ScoreHistory"], (3, 0))
+        self.assertEqual(Major.objects.count(), 3)
+        self.assertEqual(ScoreHistory.objects.filter(year=2566).count(), 3)
+        self.assertEqual(ScoreHistory.objects.filter(year=2567).count(), 3)
+        self.assertEqual(IngestionManifest.objects.count(), 2)
+
+    def test_unchanged_file(self):
+        """Loading the same file again only reads the manifest."""
+        path = self.write("TCAS67.csv", self.ROWS)
+        self.ingest(2567, path)
+        with CaptureQueriesContext(connection) as context:
+            stats = self.ingest(2567, path)
+        self.assertEqual(stats, {})
+        self.assertEqual(len(context), 1)
+
+    def test_corrected_file(self):
+        """Only the rows that changed are written."""
+        self.ingest(2567, self.write("TCAS67.csv", self.ROWS))
+        rows = [*self.ROWS]
+        rows[1] = "Uni A,Main,A2,Eng,Major 2,Plan,10,100,9,45,80\n"
+        stats = self.ingest(2567, self.write("TCAS67_fixed.csv", rows))
+        self.assertEqual(stats["University"], (0, 0))
+        self.assertEqual(stats["ScoreHistory"], (0, 1))
+        history = ScoreHistory.objects.get(major__code="A2", year=2567)
+        self.assertEqual(history.min_score, 45)
+        self.assertEqual(ScoreHistory.objects.count(), 3)
+        manifest = IngestionManifest.objects.get(year=2567)
+        self.assertEqual(manifest.source, "TCAS67_fixed.csv")
+
+    def test_criteria_set_with_several_rows(self):
+        """Rows of one major and criteria set with different scores are all kept."""
+        rows = [*self.ROWS, "Uni A,Main,A2,Eng,Major 2,Plan,10,120,9,42,85\n"]
+        stats = self.ingest(2567, self.write("TCAS67.csv", rows))
+        self.assertEqual(stats["CriteriaSet"], (3, 0))
+        self.assertEqual(stats["ScoreHistory"], (4, 0))
+        scores = ScoreHistory.objects.filter(major__code="A2").values_list(
+            "min_score", "max_score", "register"
+        )
+        self.assertEqual(sorted(scores), [(40, 80, 100), (42, 85, 120)])
+
+    def test_fractional_count(self):
+        """A count stored as an integer matches its row when the file is reloaded."""
+        path = self.write(
+            "TCAS67.csv", ["Uni A,Main,A1,Eng,Major 1,,10,100,9.5,50,90\n"]
+        )
+        self.ingest(2567, path)
+        self.assertEqual(ScoreHistory.objects.get().admitted, 9)
+        stats = self.ingest(2567, path, force=True)
+        self.assertEqual(stats["ScoreHistory"], (0, 0))
+
+    def test_forced_reload_of_several_rows(self):
+        """Loading a file with several rows per criteria set again writes nothing."""
+        rows = [*self.ROWS, "Uni A,Main,A2,Eng,Major 2,Plan,10,120,9,42,85\n"]
+        path = self.write("TCAS67.csv", rows)
+        self.ingest(2567, path)
+        scores = list(ScoreHistory.objects.order_by("id").values())
+        for _ in range(2):
+            stats = self.ingest(2567, path, force=True)
+            self.assertEqual(
+                sum(created + updated for created, updated in stats.values()), 0
+            )
+        self.assertEqual(list(ScoreHistory.objects.order_by("id").values()), scores)
+        manifest = IngestionManifest.objects.get(year=2567)
+        self.assertEqual(len(manifest.row_hashes), 4)
+
+    def test_corrected_row_of_several(self):
+        """Correcting one row of a criteria set updates only that row."""
+        rows = [*self.ROWS, "Uni A,Main,A2,Eng,Major 2,Plan,10,120,9,42,85\n"]
+        self.ingest(2567, self.write("TCAS67.csv", rows))
+        rows[3] = "Uni A,Main,A2,Eng,Major 2,Plan,10,120,9,43,85\n"
+        stats = self.ingest(2567, self.write("TCAS67_fixed.csv", rows))
+        self.assertEqual(stats["ScoreHistory"], (0, 1))
+        scores = ScoreHistory.objects.filter(major__code="A2").values_list(
+            "min_score", flat=True
+        )
+        self.assertEqual(sorted(scores), [40, 43])
+        manifest = IngestionManifest.objects.get(year=2567)
+        self.assertEqual(len(manifest.row_hashes), 4)
+
+    def test_year_from_file_name(self):
+        """The year is read from TCAS file names."""
+        self.assertEqual(year_from_file_name("data/TCAS67_maxmin.csv"), 2567)
+        self.assertEqual(year_from_file_name("data/tcas68.csv"), 2568)
+        self.assertIsNone(year_from_file_name("data/scores.csv"))
+
+
+class ParseCriteriaTest(TestCase):
+    """Test parsing the cells of criteria.csv and exams.csv."""
+
+    def test_quoted_json(self):
+        """A JSON object wrapped in a quoted string is parsed."""
+        cell = (
+            """'{"GPAX": {"min_score": 2, "weight": 0}, """
+            """" TGAT ": {"min_score": 0, "weight": 20}}'"""
+        )
+        self.assertEqual(
+            parse_criteria(cell), {"GPAX": (0.0, 2.0), "TGAT": (20.0, 0.0)}
+        )
+
+    def test_plain_json(self):
+        """A JSON object without quotes is parsed."""
+        cell = '{"GPAX": {"min_score": 2, "weight": 0}}'
+        self.assertEqual(parse_criteria(cell), {"GPAX": (0.0, 2.0)})
+
+    def test_code_is_not_run(self):
+        """Cells with code are rejected instead of run."""
+        for cell in (
+            "__import__('os').getcwd()",
+            "'__import__(\"os\").getcwd()'",
+            '\'{"GPAX": {"weight": 1}}\'',
+            "'[1, 2]'",
+        ):
+            with self.assertRaises(ValueError):
+                parse_criteria(cell)
+
+    def test_parse_bool(self):
+        """True and False cells are parsed, anything else is rejected."""
+        self.assertTrue(parse_bool("True"))
+        self.assertFalse(parse_bool(" False"))
+        with self.assertRaises(ValueError):
+            parse_bool("print('hi')")
+
+    def test_real_criteria_file(self):
+        """Every cell of criteria.csv can be parsed."""
+        for row in read_csv("criteria.csv"):
+            self.assertTrue(parse_criteria(row["criteria"]))
+
+    def test_unknown_exam(self):
+        """Unknown exams are reported before anything is written."""
+        load_all()
+        Exams.objects.filter(name="GPAX").delete()
+        count = Criterion.objects.count()
+        with self.assertRaises(Exams.DoesNotExist):
+            load_criteria(read_csv("criteria.csv"))
+        self.assertEqual(Criterion.objects.count(), count)
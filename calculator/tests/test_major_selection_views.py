@@ -1,7 +1,10 @@
 """Test cases for APIs relating to getting university-related data."""
 
 from .calculator_base_test_case import CalculatorExtraTestCase
+from calculator.models import CriteriaSet, Criterion, Exams, Major, University
+from django.test import override_settings
 from rest_framework import status
+from calculator.reference_cache import reference_cache
 
 
 class UniversityAPITest(CalculatorExtraTestCase):
@@ -79,9 +82,119 @@ class UniversityAPITest(CalculatorExtraTestCase):
         self.assertEqual(
             response.data["criteria"],
             [
-                {"id": 1, "min_score": 20.0, "weight": 10.0, "exam": 1},
-                {"id": 3, "min_score": 20.0, "weight": 40.0, "exam": 3},
-                {"id": 5, "min_score": 20.0, "weight": 40.0, "exam": 5},
+                {
+                    "id": 1,
+                    "min_score": 20.0,
+                    "weight": 10.0,
+                    "exam": 1,
+                    "exam_name": "Maths",
+                    "exam_max_score": 100.0,
+                },
+                {
+                    "id": 3,
+                    "min_score": 20.0,
+                    "weight": 40.0,
+                    "exam": 3,
+                    "exam_name": "English",
+                    "exam_max_score": 100.0,
+                },
+                {
+                    "id": 5,
+                    "min_score": 20.0,
+                    "weight": 40.0,
+                    "exam": 5,
+                    "exam_name": "Biology",
+                    "exam_max_score": 100.0,
+                },
             ],
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_criteria_query_count(self):
+        """Listing criteria runs the same queries however many there are."""
+        # session, user, reference data version, criteria sets, criteria
+        with self.assertNumQueries(5):
+            self.client.get("/api/criteria/?major=1")
+        major = Major.objects.get(pk=1)
+        exams = [Exams.objects.create(name=f"Extra #{i}") for i in range(5)]
+        for _ in range(10):
+            criteria_set = CriteriaSet.objects.create(major=major)
+            criteria_set.criteria.set(
+                Criterion.objects.create(exam=exam, weight=20) for exam in exams
+            )
+        with self.assertNumQueries(5):
+            response = self.client.get("/api/criteria/?major=1")
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(response.data[-1]["criteria"][0]["exam_name"], "Extra #0")
+
+    def test_retrieve_criteria_query_count(self):
+        """Retrieving one CriteriaSet runs a fixed number of queries."""
+        with self.assertNumQueries(5):
+            self.client.get("/api/criteria/1/")
+
+
+class ReferenceCacheTest(CalculatorExtraTestCase):
+    """Test the ETag and the caching of reference data responses."""
+
+    def test_etag_and_cache_control(self):
+        """Reference data responses can be cached and revalidated by clients."""
+        for url in [
+            "/api/universities/",
+            "/api/universities/1/",
+            "/api/faculties/?university=1",
+            "/api/majors/?faculty=1",
+            "/api/exams/",
+            "/api/exams/1/",
+            "/api/criteria/?major=1",
+            "/api/criteria/1/",
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertTrue(response["ETag"].startswith('W/"ref-'), url)
+            self.assertIn("max-age=", response["Cache-Control"])
+
+    def test_not_modified(self):
+        """A request with the current ETag gets a 304 without a body."""
+        etag = self.client.get("/api/exams/")["ETag"]
+        response = self.client.get("/api/exams/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        response = self.client.get("/api/exams/", headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_warm_request_runs_no_query(self):
+        """A cached response is sent without reading the database."""
+        self.client.logout()
+        first = self.client.get("/api/majors/?faculty=1")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/majors/?faculty=1")
+        self.assertEqual(second.data, first.data)
+        self.assertGreater(reference_cache.hits, 0)
+
+    def test_changes_invalidate_the_cache(self):
+        """Changing reference data changes the ETag and the response."""
+        first = self.client.get("/api/universities/")
+        University.objects.create(name="Chulalongkorn")
+        response = self.client.get(
+            "/api/universities/", headers={"If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(len(response.data), 3)
+
+    @override_settings(REFERENCE_VERSION_TTL=0)
+    def test_version_is_read_again_after_ttl(self):
+        """Every process reads the version again when the TTL has passed."""
+        self.client.logout()
+        self.client.get("/api/exams/")
+        with self.assertNumQueries(1):
+            self.client.get("/api/exams/")
+
+    def test_errors_are_not_cached(self):
+        """Responses other than 200 do not get an ETag."""
+        response = self.client.get("/api/exams/1000/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header("ETag"))
+        response = self.client.get("/api/majors/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
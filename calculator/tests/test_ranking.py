@@ -0,0 +1,122 @@
+"""Tests for ranking every CriteriaSet against a student's scores."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from calculator.models import (
+    CriteriaSet,
+    Criterion,
+    DataVersion,
+    Exams,
+    Major,
+    ScoreHistory,
+    StudentExamScore,
+)
+from calculator.ranking import clear_ranking_index
+from .calculator_base_test_case import CalculatorBaseTestCase
+
+
+class RankingTest(CalculatorBaseTestCase):
+    """Test the ranking API."""
+
+    def setUp(self):
+        """Set up exams, scores and 3 CriteriaSets with score history."""
+        super().setUp()
+        clear_ranking_index()
+        self.maths = Exams.objects.create(name="Maths")
+        self.physics = Exams.objects.create(name="Physics", max_score=300)
+        StudentExamScore.objects.create(student=self.user1, exam=self.maths, score=60)
+        StudentExamScore.objects.create(
+            student=self.user1, exam=self.physics, score=150
+        )
+        majors = Major.objects.all()
+        # scores: 55, 60 and 50
+        self.cs1 = self.create_criteria_set(majors[0], 50, 50, min_score=40)
+        self.cs2 = self.create_criteria_set(majors[1], 100, 0, min_score=65)
+        self.cs3 = self.create_criteria_set(majors[2], 0, 100, min_score=30)
+        # an older year with a higher cutoff is ignored
+        self.create_history(self.cs3, 80, 2566)
+
+    def create_criteria_set(
+        self, major: Major, maths: float, physics: float, min_score: float
+    ) -> CriteriaSet:
+        """Create a CriteriaSet with a maths and physics weight and a cutoff."""
+        criteria_set = CriteriaSet.objects.create(major=major)
+        criteria_set.criteria.add(
+            Criterion.objects.create(exam=self.maths, weight=maths),
+            Criterion.objects.create(exam=self.physics, weight=physics),
+        )
+        self.create_history(criteria_set, min_score, 2567)
+        return criteria_set
+
+    def create_history(self, criteria_set: CriteriaSet, min_score: float, year: int):
+        """Create the ScoreHistory of a CriteriaSet."""
+        ScoreHistory.objects.create(
+            major=criteria_set.major,
+            criteria_set=criteria_set,
+            min_score=min_score,
+            max_score=90,
+            year=year,
+        )
+
+    def test_ranking(self):
+        """CriteriaSets are ranked by the margin to their latest cutoff."""
+        response = self.client.get("/api/exam_score/ranking/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual(
+            [row["id"] for row in results], [self.cs3.id, self.cs1.id, self.cs2.id]
+        )
+        self.assertAlmostEqual(results[0]["margin"], 20)
+        self.assertAlmostEqual(results[2]["margin"], -5)
+        self.assertEqual(results[0]["year"], 2567)
+        self.assertEqual(
+            results[0]["university_name"], self.cs3.major.faculty.university.name
+        )
+
+    def test_top(self):
+        """Only the top results are returned."""
+        response = self.client.get("/api/exam_score/ranking/?top=1")
+        self.assertEqual([row["id"] for row in response.json()], [self.cs3.id])
+        for top in ("0", "abc", "100000"):
+            response = self.client.get(f"/api/exam_score/ranking/?top={top}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_warm_ranking_query_count(self):
+        """Once the index is built, a ranking reads the version and the scores."""
+        self.client.get("/api/exam_score/ranking/")
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/api/exam_score/ranking/")
+        self.assertEqual(len([q for q in context if "calculator_" in q["sql"]]), 2)
+
+    def test_rebuilt_after_criteria_change(self):
+        """The index is rebuilt when the criteria change."""
+        self.client.get("/api/exam_score/ranking/")
+        criterion = self.cs2.criteria.get(exam=self.physics)
+        criterion.weight = 100
+        criterion.save()
+        results = self.client.get("/api/exam_score/ranking/").json()
+        self.assertEqual(results[0]["id"], self.cs2.id)
+
+    def test_version_bumped(self):
+        """Saving, deleting and linking reference data bumps the version."""
+        version = DataVersion.objects.current()
+        exam = Exams.objects.create(name="Biology")
+        self.assertEqual(DataVersion.objects.current(), version + 1)
+        self.cs1.criteria.add(Criterion.objects.create(exam=exam, weight=0))
+        self.assertEqual(DataVersion.objects.current(), version + 3)
+        exam.delete()
+        self.assertGreater(DataVersion.objects.current(), version + 3)
+
+    def test_bump_time(self):
+        """Every bump also records when it happened."""
+        DataVersion.objects.bump("test")
+        first = DataVersion.objects.get(name="test").updated_at
+        DataVersion.objects.bump("test")
+        self.assertGreater(DataVersion.objects.get(name="test").updated_at, first)
+
+    def test_not_logged_in(self):
+        """Rankings are only computed for logged in users."""
+        self.client.logout()
+        response = self.client.get("/api/exam_score/ranking/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
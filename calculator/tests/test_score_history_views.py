@@ -104,3 +104,12 @@ class ScoreHistoryViewTest(CalculatorExtraTestCase):
         self.assertEqual(len(response1.data), 0)
         response2 = self.client.get(f"/api/score_history/?major={1}&year=4000")
         self.assertEqual(len(response2.data), 0)
+
+    def test_paginate_score_history(self):
+        """The ScoreHistory of a major can be listed one page at a time."""
+        response = self.client.get("/api/score_history/?major=1&page_size=3")
+        ids = [row["id"] for row in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        ids += [row["id"] for row in response.data["results"]]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(ids, [self.sh1.id, self.sh2.id, self.sh3.id, self.sh4.id])
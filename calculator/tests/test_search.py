@@ -0,0 +1,109 @@
+"""Tests for searching majors."""
+
+from rest_framework import status
+from calculator.models import Major
+from calculator.search import normalize, search_majors
+from .calculator_base_test_case import CalculatorBaseTestCase
+
+
+class NormalizeTest(CalculatorBaseTestCase):
+    """Test normalizing names for searching."""
+
+    def test_normalize(self):
+        """Case, Thai tone marks, common words and punctuation are removed."""
+        self.assertEqual(normalize("Computer  ENGINEERING!"), "computer engineering")
+        self.assertEqual(normalize("ขอนแก่น"), "ขอนแกน")
+        self.assertEqual(normalize("คำนวณ"), normalize("คํานวณ"))
+        self.assertEqual(
+            normalize("หลักสูตรวิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์"),
+            "วิศวกรรมศาสตรบัณฑิต วิศวกรรมคอมพิวเตอร",
+        )
+
+
+class SearchTest(CalculatorBaseTestCase):
+    """Test the major search API."""
+
+    def setUp(self):
+        """Add majors with Thai and English names."""
+        super().setUp()
+        self.computer = Major.objects.create(
+            name="หลักสูตรวิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์",
+            code="10010121300501A",
+            faculty=self.faculty1,
+        )
+        self.energy = Major.objects.create(
+            name="หลักสูตรวิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมพลังงาน",
+            code="10010121300601A",
+            faculty=self.faculty2,
+        )
+        self.software = Major.objects.create(
+            name="Software Engineering (International Program)",
+            code="10020121300101B",
+            faculty=self.faculty2,
+        )
+
+    def ids(self, query: str, limit: int = 20) -> list[int]:
+        """Get the ids of the majors found by a query."""
+        return [major["id"] for major in search_majors(query, limit)]
+
+    def test_search_thai_name(self):
+        """A part of a Thai name finds the major."""
+        self.assertEqual(self.ids("คอมพิวเตอร์"), [self.computer.id])
+        self.assertEqual(self.ids("วิศวกรรมพลังงาน")[0], self.energy.id)
+
+    def test_prefix(self):
+        """The beginning of a name or code finds the major."""
+        self.assertEqual(self.ids("softw"), [self.software.id])
+        self.assertEqual(self.ids("1002012")[0], self.software.id)
+
+    def test_typo(self):
+        """A name with a missing or wrong letter still finds the major."""
+        self.assertEqual(self.ids("คอมพวเตอร์")[0], self.computer.id)
+        self.assertEqual(self.ids("sofware engineering")[0], self.software.id)
+
+    def test_faculty_and_university(self):
+        """Majors are found by the name of their university too."""
+        results = search_majors("Kasetsart")
+        self.assertEqual(
+            {major["id"] for major in results},
+            set(
+                Major.objects.filter(faculty__university=self.university1).values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        self.assertEqual(results[0]["university"]["name"], "Kasetsart")
+
+    def test_no_match(self):
+        """A query that matches nothing or is too short finds no major."""
+        self.assertEqual(self.ids("xyzzy"), [])
+        self.assertEqual(self.ids(""), [])
+        self.assertEqual(self.ids("!"), [])
+
+    def test_index_is_rebuilt(self):
+        """A new major is found after the reference data changed."""
+        self.assertEqual(self.ids("ปัญญาประดิษฐ์"), [])
+        ai = Major.objects.create(
+            name="วิทยาศาสตรบัณฑิต (ปัญญาประดิษฐ์)",
+            code="40730105213702A",
+            faculty=self.faculty1,
+        )
+        self.assertEqual(self.ids("ปัญญาประดิษฐ์"), [ai.id])
+
+    def test_search_api(self):
+        """The API returns the best majors with their faculty and university."""
+        response = self.client.get("/api/majors/search/?q=คอมพิวเตอร์&limit=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        major = response.data[0]
+        self.assertEqual(major["id"], self.computer.id)
+        self.assertEqual(major["code"], "10010121300501A")
+        self.assertEqual(major["faculty"]["id"], self.faculty1.id)
+        self.assertEqual(major["university"]["name"], "Kasetsart")
+        self.assertEqual(major["score"], 1.0)
+
+    def test_invalid_limit(self):
+        """The limit must be a number from 1 to 100."""
+        for limit in ["0", "101", "abc"]:
+            response = self.client.get(f"/api/majors/search/?q=a&limit={limit}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
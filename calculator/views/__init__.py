@@ -3,3 +3,4 @@ from .exams import ExamsViewSet
 from .university import UniversityViewSet, FacultyViewSet, MajorViewSet, CriteriaViewSet
 from .student_exam_score import StudentExamScoreViewSet
 from .score_history import ScoreHistoryViewSet
+from .catalog import CatalogViewSet
@@ -0,0 +1,34 @@
+"""Async version of the reference data API endpoints for the ASGI mode."""
+
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from calculator.reference_cache import (
+    is_not_modified,
+    reference_cache,
+    reference_headers,
+    request_key,
+)
+from mysite.async_api import json_response
+
+
+async def reference_data(
+    request: HttpRequest, user: AbstractBaseUser | AnonymousUser, *args, **kwargs
+) -> HttpResponse | None:
+    """Answer a reference data request from the cache of the ViewSets.
+
+    A request that is not cached yet is left to the ViewSet, which builds
+    the response and caches it for the next requests.
+
+    :param request: The HTTP request.
+    :param user: The current user.
+    :return: The cached response, or None if it is not cached.
+    """
+    stamp = await reference_cache.astamp()
+    headers = reference_headers(stamp)
+    if is_not_modified(request, headers["ETag"]):
+        return HttpResponse(status=304, headers=headers)
+    # the ViewSet counts the miss
+    data = reference_cache.get(stamp, request_key(request), count_miss=False)
+    if data is None:
+        return None
+    return json_response(data, headers=headers)
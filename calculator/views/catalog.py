@@ -0,0 +1,61 @@
+"""API for the University, Faculty, Major and CriteriaSet tree."""
+
+import re
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+from calculator.catalog import LEVELS, CatalogDocument, build_catalog
+from calculator.reference_cache import (
+    is_not_modified,
+    reference_cache,
+    reference_headers,
+)
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class CatalogViewSet(viewsets.ViewSet):
+    """API to get every university, faculty, major and CriteriaSet at once."""
+
+    def list(self, request) -> HttpResponse:
+        """Get the whole tree, or the subtree of a university, faculty or major.
+
+        The document is cached for the reference data version and sent gzipped
+        if the client accepts it.
+
+        :param request: GET request, with an optional university, faculty or
+            major id.
+        :return: Response with the tree, 400 if an id is not a number.
+        """
+        try:
+            subtree = {
+                level: int(request.query_params[level])
+                for level in LEVELS
+                if request.query_params.get(level)
+            }
+        except ValueError:
+            return Response(
+                {"error": "ids must be numbers"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        stamp = reference_cache.stamp()
+        headers = reference_headers(stamp)
+        if is_not_modified(request, headers["ETag"]):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        key = ("catalog", tuple(sorted(subtree.items())))
+        document = reference_cache.get(stamp, key)
+        if document is None:
+            document = CatalogDocument.from_tree(build_catalog(**subtree))
+            reference_cache.set(stamp, key, document)
+        if ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")):
+            response = HttpResponse(
+                document.gzipped,
+                content_type="application/json",
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+        else:
+            response = HttpResponse(
+                document.content, content_type="application/json", headers=headers
+            )
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
@@ -4,11 +4,13 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 from calculator.serializers import ExamSerializer
 from calculator.models import Exams
+from calculator.reference_cache import cache_reference_data
 
 
 class ExamsViewSet(viewsets.ViewSet):
     """ViewSet for handling getting Exam information."""
 
+    @cache_reference_data
     def list(self, request) -> Response:
         """List all Exam objects, based on the query parameters.
 
@@ -27,6 +29,7 @@ class ExamsViewSet(viewsets.ViewSet):
         serializer = ExamSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @cache_reference_data
     def retrieve(self, request, pk=None) -> Response:
         """Retrieve ONE exam object.
 
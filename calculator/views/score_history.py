@@ -4,6 +4,7 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 from calculator.serializers import ScoreHistorySerializer
 from calculator.models import ScoreHistory
+from mysite.pagination import KeysetPagination
 
 
 class ScoreHistoryViewSet(viewsets.ModelViewSet):
@@ -11,10 +12,14 @@ class ScoreHistoryViewSet(viewsets.ModelViewSet):
 
     queryset = ScoreHistory.objects.all()
     serializer_class = ScoreHistorySerializer
+    pagination_class = KeysetPagination
 
     def list(self, request) -> Response:
         """List all ScoreHistory objects based on query parameters.
 
+        Add page_size or cursor to the query parameters to get one page
+        of the list at a time.
+
         :param request: GET Request
         :return: Response with ScoreHistory data.
         """
@@ -23,25 +28,20 @@ class ScoreHistoryViewSet(viewsets.ModelViewSet):
         year = request.query_params.get("year")
 
         if not criteria_set and major is not None:
-            if year is not None:
-                queryset = ScoreHistory.objects.filter(major=major, year=year)
-            else:
-                queryset = ScoreHistory.objects.filter(major=major)
-            return Response(
-                self.serializer_class(queryset, many=True).data,
-                status=status.HTTP_200_OK,
-            )
-
-        if criteria_set is not None:
-            if year is not None:
-                queryset = ScoreHistory.objects.filter(
-                    criteria_set=criteria_set, year=year
-                )
-            else:
-                queryset = ScoreHistory.objects.filter(criteria_set=criteria_set)
-            return Response(
-                self.serializer_class(queryset, many=True).data,
-                status=status.HTTP_200_OK,
+            queryset = ScoreHistory.objects.filter(major=major)
+        elif criteria_set is not None:
+            queryset = ScoreHistory.objects.filter(criteria_set=criteria_set)
+        else:
+            return super().list(request)
+        if year is not None:
+            queryset = queryset.filter(year=year)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                self.serializer_class(page, many=True).data
             )
-
-        return super().list(request)
+        return Response(
+            self.serializer_class(queryset, many=True).data,
+            status=status.HTTP_200_OK,
+        )
@@ -6,8 +6,12 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from calculator.models import StudentExamScore, Major
+from django.db.models import F, Q
+from calculator.models import CriteriaSet, StudentExamScore, Major
+from calculator.ranking import DEFAULT_TOP, MAX_TOP, rank_criteria_sets
+from calculator.scoring import score_criteria_sets, student_scores
 from calculator.serializers import (
     ExamScoreSerializer,
     CriterionSerializer,
@@ -79,21 +83,70 @@ class StudentExamScoreViewSet(viewsets.ViewSet):
             major_code = Major.objects.get(pk=int(request.data["major_id"])).code
 
         result = 0
+        scores = student_scores(self.request.user)
         for criterion in serializer.validated_data:
-            try:
-                exam = criterion["exam"]
-                student_score = StudentExamScore.objects.get(
-                    exam=exam, student=self.request.user
-                ).score
-                result += (
-                    student_score * (100 / exam.max_score) * criterion["weight"] / 100
-                )
-            except StudentExamScore.DoesNotExist:
-                txt = f"SCORE FOR {criterion['exam'].name.upper()} DOES NOT EXIST"
+            exam = criterion["exam"]
+            if exam.id not in scores:
+                txt = f"SCORE FOR {exam.name.upper()} DOES NOT EXIST"
                 messages.warning(request, txt)
+                continue
+            result += (
+                scores[exam.id] * (100 / exam.max_score) * criterion["weight"] / 100
+            )
 
         request.session["has_score"] = True
         request.session["score"] = result
         request.session["criteria_id"] = criteria_id
         request.session["major"] = major_code
         return redirect(reverse("calculator:score"))
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def scores(self, request: HttpRequest) -> Response:
+        """Calculate the user's score for many majors at once.
+
+        The body has a list of major ids, a list of CriteriaSet ids or both:
+        {"majors": [1, 2], "criteria_sets": [5]}
+        Every CriteriaSet of the majors is scored.
+
+        :param request: POST request
+        :return: 400 if the lists are not valid. Otherwise, the score of each
+        CriteriaSet and the exams the user has no score for.
+        """
+        majors = request.data.get("majors", [])
+        criteria_set_ids = request.data.get("criteria_sets", [])
+        if (
+            not isinstance(majors, list)
+            or not isinstance(criteria_set_ids, list)
+            or not all(type(i) is int for i in majors + criteria_set_ids)
+        ):
+            return Response(
+                {"error": "majors and criteria_sets must be lists of ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        criteria_sets = (
+            CriteriaSet.objects.filter(Q(major__in=majors) | Q(id__in=criteria_set_ids))
+            .order_by("major_id", "id")
+            .values("id", "name", "major", major_name=F("major__name"))
+        )
+        results = score_criteria_sets(request.user, criteria_sets)
+        return Response(results, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def ranking(self, request: HttpRequest) -> Response:
+        """Rank every CriteriaSet by how far the user's score is above its cutoff.
+
+        The cutoff is the min_score of the latest ScoreHistory of the CriteriaSet.
+        The query parameter top sets the number of results, 20 by default.
+
+        :param request: GET request
+        :return: 400 if top is not valid. Otherwise, the top CriteriaSets with
+        the user's score, the cutoff scores and the margin to the min_score.
+        """
+        top = request.query_params.get("top", str(DEFAULT_TOP))
+        if not top.isdigit() or not 0 < int(top) <= MAX_TOP:
+            return Response(
+                {"error": f"top must be a number from 1 to {MAX_TOP}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = rank_criteria_sets(request.user, int(top))
+        return Response(results, status=status.HTTP_200_OK)
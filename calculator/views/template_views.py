@@ -6,6 +6,7 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from manager.roles import get_role
 
 
 class ALevelView(PermissionRequiredMixin, generic.TemplateView):
@@ -13,6 +14,10 @@ class ALevelView(PermissionRequiredMixin, generic.TemplateView):
 
     permission_required = "manager.is_taking_A_levels"
 
+    def has_permission(self) -> bool:
+        """Check the role of the user instead of querying their permissions."""
+        return get_role(self.request.user).is_taking_a_levels
+
     def handle_no_permission(self) -> HttpResponseRedirect:
         """Redirect user to profile page when user has no permission."""
         messages.error(self.request, "You don't have permission to A-level Calculator.")
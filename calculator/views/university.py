@@ -2,7 +2,11 @@
 
 from calculator.models import University, Faculty, Major, CriteriaSet
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from mysite.pagination import KeysetPagination
+from calculator.reference_cache import cache_reference_data
+from calculator.search import DEFAULT_LIMIT, MAX_LIMIT, search_majors
 from calculator.serializers import (
     UniversitySerializer,
     FacultySerializer,
@@ -16,11 +20,31 @@ class UniversityViewSet(viewsets.ModelViewSet):
 
     queryset = University.objects.all()
     serializer_class = UniversitySerializer
+    pagination_class = KeysetPagination
+
+    @cache_reference_data
+    def list(self, request, *args, **kwargs) -> Response:
+        """List the universities, paginated if a cursor or page size is given.
+
+        :param request: GET request.
+        :return: Response with the universities.
+        """
+        return super().list(request, *args, **kwargs)
+
+    @cache_reference_data
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        """Retrieve one university.
+
+        :param request: GET request.
+        :return: Response with the university, 404 if it does not exist.
+        """
+        return super().retrieve(request, *args, **kwargs)
 
 
 class FacultyViewSet(viewsets.ViewSet):
     """API for faculty data."""
 
+    @cache_reference_data
     def list(self, request) -> Response:
         """List of faculty of a university.
 
@@ -38,6 +62,7 @@ class FacultyViewSet(viewsets.ViewSet):
 class MajorViewSet(viewsets.ViewSet):
     """API for major data."""
 
+    @cache_reference_data
     def list(self, request) -> Response:
         """List of majors belonging to a faculty.
 
@@ -51,23 +76,49 @@ class MajorViewSet(viewsets.ViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response({}, status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["get"])
+    def search(self, request) -> Response:
+        """Search majors by their name or code, or their faculty or university name.
+
+        The query parameter q is the search text, it may be a prefix or have
+        typos. The query parameter limit sets the number of results, 20 by default.
+
+        :param request: GET request.
+        :return: 400 if limit is not valid. Otherwise, the best matching majors
+        with their faculty, university and score.
+        """
+        limit = request.query_params.get("limit", str(DEFAULT_LIMIT))
+        if not limit.isdigit() or not 0 < int(limit) <= MAX_LIMIT:
+            return Response(
+                {"error": f"limit must be a number from 1 to {MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = search_majors(request.query_params.get("q", ""), int(limit))
+        return Response(results, status=status.HTTP_200_OK)
+
 
 class CriteriaViewSet(viewsets.ViewSet):
     """API to get a CriteriaSet(all criteria that the user can apply for this major)."""
 
+    @cache_reference_data
     def list(self, request) -> Response:
         """List all CriteriaSet that belongs to a Major.
 
+        Each criterion includes the name and max score of its exam.
+
         :param request: GET Request
         :return: All criteria of a major. None if
         """
         major_id = request.query_params.get("major")
         if major_id is not None:
-            queryset = CriteriaSet.objects.filter(major=major_id)
+            queryset = CriteriaSetSerializer.prefetch(
+                CriteriaSet.objects.filter(major=major_id)
+            )
             serializer = CriteriaSetSerializer(queryset, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response({}, status=status.HTTP_204_NO_CONTENT)
 
+    @cache_reference_data
     def retrieve(self, request, pk=None) -> Response:
         """Retrieve one CriteriaSet object.
 
@@ -76,7 +127,8 @@ class CriteriaViewSet(viewsets.ViewSet):
         :return: THE Criteria object.
         """
         try:
-            serializer = CriteriaSetSerializer(CriteriaSet.objects.get(id=pk))
+            queryset = CriteriaSetSerializer.prefetch(CriteriaSet.objects.all())
+            serializer = CriteriaSetSerializer(queryset.get(id=pk))
             return Response(serializer.data, status=status.HTTP_200_OK)
         except CriteriaSet.DoesNotExist:
             return Response(
@@ -0,0 +1,24 @@
+"""Gunicorn configuration, read from the working directory on start.
+
+SERVER_MODE selects how the site is served:
+
+- wsgi (default): sync workers running mysite.wsgi, start with ``gunicorn``.
+- asgi: uvicorn workers running mysite.asgi, where the hot read-only API
+  endpoints are async views, start with ``SERVER_MODE=asgi gunicorn``.
+  Persistent database connections are off by default in this mode, set
+  DB_POOL to reuse connections.
+
+The number of workers comes from WEB_CONCURRENCY like before, the port
+from PORT.
+"""
+
+from decouple import config
+
+SERVER_MODE = config("SERVER_MODE", default="wsgi").lower()
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "mysite.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "mysite.wsgi:application"
+    worker_class = "sync"
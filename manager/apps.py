@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'manager'
+
+    def ready(self):
+        # count the database connections of the process from the start
+        import mysite.db_stats  # noqa: F401
+        # invalidate cached roles when permissions change
+        import manager.roles  # noqa: F401
@@ -0,0 +1,152 @@
+"""A script to compare the read API under WSGI and under ASGI.
+
+Run it with ``python manage.py runscript manager.benchmark_asgi`` on a
+migrated database. It creates a user with tasks, events and estimate
+history, sends the same GET requests to the task, event, estimate history,
+velocity and exam lists through the WSGI handler from a pool of threads,
+like gunicorn sync or gthread workers, and through the ASGI handler from
+one event loop, like a uvicorn worker, then prints the requests per second
+and the 50th and 99th percentile latency of each. The user is deleted at
+the end.
+
+Both handlers run in this process, so the numbers compare the Django side
+of the two modes without a web server in front.
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+from calculator.models import Exams
+from manager.models import EstimateHistory, Event, Task, Taskboard
+
+REQUESTS = 2000
+CONCURRENCY = (8, 32)
+TASKS = 200
+EVENTS = 100
+DAYS = 365
+USERNAME = "asgi-benchmark"
+
+
+def create_data() -> tuple[User, list[str]]:
+    """Create the user and its data.
+
+    :return: the user and the URLs to request.
+    """
+    user = User.objects.create_user(username=USERNAME)
+    taskboard = Taskboard.objects.create(name="Benchmark", user=user)
+    now = timezone.now()
+    Task.objects.bulk_create(
+        Task(
+            title=f"Task {i}",
+            status="TODO",
+            end_date=now + timedelta(days=i % 60),
+            taskboard=taskboard,
+        )
+        for i in range(TASKS)
+    )
+    Event.objects.bulk_create(
+        Event(
+            title=f"Event {i}",
+            user=user,
+            start_date=now + timedelta(days=i % 60),
+            end_date=now + timedelta(days=i % 60, hours=1),
+        )
+        for i in range(EVENTS)
+    )
+    EstimateHistory.objects.filter(taskboard=taskboard).delete()
+    EstimateHistory.objects.bulk_create(
+        EstimateHistory(
+            taskboard=taskboard,
+            date=now - timedelta(days=i),
+            time_remaining=1000 + 3 * i,
+        )
+        for i in range(DAYS)
+    )
+    if not Exams.objects.exists():
+        Exams.objects.create(name="Benchmark exam")
+    start = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+    return user, [
+        "/api/tasks/",
+        f"/api/tasks/?taskboard={taskboard.id}&exclude=DONE",
+        f"/api/events/?start={start}",
+        f"/api/estimate_history/?taskboard={taskboard.id}",
+        f"/api/velocity/?taskboard={taskboard.id}&start={start}",
+        "/api/exams/",
+    ]
+
+
+def host() -> str:
+    """Get a host name the site accepts."""
+    hosts = [host for host in settings.ALLOWED_HOSTS if "*" not in host]
+    return hosts[0].lstrip(".") if hosts else "localhost"
+
+
+def report(label: str, seconds: float, latencies: list[float]) -> None:
+    """Print the throughput and latency of a run."""
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label}: {len(latencies) / seconds:.0f} requests/s, "
+        f"p50 {percentiles[49] * 1000:.1f}ms, p99 {percentiles[98] * 1000:.1f}ms"
+    )
+
+
+def run_wsgi(urls: list[str], cookies, threads: int) -> None:
+    """Send the requests through the WSGI handler from a pool of threads."""
+
+    def get(i: int) -> float:
+        client = Client(headers={"host": host()})
+        client.cookies = cookies
+        start = time.perf_counter()
+        response = client.get(urls[i % len(urls)])
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(get, range(REQUESTS)))
+    report(f"WSGI, {threads} threads", time.perf_counter() - start, latencies)
+
+
+async def run_asgi(urls: list[str], cookies, concurrency: int) -> None:
+    """Send the requests through the ASGI handler from one event loop."""
+    client = AsyncClient(headers={"host": host()})
+    client.cookies = cookies
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get(i: int) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(urls[i % len(urls)])
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(get(i) for i in range(REQUESTS)))
+    report(
+        f"ASGI, {concurrency} concurrent requests",
+        time.perf_counter() - start,
+        latencies,
+    )
+
+
+def run() -> None:
+    """Run the benchmark."""
+    user, urls = create_data()
+    client = Client(headers={"host": host()})
+    client.force_login(user)
+    try:
+        for concurrency in CONCURRENCY:
+            with override_settings(ROOT_URLCONF="mysite.urls"):
+                run_wsgi(urls, client.cookies, concurrency)
+            with override_settings(ROOT_URLCONF="mysite.asgi_urls"):
+                asyncio.run(run_asgi(urls, client.cookies, concurrency))
+    finally:
+        Session.objects.filter(session_key=client.session.session_key).delete()
+        user.delete()
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2024-11-20 10:12
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_estimate_history(apps, schema_editor):
+    """Keep only the latest EstimateHistory of each taskboard per day."""
+    EstimateHistory = apps.get_model("manager", "EstimateHistory")
+    duplicates = (
+        EstimateHistory.objects.values("taskboard", "date")
+        .annotate(count=Count("id"), latest=Max("id"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        EstimateHistory.objects.filter(
+            taskboard=row["taskboard"], date=row["date"]
+        ).exclude(pk=row["latest"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0010_merge_20241116_1328'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='userpermissions',
+            options={'managed': False, 'permissions': [('is_taking_A_levels', 'User who has access to the calculator'), ('is_parent', 'User who has access to the parent dashboard'), ('is_verified', 'User who has finished setting up their account')]},
+        ),
+        migrations.RunPython(
+            remove_duplicate_estimate_history, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='estimatehistory',
+            constraint=models.UniqueConstraint(fields=('taskboard', 'date'), name='one estimate history per taskboard per day'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0011_estimatehistory_unique_taskboard_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BurndownSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.JSONField(default=list)),
+                ('week', models.JSONField(default=list)),
+                ('month', models.JSONField(default=list)),
+                ('taskboard', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='burndown_series', to='manager.taskboard')),
+            ],
+        ),
+    ]
@@ -7,3 +7,5 @@ from .estimate_history import EstimateHistory, EstimateHistoryManager
 from .event import Event
 from .taskboard import Taskboard
 from .task import Task
+from .burndown_series import BurndownSeries
+from .cache_version import CacheVersion
@@ -0,0 +1,187 @@
+"""Module for the materialized burndown series of taskboards."""
+
+from datetime import date, timedelta
+from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from .taskboard import Taskboard
+
+
+def start_of_week(day: date) -> date:
+    """Return the Monday of the week of the given day."""
+    return day - timedelta(days=day.weekday())
+
+
+def start_of_month(day: date) -> date:
+    """Return the first day of the month of the given day."""
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    """Return the first day of the month after the given day."""
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+# interval name: (function to get the start of an interval,
+#                 function to get the start of the next interval)
+INTERVALS = {
+    "day": (lambda day: day, lambda day: day + timedelta(days=1)),
+    "week": (start_of_week, lambda day: day + timedelta(days=7)),
+    "month": (start_of_month, next_month),
+}
+
+
+def set_point(points: list, interval: str, day: date, value: int) -> None:
+    """Set the value of the interval containing day in a series.
+
+    Intervals between the last point and the given day are filled with the
+    value of the last point. Days before the last point are ignored.
+
+    :param points: The series as a list of [ISO date, value].
+    :param interval: The interval of the series, one of INTERVALS.
+    :param day: The day that has the new value.
+    :param value: The time remaining at the end of that day.
+    """
+    start, step = INTERVALS[interval]
+    key = start(day)
+    if points:
+        last_key = date.fromisoformat(points[-1][0])
+        if key < last_key:
+            return
+        if key == last_key:
+            points[-1][1] = value
+            return
+        last_value = points[-1][1]
+        gap = step(last_key)
+        while gap < key:
+            points.append([gap.isoformat(), last_value])
+            gap = step(gap)
+    points.append([key.isoformat(), value])
+
+
+class BurndownSeriesManager(models.Manager):
+    """A custom Manager for BurndownSeries model."""
+
+    def rebuild(self, taskboard_id: int) -> "BurndownSeries":
+        """Build the series of a taskboard from its EstimateHistory before today."""
+        from .estimate_history import EstimateHistory
+
+        series = BurndownSeries(taskboard_id=taskboard_id)
+        history = (
+            EstimateHistory.objects.filter(
+                taskboard=taskboard_id, date__lt=timezone.localdate()
+            )
+            .order_by("date")
+            .values_list("date", "time_remaining")
+        )
+        for day, value in history:
+            series.set_value(day, value)
+        if series.day:
+            yesterday = timezone.localdate() - timedelta(days=1)
+            series.set_value(yesterday, series.day[-1][1])
+        self.update_or_create(
+            taskboard_id=taskboard_id,
+            defaults={interval: getattr(series, interval) for interval in INTERVALS},
+        )
+        return series
+
+    def close_days(self, taskboard_id: int, before: date) -> "BurndownSeries | None":
+        """Add the days of a taskboard that ended since the series was updated.
+
+        This is called when a taskboard starts a new day, the EstimateHistory
+        of previous days no longer changes after that, and when the series is
+        read on a day without writes. Days without EstimateHistory keep the
+        value of the day before them. If the taskboard has no series yet, it
+        is built the next time it is read instead.
+
+        :param taskboard_id: The id of the taskboard.
+        :param before: The day that has just started.
+        :return: The updated series, None if the taskboard has none.
+        """
+        from .estimate_history import EstimateHistory
+
+        series = self.filter(taskboard=taskboard_id).first()
+        if series is None:
+            return None
+        last_day = series.day[-1][0] if series.day else None
+        history = EstimateHistory.objects.filter(
+            taskboard=taskboard_id, date__lt=before
+        )
+        if last_day:
+            history = history.filter(date__gt=last_day)
+        for day, value in history.order_by("date").values_list(
+            "date", "time_remaining"
+        ):
+            series.set_value(day, value)
+        if series.day:
+            # the days up to yesterday are over even if nothing was written
+            series.set_value(before - timedelta(days=1), series.day[-1][1])
+        if series.day and series.day[-1][0] != last_day:
+            series.save(update_fields=list(INTERVALS))
+        return series
+
+    def get_series(self, taskboard_id: int, interval: str) -> list:
+        """Return the series of a taskboard, filled up to today.
+
+        The series and today's time remaining are read with one query, the
+        days that ended without a write are added to the series first.
+
+        :param taskboard_id: The id of the taskboard.
+        :param interval: The interval of the series, one of INTERVALS.
+        :return: A list of [ISO date, time remaining].
+        """
+        from .estimate_history import EstimateHistory
+
+        today = timezone.localdate()
+        today_history = EstimateHistory.objects.filter(
+            taskboard=OuterRef("taskboard"), date=today
+        ).values("time_remaining")[:1]
+        row = (
+            self.filter(taskboard=taskboard_id)
+            .annotate(today=Subquery(today_history))
+            .values_list(interval, "day", "today")
+            .first()
+        )
+        if row is None:
+            if not Taskboard.objects.filter(pk=taskboard_id).exists():
+                return []
+            points = getattr(self.rebuild(taskboard_id), interval)
+            today_value = (
+                EstimateHistory.objects.filter(taskboard=taskboard_id, date=today)
+                .values_list("time_remaining", flat=True)
+                .first()
+            )
+        else:
+            points, days, today_value = row
+            yesterday = (today - timedelta(days=1)).isoformat()
+            if not days or days[-1][0] < yesterday:
+                # no write has closed the days since the series was updated
+                points = getattr(self.close_days(taskboard_id, today), interval)
+        if today_value is not None:
+            set_point(points, interval, today, today_value)
+        elif points:
+            set_point(points, interval, today, points[-1][1])
+        return points
+
+
+class BurndownSeries(models.Model):
+    """Gap-filled time remaining of a taskboard by day, week and month.
+
+    Each series is a list of [ISO date, time remaining] where the date is the
+    start of the interval and the time remaining is the value at its end.
+    Only days before today are stored since today's time remaining still
+    changes, it is read from EstimateHistory together with the series.
+    """
+
+    taskboard = models.OneToOneField(
+        Taskboard, on_delete=models.CASCADE, related_name="burndown_series"
+    )
+    day = models.JSONField(default=list)
+    week = models.JSONField(default=list)
+    month = models.JSONField(default=list)
+    objects = BurndownSeriesManager()
+
+    def set_value(self, day: date, value: int) -> None:
+        """Set the time remaining at the end of the given day in every series."""
+        for interval in INTERVALS:
+            set_point(getattr(self, interval), interval, day, value)
@@ -0,0 +1,50 @@
+"""Module for the CacheVersion model."""
+
+import time
+from typing import Iterable
+from django.db import connection, models
+
+
+class CacheVersionManager(models.Manager):
+    """Manager to bump and remove cache versions."""
+
+    def bump(self, name: str) -> None:
+        """Increase a version with a single upsert.
+
+        A new version starts from the current time in microseconds instead
+        of 1, so a version that was removed, e.g. of a deleted taskboard
+        whose id SQLite gives to a new one, never takes an old value again.
+
+        :param name: the name of the version.
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (name, version) VALUES (%s, %s) "
+                f"ON CONFLICT (name) DO UPDATE SET version = {table}.version + 1",
+                [name, time.time_ns() // 1000],
+            )
+
+    def forget(self, names: Iterable[str]) -> None:
+        """Remove the versions of data that no longer exists.
+
+        :param names: the names of the versions.
+        """
+        self.filter(name__in=list(names)).delete()
+
+
+class CacheVersion(models.Model):
+    """A counter that is increased every time some cached data changes.
+
+    The cached velocity of each taskboard and the cached permissions of
+    each user depend on versions, see manager.versioned_cache.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = CacheVersionManager()
+
+    def __str__(self) -> str:
+        """Return a string representation of the version."""
+        return f"{self.name} version {self.version}"
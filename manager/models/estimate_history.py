@@ -1,8 +1,13 @@
 """Module for Estimate history models."""
 
-from django.db import models
+import datetime
+from django.db import connection, models
+from django.db.models import F, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber, TruncMonth, TruncWeek
 from django.utils import timezone
 from .taskboard import Taskboard
+from .burndown_series import BurndownSeries
+from manager.velocity_cache import velocity_cache
 
 
 class EstimateHistoryManager(models.Manager):
@@ -13,7 +18,7 @@ class EstimateHistoryManager(models.Manager):
 
         Set initial time remaining to match the previous day, if exists.
         """
-        taskboard = kwargs["taskboard"]
+        taskboard = kwargs.get("taskboard", kwargs.get("taskboard_id"))
         eh_of_previous_day_of_this_tb = self.filter(taskboard=taskboard).last()
 
         if eh_of_previous_day_of_this_tb:
@@ -24,13 +29,160 @@ class EstimateHistoryManager(models.Manager):
     def get(self, *args, **kwargs):
         """Override default get method.
 
-        If the object does not exist, create a new one instead.
+        If the EstimateHistory of a taskboard on a day does not exist,
+        start a new one from the previous day instead.
         """
         try:
             return super().get(*args, **kwargs)
         except EstimateHistory.DoesNotExist:
-            new_obj = self.create(**kwargs)
-            return new_obj
+            taskboard = kwargs.get("taskboard", kwargs.get("taskboard_id"))
+            if taskboard is None:
+                raise
+            self.start_day(taskboard, kwargs.get("date"))
+            return super().get(*args, **kwargs)
+
+    def start_day(self, taskboard, date=None) -> None:
+        """Insert the EstimateHistory of a taskboard for the given day.
+
+        The row is seeded from the latest previous day of the taskboard in a
+        single INSERT statement. If another request already inserted the row,
+        the conflict on (taskboard, date) is ignored, so calling this method
+        concurrently is safe.
+
+        :param taskboard: The Taskboard (or its id) to start the day for.
+        :param date: The day to start, defaults to today.
+        """
+        if date is None:
+            date = timezone.localdate()
+        taskboard_id = getattr(taskboard, "pk", taskboard)
+        previous = (
+            self.filter(taskboard=taskboard_id, date__lt=date)
+            .order_by("-date")
+            .values("time_remaining")[:1]
+        )
+        self.bulk_create(
+            [
+                self.model(
+                    taskboard_id=taskboard_id,
+                    date=date,
+                    time_remaining=Coalesce(Subquery(previous), 0),
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        BurndownSeries.objects.close_days(taskboard_id, date)
+
+    def add_time_remaining(self, taskboard, delta: int, date=None) -> None:
+        """Add delta to the time remaining of a taskboard on the given day.
+
+        The change is applied with a single F() update so concurrent writes
+        do not overwrite each other. If the day has no EstimateHistory yet,
+        it is started from the previous day first. Any change invalidates
+        the cached velocity of the taskboard.
+
+        :param taskboard: The Taskboard (or its id) to update.
+        :param delta: The amount of time to add, can be negative.
+        :param date: The day to update, defaults to today.
+        """
+        if date is None:
+            date = timezone.localdate()
+        elif date < timezone.localdate():
+            BurndownSeries.objects.filter(taskboard=taskboard).delete()
+        history = self.filter(taskboard=taskboard, date=date)
+        if not history.update(time_remaining=F("time_remaining") + delta):
+            self.start_day(taskboard, date)
+            if delta:
+                history.update(time_remaining=F("time_remaining") + delta)
+        if delta:
+            velocity_cache.bump_version(getattr(taskboard, "pk", taskboard))
+
+    def work_done(self, taskboard, start: datetime.date, interval: str = "day"):
+        """Compute the work done on a taskboard since the start date.
+
+        The EstimateHistory from the start date onward is grouped by the
+        interval and only the last value of each interval is kept. The work
+        done is the sum of every decrease between the value on the start date
+        and these values, increases from newly added work are ignored.
+        Both are computed in one query using window functions, databases that
+        do not support them fall back to computing them in Python.
+
+        :param taskboard: The Taskboard (or its id) to compute the work for.
+        :param start: The date to start counting from.
+        :param interval: day, week or month.
+        :return: A tuple of the work done and the latest time remaining.
+            None if there is no history before and after the start date.
+        """
+        start_point = (
+            self.filter(taskboard=taskboard, date__lte=start)
+            .order_by("-date")
+            .values("date", "time_remaining")[:1]
+        )
+        history = self.filter(taskboard=taskboard, date__gte=start)
+        if not connection.features.supports_over_clause:
+            return self._work_done_in_python(start_point, history, interval)
+        trunc = {"week": TruncWeek, "month": TruncMonth}.get(interval)
+        bucket = trunc("date") if trunc else F("date")
+        history = history.annotate(
+            rn=Window(RowNumber(), partition_by=bucket, order_by=F("date").desc())
+        ).values("date", "time_remaining", "rn")
+        start_sql, start_params = start_point.query.sql_with_params()
+        history_sql, history_params = history.query.sql_with_params()
+        sql = f"""
+            WITH history AS ({history_sql}),
+            points AS (
+                SELECT date, time_remaining, 0 AS part
+                FROM ({start_sql}) start_point
+                UNION ALL
+                SELECT date, time_remaining, 1 AS part
+                FROM history WHERE rn = 1
+            ),
+            diffs AS (
+                SELECT
+                    part,
+                    time_remaining,
+                    LAG(time_remaining) OVER (ORDER BY part, date) AS previous,
+                    ROW_NUMBER() OVER (ORDER BY part DESC, date DESC) AS from_end
+                FROM points
+            )
+            SELECT
+                MIN(part),
+                SUM(
+                    CASE WHEN previous > time_remaining
+                    THEN previous - time_remaining ELSE 0 END
+                ),
+                MAX(CASE WHEN from_end = 1 THEN time_remaining END),
+                MAX(part)
+            FROM diffs
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (*history_params, *start_params))
+            first, total_work, latest, last = cursor.fetchone()
+        if first != 0 or last != 1:
+            return None
+        return total_work, latest
+
+    def _work_done_in_python(self, start_point, history, interval: str):
+        """Compute work_done without window functions."""
+        start_point = start_point.first()
+        if start_point is None:
+            return None
+        trunc = {
+            "week": lambda day: day - datetime.timedelta(days=day.weekday()),
+            "month": lambda day: day.replace(day=1),
+        }.get(interval, lambda day: day)
+        values = {}
+        for day, time_remaining in history.order_by("date").values_list(
+            "date", "time_remaining"
+        ):
+            values[trunc(day)] = time_remaining
+        if not values:
+            return None
+        total_work = 0
+        previous = start_point["time_remaining"]
+        for time_remaining in values.values():
+            total_work += max(previous - time_remaining, 0)
+            previous = time_remaining
+        return total_work, previous
 
 
 class EstimateHistory(models.Model):
@@ -40,3 +192,34 @@ class EstimateHistory(models.Model):
     date = models.DateField(default=timezone.localdate)
     time_remaining = models.IntegerField(default=0)
     objects = EstimateHistoryManager()
+
+    class Meta:
+        """Meta definition for EstimateHistory."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["taskboard", "date"],
+                name="one estimate history per taskboard per day",
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        """Override default save method.
+
+        The burndown series of the taskboard is rebuilt the next time it is
+        read, since this object may be from a day that is already in it.
+        The cached velocity of the taskboard is also invalidated.
+        """
+        super().save(*args, **kwargs)
+        BurndownSeries.objects.filter(taskboard=self.taskboard_id).delete()
+        velocity_cache.bump_version(self.taskboard_id)
+
+    def delete(self, *args, **kwargs):
+        """Override default delete method to also reset the burndown series.
+
+        The cached velocity of the taskboard is also invalidated.
+        """
+        BurndownSeries.objects.filter(taskboard=self.taskboard_id).delete()
+        deleted = super().delete(*args, **kwargs)
+        velocity_cache.bump_version(self.taskboard_id)
+        return deleted
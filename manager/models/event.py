@@ -30,3 +30,6 @@ class Event(models.Model):
                 check=Q(end_date__gt=F("start_date")),
             )
         ]
+        indexes = [
+            models.Index(fields=["user", "start_date"], name="event_user_start_idx"),
+        ]
@@ -28,45 +28,45 @@ class Task(models.Model):
     )
     time_estimate = models.IntegerField(default=0)
 
-    def __compute_time_diff(self) -> int:
-        """Compute the difference between old and new time estimate."""
-        try:
-            old_time = Task.objects.get(pk=self.pk).time_estimate
-            return self.time_estimate - old_time
-        except Task.DoesNotExist:
-            return self.time_estimate
+    class Meta:
+        """Meta definition for Task."""
+
+        indexes = [
+            models.Index(
+                fields=["taskboard", "end_date"], name="task_taskboard_end_idx"
+            ),
+        ]
 
     def due_today(self):
         """Check if the task is due today."""
         return self.end_date.day == timezone.now().day
 
-    def __status_changed_to_done(self) -> bool:
-        """Check whether status of existing tasks are changed to DONE.
+    @staticmethod
+    def remaining_time(status: str, time_estimate: int) -> int:
+        """Return the time a task with the given fields adds to the time remaining.
 
-        :return: True if the task's status changed from something else to DONE.
-        Otherwise, return false.
+        Tasks that are DONE do not count toward the time remaining.
         """
-        try:
-            old_status = Task.objects.get(pk=self.pk).status
-            if self.status == old_status:
-                return False
-            return self.status == "DONE"
-        except Task.DoesNotExist:
-            return False
-
-    def __status_changed_from_done(self) -> bool:
-        """Check whether status of existing tasks are changed from DONE.
-
-        :return: True if the task's status changed from DONE to something else.
-        Otherwise, return false.
+        if status == "DONE":
+            return 0
+        return time_estimate
+
+    def __compute_time_remaining_diff(self) -> int:
+        """Compute the change in time remaining caused by saving this task.
+
+        The previous state of the task is loaded with a single query.
         """
-        try:
-            old_status = Task.objects.get(pk=self.pk).status
-            if self.status == old_status:
-                return False
-            return old_status == "DONE"
-        except Task.DoesNotExist:
-            return False
+        old = None
+        if self.pk is not None:
+            old = (
+                Task.objects.filter(pk=self.pk)
+                .values("status", "time_estimate")
+                .first()
+            )
+        new_time = Task.remaining_time(self.status, self.time_estimate)
+        if old is None:
+            return new_time
+        return new_time - Task.remaining_time(old["status"], old["time_estimate"])
 
     def save(self, *args, **kwargs):
         """Override default save method.
@@ -77,16 +77,9 @@ class Task(models.Model):
         """
         if self.end_date is None:
             self.end_date = today_midnight()
-        eh = EstimateHistory.objects.get(
-            date=timezone.localdate(), taskboard=self.taskboard
+        EstimateHistory.objects.add_time_remaining(
+            self.taskboard_id, self.__compute_time_remaining_diff()
         )
-        if self.__status_changed_to_done():
-            eh.time_remaining -= self.time_estimate
-        elif self.__status_changed_from_done():
-            eh.time_remaining += self.time_estimate
-        elif self.status != "DONE":
-            eh.time_remaining += self.__compute_time_diff()
-        eh.save()
 
         super().save(*args, **kwargs)
 
@@ -95,10 +88,8 @@ class Task(models.Model):
 
         Also subtracts the time remaining in the related EstimateHistory object.
         """
-        eh = EstimateHistory.objects.get(
-            date=timezone.localdate(), taskboard=self.taskboard
+        EstimateHistory.objects.add_time_remaining(
+            self.taskboard_id, -Task.remaining_time(self.status, self.time_estimate)
         )
-        eh.time_remaining -= self.time_estimate
-        eh.save()
 
         super().delete(using, keep_parents)
@@ -0,0 +1,207 @@
+"""Module for the roles of users.
+
+A role is made of the custom permissions of UserPermissions: parent,
+taking the A-levels and verified. They are created with the other
+permissions by migrate, since UserPermissions declares them.
+
+The permissions of a user are read from the database once and cached in
+the "roles" entry of settings.CACHES, so a request checking a role or
+calling has_perm only reads their versions. The cache is invalidated by
+bumping these versions when the permissions or groups of a user, the
+permissions of a group or the user itself change. They are CacheVersion
+rows, so every process sees a change as soon as it is committed, even
+with the default local-memory cache.
+"""
+
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from django.contrib.auth.backends import BaseBackend, ModelBackend
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .versioned_cache import VersionedCache
+
+CACHE_ALIAS = "roles"
+ALL_USERS_VERSION = "roles"
+PARENT = "manager.is_parent"
+TAKING_A_LEVELS = "manager.is_taking_A_levels"
+VERIFIED = "manager.is_verified"
+
+
+@dataclass(frozen=True)
+class Role:
+    """The role flags of a user."""
+
+    is_parent: bool = False
+    is_taking_a_levels: bool = False
+    is_verified: bool = False
+
+    @classmethod
+    def from_permissions(cls, permissions: set[str]) -> "Role":
+        """Get the role of a user from the names of their permissions."""
+        return cls(
+            is_parent=PARENT in permissions,
+            is_taking_a_levels=TAKING_A_LEVELS in permissions,
+            is_verified=VERIFIED in permissions,
+        )
+
+
+class PermissionCache(VersionedCache):
+    """A cache for the permissions of users with hit and miss counters.
+
+    The entries of a user depend on a version of the user and on a version
+    of every user, for changes to groups and permissions. Their keys also
+    have the time the user joined, since SQLite reuses the id of a deleted
+    user and a new user is not invalidated.
+    """
+
+    def __init__(self, alias: str = CACHE_ALIAS):
+        """Create a cache using the given settings.CACHES alias."""
+        super().__init__("roles", alias)
+
+    def _user_version_name(self, user_id) -> str:
+        return f"roles:user:{user_id}"
+
+    def _version_names(self, user_id) -> list[str]:
+        return [ALL_USERS_VERSION, self._user_version_name(user_id)]
+
+    def get_or_load(self, user: User, load: Callable[[], set[str]]) -> set[str]:
+        """Return the cached permissions of a user or load and cache them.
+
+        :param user: The user.
+        :param load: A function that reads the permissions from the database.
+        :return: The names of the permissions.
+        """
+        return self.get_or_set(self._version_names(user.pk), _user_key(user), load)
+
+    async def aget_or_load(
+        self, user: User, load: Callable[[], Awaitable[set[str]]]
+    ) -> set[str]:
+        """Return the cached permissions of a user in an async view.
+
+        :param user: The user.
+        :param load: An async function that reads the permissions.
+        :return: The names of the permissions.
+        """
+        return await self.aget_or_set(
+            self._version_names(user.pk), _user_key(user), load
+        )
+
+    def invalidate(self, user_id) -> None:
+        """Forget the cached permissions of a user."""
+        self.bump(self._user_version_name(user_id))
+
+    def forget_user(self, user_id) -> None:
+        """Remove the version of a deleted user."""
+        self.forget([self._user_version_name(user_id)])
+
+    def invalidate_all(self) -> None:
+        """Forget the cached permissions of every user."""
+        self.bump(ALL_USERS_VERSION)
+
+
+def _user_key(user: User) -> tuple:
+    return user.pk, int(user.date_joined.timestamp() * 1_000_000)
+
+
+permission_cache = PermissionCache()
+
+
+class CachedPermissionBackend(ModelBackend):
+    """The model backend with the permissions of users kept in the role cache."""
+
+    def get_all_permissions(self, user_obj, obj=None) -> set[str]:
+        """Get the permissions of a user, from the cache if possible."""
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        # other backends and later checks in the request reuse _perm_cache
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = permission_cache.get_or_load(
+                user_obj, lambda: BaseBackend.get_all_permissions(self, user_obj)
+            )
+        return user_obj._perm_cache
+
+    async def aget_all_permissions(self, user_obj, obj=None) -> set[str]:
+        """Get the permissions of a user in an async view."""
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = await permission_cache.aget_or_load(
+                user_obj, lambda: BaseBackend.aget_all_permissions(self, user_obj)
+            )
+        return user_obj._perm_cache
+
+
+def get_role(user) -> Role:
+    """Get the role of a user.
+
+    :param user: The user, which may be anonymous.
+    :return: The role, with every flag False for anonymous users.
+    """
+    return Role.from_permissions(CachedPermissionBackend().get_all_permissions(user))
+
+
+async def aget_role(user) -> Role:
+    """Get the role of a user in an async view.
+
+    :param user: The user, which may be anonymous.
+    :return: The role, with every flag False for anonymous users.
+    """
+    backend = CachedPermissionBackend()
+    return Role.from_permissions(await backend.aget_all_permissions(user))
+
+
+def get_role_permissions() -> dict[str, Permission]:
+    """Get the role permissions to give to a user, by their codename."""
+    codenames = [name.split(".")[1] for name in (PARENT, TAKING_A_LEVELS, VERIFIED)]
+    return {
+        permission.codename: permission
+        for permission in Permission.objects.filter(
+            content_type__app_label="manager", codename__in=codenames
+        )
+    }
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """Forget the permissions of users whose permissions or groups changed."""
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        permission_cache.invalidate(instance.pk)
+    elif pk_set is None:
+        # a permission or group was removed from all of its users
+        permission_cache.invalidate_all()
+    else:
+        for user_id in pk_set:
+            permission_cache.invalidate(user_id)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    """Forget the permissions of every user when a group's permissions change."""
+    if action.startswith("post_"):
+        permission_cache.invalidate_all()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, instance, created=False, update_fields=None, **kwargs):
+    """Forget the permissions of a saved user, e.g. made active or superuser."""
+    # a new user has nothing cached, and logging in only sets last_login
+    if created or update_fields == frozenset({"last_login"}):
+        return
+    permission_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    """Remove the permission version of a deleted user."""
+    permission_cache.forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=Permission)
+@receiver(post_delete, sender=Group)
+def invalidate_deleted(sender, **kwargs):
+    """Forget the permissions of every user when a permission or group is deleted."""
+    permission_cache.invalidate_all()
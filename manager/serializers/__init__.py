@@ -2,3 +2,4 @@ from .taskboard_serializer import *
 from .event_serializer import EventSerializer
 from .task_serializer import TaskSerializer
 from .estimate_history_serializer import EstimateHistorySerializer
+from .dashboard_serializer import ChildStatisticsSerializer
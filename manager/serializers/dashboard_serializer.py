@@ -0,0 +1,22 @@
+"""Module for the parent dashboard serializer."""
+
+from rest_framework import serializers
+from manager.models import StudentInfo
+
+
+class ChildStatisticsSerializer(serializers.ModelSerializer):
+    """Serializer for a child and the statistics of their tasks.
+
+    The StudentInfo must be annotated by get_children_statistics.
+    """
+
+    email = serializers.EmailField(source="user.email")
+    today = serializers.IntegerField()
+    late = serializers.IntegerField()
+    fin = serializers.IntegerField()
+
+    class Meta:
+        """Meta definition for ChildStatisticsSerializer."""
+
+        model = StudentInfo
+        fields = ["id", "user", "displayed_name", "email", "today", "late", "fin"]
@@ -1,7 +1,26 @@
 """Module for Task serializer."""
 
 from rest_framework import serializers
-from manager.models import Task
+from manager.models import Task, Taskboard
+
+
+class TaskboardField(serializers.PrimaryKeyRelatedField):
+    """A Taskboard field that can look up preloaded Taskboards.
+
+    If the serializer context contains a dict of Taskboards by id under
+    "taskboards", the Taskboard is taken from it instead of the database.
+    Ids missing from the dict are treated as Taskboards that do not exist.
+    """
+
+    def to_internal_value(self, data):
+        """Return the Taskboard with the given id."""
+        taskboards = self.context.get("taskboards")
+        if taskboards is None:
+            return super().to_internal_value(data)
+        try:
+            return taskboards[int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail("does_not_exist", pk_value=data)
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -9,6 +28,7 @@ class TaskSerializer(serializers.ModelSerializer):
 
     type = serializers.SerializerMethodField()
     start = serializers.DateTimeField(source="end_date")
+    taskboard = TaskboardField(queryset=Taskboard.objects.all())
 
     class Meta:
         """Meta definition for Task."""
@@ -18,9 +18,9 @@ async function fetchTaskJson(){
 }
 
 async function fetchEstimateHistoryData() {
-    const response = await fetch(`/api/estimate_history/?taskboard=${taskboardID}`);
-    const estimateHistories = await response.json();
-    return estimateHistories;
+    const response = await fetch(`/api/estimate_history/series/?taskboard=${taskboardID}&interval=day`);
+    const series = await response.json();
+    return series.data.map(([date, timeRemaining]) => ({ date: date, time_remaining: timeRemaining }));
 }
 
 // Return the number of days between d1 and d2
@@ -59,18 +59,22 @@ document.addEventListener('DOMContentLoaded', () => {
     selectable: true,
     dayMaxEvents: true,
     timeZone: 'local',
+    // Only the visible range is requested, FullCalendar adds the start and
+    // end query parameters to each event source.
+    lazyFetching: true,
+    startParam: 'start',
+    endParam: 'end',
     eventSources: [
       {
         id: 420,
         url: '/api/events/',
         color: '#6767fe',
         editable: true,
-        lazyFetching: true,
       },
       {
-        url: '/api/tasks/?exclude=DONE',
+        url: '/api/tasks/',
+        extraParams: { exclude: 'DONE' },
         color: '#FF00FF',
-        lazyFetching: true,
       },
     ],
     eventClick: (eventClickInfo) => {
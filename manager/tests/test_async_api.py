@@ -0,0 +1,154 @@
+"""Test the async API views of the ASGI mode against the DRF views."""
+
+from datetime import datetime, timedelta
+from django.http import JsonResponse, StreamingHttpResponse
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from calculator.models import Exams
+from calculator.reference_cache import reference_cache
+from manager.models import Task
+from manager.velocity_cache import velocity_cache
+from .templates_for_tests import (
+    ProfileTestCase,
+    create_estimate_hisotry,
+    create_task,
+    create_taskboard,
+)
+from .test_events import create_event
+
+
+@override_settings(ROOT_URLCONF="mysite.asgi_urls")
+class AsyncApiTestCase(ProfileTestCase):
+    """Test cases for the async API views."""
+
+    def setUp(self):
+        """Create a student with tasks, events and estimate history."""
+        super().setUp()
+        self.client.force_login(self.student)
+        due_date = timezone.make_aware(datetime(2030, 10, 2, 10))
+        self.taskboard = create_taskboard(self.student, "Today")
+        self.other_taskboard = create_taskboard(self.parent, "Parent's")
+        create_task("Task 1", "TODO", self.taskboard, due_date)
+        create_task("Task 2", "DONE", self.taskboard)
+        create_task("Task 3", "TODO", self.other_taskboard)
+        create_event(self.student, "Event 1")
+        create_event(self.parent, "Event 2")
+        for days, time_remaining in [(3, 70), (2, 60), (1, 50)]:
+            create_estimate_hisotry(
+                self.taskboard, timezone.now() - timedelta(days=days), time_remaining
+            )
+        velocity_cache.cache.clear()
+        velocity_cache.reset_stats()
+        reference_cache.clear()
+
+    def assert_same_as_sync(self, url: str, params: dict | None = None):
+        """Check that the async view answers like the DRF view.
+
+        :param url: the URL of the endpoint.
+        :param params: the query parameters.
+        """
+        with override_settings(ROOT_URLCONF="mysite.urls"):
+            expected = self.client.get(url, params)
+        response = self.client.get(url, params)
+        self.assertNotIsInstance(response, Response)
+        self.assertEqual(response.status_code, expected.status_code)
+        if expected.content:
+            self.assertEqual(response.json(), expected.json())
+        else:
+            self.assertEqual(response.content, b"")
+
+    def test_task_list(self):
+        """Tasks are listed like the DRF view for every filter."""
+        taskboard = self.taskboard.id
+        for params in [
+            {},
+            {"taskboard": taskboard},
+            {"taskboard": taskboard, "exclude": "DONE"},
+            {"exclude": "DONE"},
+            {"start": "2030-10-01", "end": "2030-10-03"},
+            {"start": "2030-10-03", "end": "2030-10-01"},
+            {"start": "not a date"},
+            {"taskboard": self.other_taskboard.id},
+            {"taskboard": 999999},
+            {"user": self.parent.id},
+        ]:
+            with self.subTest(params=params):
+                self.assert_same_as_sync("/api/tasks/", params)
+
+    def test_parent_task_list(self):
+        """A parent lists the tasks of their child."""
+        self.client.force_login(self.parent)
+        self.assert_same_as_sync("/api/tasks/", {"user": self.student.id})
+        self.assert_same_as_sync("/api/tasks/", {"taskboard": self.taskboard.id})
+        response = self.client.get("/api/tasks/", {"user": self.student.id})
+        self.assertEqual(len(response.json()), 2)
+
+    def test_event_list(self):
+        """Events are listed like the DRF view."""
+        for params in [{}, {"start": "2000-01-01"}, {"end": "2000-01-01"}]:
+            with self.subTest(params=params):
+                self.assert_same_as_sync("/api/events/", params)
+
+    def test_estimate_history_list(self):
+        """Estimate history is listed like the DRF view."""
+        self.assert_same_as_sync(
+            "/api/estimate_history/", {"taskboard": self.taskboard.id}
+        )
+        self.assert_same_as_sync("/api/estimate_history/")
+
+    def test_velocity(self):
+        """Velocity is computed and cached like the DRF view."""
+        start = (timezone.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+        for mode in ["basic", "average"]:
+            params = {"taskboard": self.taskboard.id, "start": start, "mode": mode}
+            with self.subTest(mode=mode):
+                self.assert_same_as_sync("/api/velocity/", params)
+        # the DRF views computed both, the async views found them cached
+        self.assertEqual(velocity_cache.stats(), {"hits": 2, "misses": 2})
+
+    def test_reference_data(self):
+        """Cached reference data is sent by the async view, with its ETag."""
+        Exams.objects.create(name="Maths")
+        misses = reference_cache.misses
+        # not cached yet, so the DRF view builds and caches it
+        first = self.client.get("/api/exams/")
+        self.assertIsInstance(first, Response)
+        self.client.logout()
+        response = self.client.get("/api/exams/")
+        self.assertIsInstance(response, JsonResponse)
+        self.assertEqual(response.json(), first.json())
+        self.assertEqual(response["ETag"], first["ETag"])
+        self.assertEqual(reference_cache.misses, misses + 1)
+        response = self.client.get("/api/exams/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_other_requests_use_drf(self):
+        """Writes, streams, pages and anonymous requests go to the DRF views."""
+        response = self.client.post(
+            "/api/tasks/",
+            {
+                "title": "New",
+                "status": "TODO",
+                "start": timezone.now(),
+                "taskboard": self.taskboard.id,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Task.objects.filter(title="New").exists())
+        response = self.client.get("/api/tasks/", {"stream": "1"})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        response = self.client.get("/api/tasks/", {"page_size": "1"})
+        self.assertIsInstance(response, Response)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.client.logout()
+        response = self.client.get("/api/estimate_history/")
+        self.assertIsInstance(response, Response)
+
+    async def test_async_client(self):
+        """The async views answer requests of an ASGI server."""
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get("/api/events/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event["title"] for event in response.json()], ["Event 1"])
@@ -1,7 +1,9 @@
 """Test Burndown chart views."""
 
 from django.test import TestCase
-from .templates_for_tests import create_taskboard, create_estimate_hisotry
+from freezegun import freeze_time
+from manager.models import BurndownSeries, EstimateHistory, Task
+from .templates_for_tests import create_taskboard, create_estimate_hisotry, BaseTestCase
 from django.contrib.auth.models import User
 from rest_framework import status
 from datetime import date, timedelta
@@ -42,3 +44,115 @@ class EstimateHistoryViewTests(TestCase):
         """Test getting a non-existent estimate history info."""
         response = self.client.get("/api/estimate_history/?taskboard=9999")
         self.assertEqual(response.data, [])
+
+
+class BurndownSeriesViewTests(BaseTestCase):
+    """Tests for the burndown series endpoint."""
+
+    def setUp(self):
+        """Create a taskboard with a gap in its EstimateHistory."""
+        super().setUp()
+        self.tb = create_taskboard(self.user1, "Test Taskboard")
+        with freeze_time("2024-01-29"):  # Monday
+            Task.objects.create(title="task 1", taskboard=self.tb, time_estimate=10)
+        with freeze_time("2024-02-02"):
+            self.task = Task.objects.create(
+                title="task 2", taskboard=self.tb, time_estimate=5
+            )
+
+    def get_series(self, interval: str = "day"):
+        """Get the series of the taskboard."""
+        return self.client.get(
+            f"/api/estimate_history/series/?taskboard={self.tb.id}&interval={interval}"
+        )
+
+    @freeze_time("2024-02-05")
+    def test_daily_series_is_gap_filled(self):
+        """Days without EstimateHistory have the value of the previous day."""
+        response = self.get_series()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["data"],
+            [
+                ["2024-01-29", 10],
+                ["2024-01-30", 10],
+                ["2024-01-31", 10],
+                ["2024-02-01", 10],
+                ["2024-02-02", 15],
+                ["2024-02-03", 15],
+                ["2024-02-04", 15],
+                ["2024-02-05", 15],
+            ],
+        )
+
+    @freeze_time("2024-02-05")
+    def test_weekly_and_monthly_series(self):
+        """Each week and month has the value of its last day."""
+        response = self.get_series("week")
+        self.assertEqual(
+            response.data["data"], [["2024-01-29", 15], ["2024-02-05", 15]]
+        )
+        response = self.get_series("month")
+        self.assertEqual(
+            response.data["data"], [["2024-01-01", 10], ["2024-02-01", 15]]
+        )
+
+    def test_series_is_updated_by_task_changes(self):
+        """Saving and deleting tasks updates the series."""
+        with freeze_time("2024-02-05"):
+            self.get_series()
+            self.task.status = "DONE"
+            self.task.save()
+            self.assertEqual(self.get_series().data["data"][-1], ["2024-02-05", 10])
+        with freeze_time("2024-02-07"):
+            Task.objects.get(title="task 1").delete()
+            data = self.get_series().data["data"]
+        self.assertEqual(
+            data[-3:], [["2024-02-05", 10], ["2024-02-06", 10], ["2024-02-07", 0]]
+        )
+        # starting 2024-02-07 closed the days up to the day before
+        self.assertEqual(BurndownSeries.objects.get().day[-1], ["2024-02-06", 10])
+
+    def test_day_without_writes(self):
+        """The last day with writes is in the series the next day without writes."""
+        tb = create_taskboard(self.user1, "Quiet Taskboard")
+        with freeze_time("2024-01-01"):
+            task = Task.objects.create(title="task", taskboard=tb, time_estimate=10)
+            BurndownSeries.objects.get_series(tb.id, "day")
+        with freeze_time("2024-01-02"):
+            task.time_estimate = 4
+            task.save()
+        with freeze_time("2024-01-03"):
+            series = BurndownSeries.objects.get_series(tb.id, "day")
+            self.assertEqual(
+                series, [["2024-01-01", 10], ["2024-01-02", 4], ["2024-01-03", 4]]
+            )
+            # the closed days are stored, later reads use one query again
+            with self.assertNumQueries(1):
+                BurndownSeries.objects.get_series(tb.id, "day")
+
+    @freeze_time("2024-02-05")
+    def test_reading_series_query_count(self):
+        """A series that is already built is read with one query."""
+        self.get_series()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                BurndownSeries.objects.get_series(self.tb.id, "day")[-1],
+                ["2024-02-05", 15],
+            )
+
+    @freeze_time("2024-02-05")
+    def test_editing_estimate_history_resets_series(self):
+        """Changing a past EstimateHistory rebuilds the series."""
+        self.get_series()
+        history = EstimateHistory.objects.get(date=date(2024, 1, 29))
+        history.time_remaining = 20
+        history.save()
+        self.assertEqual(self.get_series().data["data"][0], ["2024-01-29", 20])
+
+    def test_invalid_parameters(self):
+        """Invalid taskboards or intervals are rejected."""
+        response = self.get_series("year")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/estimate_history/series/?taskboard=9999")
+        self.assertEqual(response.data["data"], [])
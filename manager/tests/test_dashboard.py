@@ -111,6 +111,39 @@ class DashboardViewTestCase(TestCase):
         create_task("today", "IN_PROGRESS", tb)
         response = self.client.get(reverse("manager:dashboard"))
         self.assertEqual(200, response.status_code)
-        self.assertEqual(1, response.context["today"][0])
-        self.assertEqual(1, response.context["fin"][0])
-        self.assertEqual(2, response.context["late"][0])
+        child = response.context["child_list"][0]
+        self.assertEqual(1, child.today)
+        self.assertEqual(1, child.fin)
+        self.assertEqual(2, child.late)
+
+    def test_statistics_query_count(self):
+        """The statistics of all children are computed in one query."""
+        for user in (self.user1, self.user2):
+            tb = create_taskboard(user, "studies")
+            create_task("today", "TODO", tb)
+            create_task("done", "DONE", tb, timezone.now() - timezone.timedelta(days=2))
+        self.client.get(reverse("manager:dashboard"))
+        # session, user, the permission versions, the statistics and the navbar
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("manager:dashboard"))
+        children = response.context["child_list"]
+        self.assertEqual([1, 1], [child.today for child in children])
+        self.assertEqual([1, 1], [child.fin for child in children])
+
+    def test_statistics_api(self):
+        """The statistics are also available as JSON."""
+        tb = create_taskboard(self.user2, "studies")
+        create_task("today", "TODO", tb)
+        create_task("late", "TODO", tb, timezone.now() - timezone.timedelta(days=2))
+        response = self.client.get("/api/dashboard/")
+        self.assertEqual(200, response.status_code)
+        stats = {child["email"]: child for child in response.json()}
+        self.assertEqual(2, len(stats))
+        child = stats[self.user2.email]
+        self.assertEqual((1, 1, 0), (child["today"], child["late"], child["fin"]))
+
+    def test_statistics_api_by_student(self):
+        """Students cannot get dashboard statistics."""
+        self.client.login(username="myTcasser", password="myTcasdabest123")
+        response = self.client.get("/api/dashboard/")
+        self.assertEqual(404, response.status_code)
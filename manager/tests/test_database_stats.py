@@ -0,0 +1,73 @@
+"""Test the database connection statistics."""
+
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from rest_framework import status
+from mysite import db_stats
+from .templates_for_tests import BaseTestCase
+
+
+class FakePool:
+    """A pool with the statistics of psycopg_pool.ConnectionPool."""
+
+    def get_stats(self) -> dict[str, int]:
+        """Return statistics of a busy pool, zero counters are left out."""
+        return {
+            "pool_min": 2,
+            "pool_max": 10,
+            "pool_size": 10,
+            "pool_available": 3,
+            "requests_waiting": 1,
+            "requests_num": 40,
+            "requests_queued": 4,
+            "requests_wait_ms": 200,
+            "connections_num": 10,
+        }
+
+
+class DatabaseStatsTestCase(BaseTestCase):
+    """Test cases for the admin database statistics API."""
+
+    def setUp(self):
+        """Make the user an admin."""
+        super().setUp()
+        self.user1.is_staff = True
+        self.user1.save()
+        db_stats.reset_stats()
+
+    def test_admin_only(self):
+        """Users that are not staff cannot see the statistics."""
+        User.objects.create_user(username="student", password="student")
+        self.client.login(username="student", password="student")
+        response = self.client.get("/api/db_stats/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_persistent_connections(self):
+        """Without a pool, the settings and opened connections are returned."""
+        db_stats.count_connection(None, connection)
+        response = self.client.get("/api/db_stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data["default"]
+        self.assertFalse(stats["pooled"])
+        self.assertEqual(stats["vendor"], connection.vendor)
+        self.assertEqual(
+            stats["conn_max_age"], connection.settings_dict["CONN_MAX_AGE"]
+        )
+        self.assertEqual(stats["connections_opened"], 1)
+
+    def test_pool(self):
+        """With a pool, the connections in use, idle and the wait time are returned."""
+        with patch.object(
+            type(connections["default"]), "pool", FakePool(), create=True
+        ):
+            response = self.client.get("/api/db_stats/")
+        stats = response.data["default"]
+        self.assertTrue(stats["pooled"])
+        self.assertEqual(stats["in_use"], 7)
+        self.assertEqual(stats["idle"], 3)
+        self.assertEqual(stats["waiting"], 1)
+        self.assertEqual(stats["wait_ms"], 200)
+        self.assertEqual(stats["mean_wait_ms"], 5.0)
+        self.assertEqual(stats["requests_errors"], 0)
+        self.assertEqual(stats["connections_opened"], 10)
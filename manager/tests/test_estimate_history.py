@@ -1,6 +1,11 @@
 """Test cases for the EstimateHistory model."""
 
+import threading
+import time
 from datetime import date
+from django.contrib.auth.models import User
+from django.db import connection, OperationalError
+from django.test import TransactionTestCase
 from freezegun import freeze_time
 from manager.models import Task, EstimateHistory
 from .templates_for_tests import create_taskboard, BaseTestCase
@@ -60,6 +65,16 @@ class EstimateHistoryTest(BaseTestCase):
         eh.refresh_from_db()
         self.assertEqual(eh.time_remaining, 0)
 
+    def test_deleting_done_task(self):
+        """Deleting a DONE task does not subtract its estimate a second time."""
+        tb = create_taskboard(self.user1, "test")
+        done = Task.objects.create(title="done", taskboard=tb, time_estimate=10)
+        Task.objects.create(title="todo", taskboard=tb, time_estimate=3)
+        done.status = "DONE"
+        done.save()
+        done.delete()
+        self.assertEqual(EstimateHistory.objects.get().time_remaining, 3)
+
     def test_changing_status(self):
         """Test changing between different task status.
 
@@ -114,3 +129,126 @@ class EstimateHistoryTest(BaseTestCase):
         t.save()
         eh = EstimateHistory.objects.first()
         self.assertEqual(eh.time_remaining, 0)
+
+    def test_changing_status_and_time_estimate_together(self):
+        """Marking a task as DONE while re-estimating it removes the old estimate."""
+        tb = create_taskboard(self.user1)
+        t = Task.objects.create(title="something", taskboard=tb, time_estimate=5)
+        t.status = "DONE"
+        t.time_estimate = 8
+        t.save()
+        eh = EstimateHistory.objects.first()
+        self.assertEqual(eh.time_remaining, 0)
+
+
+class TaskSaveQueryCountTest(BaseTestCase):
+    """Query-count benchmarks for saving and deleting tasks."""
+
+    def setUp(self):
+        """Create a taskboard with a task and today's EstimateHistory."""
+        super().setUp()
+        self.tb = create_taskboard(self.user1)
+        self.task = Task.objects.create(
+            title="task", taskboard=self.tb, time_estimate=4
+        )
+
+    def test_updating_task_query_count(self):
+        """Updating a task loads the old row once and updates the history once."""
+        self.task.time_estimate = 10
+        # select old row, update EstimateHistory, update task, bump the version
+        # of the cached velocity once the change is committed
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            self.task.save()
+        self.assertEqual(EstimateHistory.objects.get().time_remaining, 10)
+
+    def test_changing_status_query_count(self):
+        """Changing the status costs as much as any other update."""
+        self.task.status = "DONE"
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            self.task.save()
+        self.assertEqual(EstimateHistory.objects.get().time_remaining, 0)
+
+    def test_creating_task_query_count(self):
+        """Creating a task does not need to load an old row."""
+        with self.assertNumQueries(3), self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title="task2", taskboard=self.tb, time_estimate=1)
+        self.assertEqual(EstimateHistory.objects.get().time_remaining, 5)
+
+    def test_deleting_task_query_count(self):
+        """Deleting a task updates the history with a single query."""
+        with self.assertNumQueries(3), self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        self.assertEqual(EstimateHistory.objects.get().time_remaining, 0)
+
+
+class ConcurrentEstimateHistoryTest(TransactionTestCase):
+    """Stress test starting a new day from many threads at once.
+
+    This runs against whichever database backend is configured, so it
+    covers SQLite in development and PostgreSQL in production mode.
+    """
+
+    THREADS = 8
+
+    def setUp(self):
+        """Create a taskboard with the history of the previous day."""
+        super().setUp()
+        user = User.objects.create_user(username="racer")
+        self.tb = create_taskboard(user)
+        self.yesterday = date(2020, 1, 1)
+        self.today = date(2020, 1, 2)
+        EstimateHistory.objects.create(
+            taskboard=self.tb, date=self.yesterday, time_remaining=50
+        )
+
+    def run_concurrently(self, func):
+        """Run func in several threads which start at the same time."""
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(5):
+                    try:
+                        func()
+                        break
+                    except OperationalError:
+                        # SQLite raises this when the database is locked
+                        time.sleep(0.01)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_start_day(self):
+        """Only one row should be created and it starts from the previous day."""
+        self.run_concurrently(
+            lambda: EstimateHistory.objects.start_day(self.tb, self.today)
+        )
+        self.assertEqual(
+            EstimateHistory.objects.filter(taskboard=self.tb, date=self.today).count(),
+            1,
+        )
+        self.assertEqual(
+            EstimateHistory.objects.get(
+                taskboard=self.tb, date=self.today
+            ).time_remaining,
+            50,
+        )
+
+    def test_concurrent_add_time_remaining(self):
+        """No update should be lost when the day is started concurrently."""
+        self.run_concurrently(
+            lambda: EstimateHistory.objects.add_time_remaining(self.tb, 1, self.today)
+        )
+        history = EstimateHistory.objects.filter(taskboard=self.tb, date=self.today)
+        self.assertEqual(history.count(), 1)
+        self.assertEqual(history.get().time_remaining, 50 + self.THREADS)
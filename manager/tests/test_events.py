@@ -1,6 +1,7 @@
 """Test cases for models."""
 
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 from django.contrib.auth.models import User
 from rest_framework import status
 from django.utils import timezone
@@ -181,3 +182,48 @@ class EventViewSetTests(BaseTestCase):
         create_event(self.user1, "zaijian")
         request = self.client.get("/api/events/")
         self.assertEqual(len(request.data), 3)
+
+    def test_stream_all_events(self):
+        """Streaming the events gives the same output as the normal list."""
+        for i in range(5):
+            create_event(self.user1, f"event {i}")
+        response = self.client.get("/api/events/")
+        streamed = self.client.get("/api/events/?stream=1")
+        self.assertTrue(streamed.streaming)
+        content = b"".join(streamed.streaming_content)
+        self.assertEqual(json.loads(content), response.json())
+
+    def test_stream_no_events(self):
+        """Streaming an empty list gives an empty JSON array."""
+        streamed = self.client.get("/api/events/?stream=1")
+        self.assertEqual(json.loads(b"".join(streamed.streaming_content)), [])
+
+    def test_get_events_in_window(self):
+        """Only events that overlap the start/end window are listed."""
+        now = timezone.now()
+        create_event(
+            self.user1, "before", now - timedelta(days=40), now - timedelta(days=39)
+        )
+        create_event(
+            self.user1, "overlap", now - timedelta(days=1), now + timedelta(hours=1)
+        )
+        create_event(
+            self.user1, "inside", now + timedelta(days=2), now + timedelta(days=3)
+        )
+        create_event(
+            self.user1, "after", now + timedelta(days=40), now + timedelta(days=41)
+        )
+        response = self.client.get(
+            "/api/events/",
+            {"start": now.isoformat(), "end": (now + timedelta(days=30)).isoformat()},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = {event["title"] for event in response.json()}
+        self.assertEqual(titles, {"overlap", "inside"})
+
+    def test_get_events_invalid_window(self):
+        """An invalid start or end returns 400."""
+        response = self.client.get("/api/events/?start=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/events/?start=2024-11-02&end=2024-11-01")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
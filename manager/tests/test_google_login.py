@@ -0,0 +1,257 @@
+"""Test the validation of Google id tokens."""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+import jwt
+import requests
+from allauth.socialaccount.models import SocialApp
+from allauth.socialaccount.providers.oauth2.client import OAuth2Error
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from jwt import PyJWKClient
+from rest_framework.authtoken.models import Token
+from urllib3.util.retry import Retry
+from auth.http_client import OutboundClient
+from auth.stub_server import StubServer, json_route
+from auth.views import GoogleOAuth2IatValidationAdapter
+
+CLIENT_ID = "bogusID.google.com"
+
+
+def make_key():
+    """Make an RSA private key."""
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class GoogleIdTokenTestCase(TestCase):
+    """Test cases for checking the id_token of a Google login."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start a fake Google JWKS endpoint with a signing key."""
+        super().setUpClass()
+        cls.key = make_key()
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(cls.key.public_key()))
+        jwks = {"keys": [{**jwk, "kid": "key-1", "alg": "RS256"}]}
+        cls.server = StubServer({("GET", "/certs"): json_route(jwks)})
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the fake Google JWKS endpoint."""
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Use a new key cache for each test."""
+        self.server.requests.clear()
+        client = patch("auth.views.google_jwks", PyJWKClient(f"{self.server.url}certs"))
+        client.start()
+        self.addCleanup(client.stop)
+        self.adapter = GoogleOAuth2IatValidationAdapter(RequestFactory().get("/"))
+        self.app = SimpleNamespace(client_id=CLIENT_ID)
+
+    def make_token(self, iat_delta: float = 0, key=None, **claims) -> str:
+        """Make a Google id_token.
+
+        :param iat_delta: seconds from now to the iat of the token.
+        :param key: the key to sign with, the key of the fake Google by default.
+        :return: the encoded token.
+        """
+        now = time.time()
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "1234",
+            "email": "student@example.com",
+            "iat": int(now + iat_delta),
+            "exp": int(now + 3600),
+            **claims,
+        }
+        return jwt.encode(
+            payload, key or self.key, algorithm="RS256", headers={"kid": "key-1"}
+        )
+
+    def test_valid_token(self):
+        """A valid token returns its claims."""
+        data = self.adapter.verify_id_token(self.app, self.make_token())
+        self.assertEqual(data["email"], "student@example.com")
+
+    def test_iat_in_the_future_does_not_wait(self):
+        """An iat a bit in the future is accepted right away."""
+        delta = settings.ABSOLUTE_TOLERATED_TIME_DIFF - 1
+        start = time.monotonic()
+        data = self.adapter.verify_id_token(self.app, self.make_token(delta))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(data["sub"], "1234")
+
+    def test_iat_too_far_in_the_future(self):
+        """An iat further in the future than the tolerated difference is rejected."""
+        token = self.make_token(settings.ABSOLUTE_TOLERATED_TIME_DIFF + 60)
+        with self.assertRaises(OAuth2Error):
+            self.adapter.verify_id_token(self.app, token)
+
+    def test_invalid_tokens(self):
+        """Tokens with a wrong signature, audience or issuer are rejected."""
+        for token in [
+            self.make_token(key=make_key()),
+            self.make_token(aud="someone-else"),
+            self.make_token(iss="https://example.com"),
+            "not a token",
+        ]:
+            with self.assertRaises(OAuth2Error):
+                self.adapter.verify_id_token(self.app, token)
+
+    def test_complete_login(self):
+        """A login is made from the claims of a valid token."""
+        app = SocialApp.objects.create(
+            provider="google", name="Google", client_id=CLIENT_ID
+        )
+        app.sites.add(Site.objects.get_current())
+        login = self.adapter.complete_login(
+            self.adapter.request,
+            self.app,
+            SimpleNamespace(token="access"),
+            response={"id_token": self.make_token()},
+        )
+        self.assertEqual(login.account.uid, "1234")
+        self.assertEqual(login.account.extra_data["email"], "student@example.com")
+
+    def test_complete_login_with_invalid_token(self):
+        """A login with an invalid token is rejected."""
+        with self.assertRaises(OAuth2Error):
+            self.adapter.complete_login(
+                self.adapter.request,
+                self.app,
+                SimpleNamespace(token="access"),
+                response={"id_token": self.make_token(aud="someone-else")},
+            )
+
+    def test_keys_are_cached(self):
+        """Google's keys are fetched once for many logins."""
+        for _ in range(10):
+            self.adapter.verify_id_token(self.app, self.make_token())
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_concurrent_logins(self):
+        """Logins with an iat in the future are checked in parallel without waiting."""
+        delta = settings.ABSOLUTE_TOLERATED_TIME_DIFF - 1
+        tokens = [self.make_token(delta, sub=str(i)) for i in range(50)]
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(
+                executor.map(
+                    lambda token: self.adapter.verify_id_token(self.app, token),
+                    tokens,
+                )
+            )
+        # waiting for the iat would take at least delta seconds
+        self.assertLess(time.monotonic() - start, min(delta, 2))
+        self.assertEqual([data["sub"] for data in results], [str(i) for i in range(50)])
+
+
+class OutboundClientTestCase(TestCase):
+    """Test cases for the pooled HTTP client of the auth app."""
+
+    def setUp(self):
+        """Start a stub token endpoint."""
+        self.server = StubServer({("POST", "/token"): json_route({"key": "abc"})})
+        self.addCleanup(self.server.stop)
+        self.client_ = OutboundClient(timeout=(1, 0.5), retries=2, backoff=0)
+
+    def test_connections_are_reused(self):
+        """Many requests to the same host use one connection."""
+        for _ in range(5):
+            response = self.client_.post("token", f"{self.server.url}token")
+            self.assertEqual(response.json(), {"key": "abc"})
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_stats(self):
+        """The calls, errors and latency are counted per call name."""
+        self.client_.post("token", f"{self.server.url}token")
+        self.client_.post("token", f"{self.server.url}token")
+        stats = self.client_.stats()["token"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["errors"], 0)
+        self.assertGreater(stats["max_seconds"], 0)
+        self.assertAlmostEqual(stats["mean_seconds"], stats["total_seconds"] / 2)
+        self.client_.reset_stats()
+        self.assertEqual(self.client_.stats(), {})
+
+    def test_read_timeout_is_not_retried(self):
+        """A slow server times out and the request is sent only once."""
+        self.server.delay = 1
+        start = time.monotonic()
+        with self.assertRaises(requests.Timeout):
+            self.client_.post("token", f"{self.server.url}token")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.client_.stats()["token"]["errors"], 1)
+
+    def test_connection_errors_are_retried(self):
+        """Connecting to a server that is down is retried, then fails."""
+        url = f"{self.server.url}token"
+        self.server.stop()
+        with patch.object(
+            Retry, "increment", autospec=True, side_effect=Retry.increment
+        ) as increment:
+            with self.assertRaises(requests.ConnectionError):
+                self.client_.post("token", url)
+        # the first try and 2 retries
+        self.assertEqual(increment.call_count, 3)
+        self.assertEqual(self.client_.stats()["token"]["errors"], 1)
+
+
+class GoogleLoginCallbackTestCase(TestCase):
+    """Test cases for exchanging the Google code for a login."""
+
+    def setUp(self):
+        """Start a stub login endpoint that returns the token of a user."""
+        self.user = User.objects.create_user(username="student")
+        token = Token.objects.create(user=self.user)
+        self.server = StubServer(
+            {("POST", reverse("google_login")): json_route({"key": token.key})}
+        )
+        self.addCleanup(self.server.stop)
+        settings_patch = override_settings(BASE_URL=self.server.url)
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+        client = patch(
+            "auth.views.outbound",
+            OutboundClient(timeout=(1, 0.5), retries=0),
+        )
+        self.outbound = client.start()
+        self.addCleanup(client.stop)
+
+    def test_login(self):
+        """The code is exchanged for the token and the user is logged in."""
+        response = self.client.get(
+            reverse("google_login_callback"), {"code": "google-code"}
+        )
+        self.assertRedirects(
+            response, reverse("manager:user_setup"), fetch_redirect_response=False
+        )
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.user.id)
+        self.assertEqual(self.server.requests, [("POST", reverse("google_login"))])
+        self.assertEqual(self.outbound.stats()["token_exchange"]["calls"], 1)
+
+    def test_slow_exchange(self):
+        """A login endpoint that does not answer in time fails the login."""
+        self.server.delay = 1
+        start = time.monotonic()
+        response = self.client.get(
+            reverse("google_login_callback"), {"code": "google-code"}
+        )
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertRedirects(
+            response, reverse("manager:main_login"), fetch_redirect_response=False
+        )
+        self.assertNotIn("_auth_user_id", self.client.session)
+        self.assertEqual(self.outbound.stats()["token_exchange"]["errors"], 1)
@@ -0,0 +1,113 @@
+"""Tests for the opt-in keyset pagination of the list APIs."""
+
+from datetime import date, datetime, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from manager.models import Event, EstimateHistory, Task
+from .templates_for_tests import BaseTestCase, create_taskboard
+
+
+class KeysetPaginationTests(BaseTestCase):
+    """Walk through large generated lists one page at a time."""
+
+    def setUp(self):
+        """Create a taskboard for the user."""
+        super().setUp()
+        self.taskboard = create_taskboard(self.user1)
+
+    def walk(self, url: str) -> tuple[list[dict], list[int]]:
+        """
+        Follow the next links from the first page to the last.
+
+        :param url: The url of the first page.
+        :return: All objects and the number of queries used for each page.
+        """
+        results = []
+        queries = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            queries.append(len(context))
+            results += response.json()["results"]
+            url = response.json()["next"]
+        return results, queries
+
+    def test_tasks_with_equal_end_dates(self):
+        """Every task is listed once, in (end_date, id) order."""
+        midnight = timezone.make_aware(datetime(2024, 11, 1, 23, 59, 59, 999999))
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                taskboard=self.taskboard,
+                # only 10 different end dates, so most tasks share one
+                end_date=midnight + timedelta(days=i % 10),
+            )
+            for i in range(2000)
+        )
+        results, queries = self.walk("/api/tasks/?page_size=150")
+        expected = list(
+            Task.objects.order_by("end_date", "id").values_list("id", flat=True)
+        )
+        self.assertEqual([task["id"] for task in results], expected)
+        self.assertEqual(len(queries), 14)
+        # the last page costs the same as the first one
+        self.assertEqual(len(set(queries)), 1)
+
+    def test_events(self):
+        """Every event is listed once, in (start_date, id) order."""
+        start = timezone.now()
+        Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                user=self.user1,
+                start_date=start + timedelta(hours=i // 3),
+                end_date=start + timedelta(hours=i // 3 + 1),
+            )
+            for i in range(600)
+        )
+        results, queries = self.walk("/api/events/?page_size=100")
+        expected = list(
+            Event.objects.order_by("start_date", "id").values_list("id", flat=True)
+        )
+        self.assertEqual([event["id"] for event in results], expected)
+        self.assertEqual(len(set(queries)), 1)
+
+    def test_estimate_history(self):
+        """Every day of the estimate history is listed once, in date order."""
+        EstimateHistory.objects.bulk_create(
+            EstimateHistory(
+                taskboard=self.taskboard,
+                date=date(2020, 1, 1) + timedelta(days=i),
+                time_remaining=i,
+            )
+            for i in range(1000)
+        )
+        results, queries = self.walk(
+            f"/api/estimate_history/?taskboard={self.taskboard.id}&page_size=300"
+        )
+        self.assertEqual([row["time_remaining"] for row in results], list(range(1000)))
+        self.assertEqual(len(queries), 4)
+
+    def test_not_paginated_by_default(self):
+        """Without page_size or cursor the plain list is returned."""
+        Task.objects.create(title="Task", taskboard=self.taskboard)
+        response = self.client.get("/api/tasks/")
+        self.assertIsInstance(response.json(), list)
+
+    def test_page_size_is_bounded(self):
+        """The page size cannot go over the maximum."""
+        Task.objects.bulk_create(
+            Task(title=f"Task {i}", taskboard=self.taskboard) for i in range(1005)
+        )
+        response = self.client.get("/api/tasks/?page_size=5000")
+        self.assertEqual(len(response.json()["results"]), 1000)
+        self.assertIsNotNone(response.json()["next"])
+
+    def test_invalid_cursor(self):
+        """An invalid cursor returns 404."""
+        for cursor in ("garbage", "WyJhIiwgImIiXQ==", "WzFd"):
+            response = self.client.get(f"/api/tasks/?cursor={cursor}")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,105 @@
+"""Test resolving and caching the roles of users."""
+
+from django.contrib.auth.models import AnonymousUser, Group, Permission, User
+from django.test import TestCase
+from manager.models import CacheVersion
+from manager.roles import Role, get_role, get_role_permissions, permission_cache
+
+
+class RoleTestCase(TestCase):
+    """Test cases for the roles of users."""
+
+    def setUp(self):
+        """Create a user taking the A-levels."""
+        permission_cache.cache.clear()
+        permission_cache.reset_stats()
+        self.permissions = get_role_permissions()
+        self.user = User.objects.create_user(username="student")
+        self.user.user_permissions.add(self.permissions["is_taking_A_levels"])
+
+    def fresh_role(self) -> Role:
+        """Get the role of the user as a new request would."""
+        return get_role(User.objects.get(pk=self.user.pk))
+
+    def test_permissions_exist_after_migrate(self):
+        """The role permissions are created by migrate, not by a request."""
+        self.assertEqual(
+            set(self.permissions), {"is_parent", "is_taking_A_levels", "is_verified"}
+        )
+
+    def test_role(self):
+        """The role flags follow the permissions of the user."""
+        self.assertEqual(self.fresh_role(), Role(is_taking_a_levels=True))
+        self.assertEqual(get_role(AnonymousUser()), Role())
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.fresh_role(), Role())
+
+    def test_cached_across_requests(self):
+        """The permissions are read from the database once for many requests."""
+        self.fresh_role()
+        user = User.objects.get(pk=self.user.pk)
+        # only the versions of the permissions are read
+        with self.assertNumQueries(1):
+            self.assertTrue(get_role(user).is_taking_a_levels)
+            self.assertTrue(user.has_perm("manager.is_taking_A_levels"))
+            self.assertFalse(user.has_perm("manager.is_parent"))
+        self.assertEqual(permission_cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_user_permission_changes(self):
+        """Adding and removing permissions of a user is seen immediately."""
+        self.fresh_role()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(self.permissions["is_parent"])
+        self.assertTrue(self.fresh_role().is_parent)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.permissions["is_parent"].user_set.remove(self.user)
+        self.assertFalse(self.fresh_role().is_parent)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.clear()
+        self.assertEqual(self.fresh_role(), Role())
+
+    def test_group_permission_changes(self):
+        """Changing the permissions of a group is seen by its users."""
+        group = Group.objects.create(name="parents")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(group)
+        self.assertFalse(self.fresh_role().is_parent)
+        with self.captureOnCommitCallbacks(execute=True):
+            group.permissions.add(self.permissions["is_parent"])
+        self.assertTrue(self.fresh_role().is_parent)
+        with self.captureOnCommitCallbacks(execute=True):
+            group.delete()
+        self.assertFalse(self.fresh_role().is_parent)
+
+    def test_deleted_permission(self):
+        """Deleting a permission is seen by every user."""
+        self.fresh_role()
+        with self.captureOnCommitCallbacks(execute=True):
+            Permission.objects.filter(codename="is_taking_A_levels").delete()
+        self.assertEqual(self.fresh_role(), Role())
+
+    def test_changes_seen_on_commit(self):
+        """A permission change is seen once it is committed."""
+        self.fresh_role()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(self.permissions["is_parent"])
+            self.assertFalse(self.fresh_role().is_parent)
+        self.assertTrue(self.fresh_role().is_parent)
+
+    def test_login_keeps_permissions(self):
+        """Logging in does not invalidate the cached permissions."""
+        self.fresh_role()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.force_login(self.user)
+        self.assertEqual(callbacks, [])
+
+    def test_deleted_user(self):
+        """The permission version of a user is removed with the user."""
+        versions = CacheVersion.objects.filter(name=f"roles:user:{self.user.pk}")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.clear()
+        self.assertTrue(versions.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertFalse(versions.exists())
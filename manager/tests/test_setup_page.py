@@ -76,7 +76,9 @@ class SetUpPageTest(TestCase):
         """Test getting permissions as a regular student."""
         self.client.login(username="myTcasser", password="myTcasdabest123")
         url = reverse("manager:user_setup")
-        response = self.client.post(url, data={"type": "student", "exam": "false"})
+        # the permissions are seen once the request is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data={"type": "student", "exam": "false"})
         self.assertEqual(302, response.status_code)
         self.assertRedirects(response, reverse("manager:taskboard_index"))
         self.user = User.objects.get(pk=self.user1.pk)
@@ -88,7 +90,8 @@ class SetUpPageTest(TestCase):
         """Test getting permissions as an A-level student."""
         self.client.login(username="myTcasser", password="myTcasdabest123")
         url = reverse("manager:user_setup")
-        response = self.client.post(url, data={"type": "student", "exam": "true"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data={"type": "student", "exam": "true"})
         self.assertEqual(302, response.status_code)
         self.assertRedirects(response, reverse("manager:taskboard_index"))
         self.user = User.objects.get(pk=self.user1.pk)
@@ -100,7 +103,8 @@ class SetUpPageTest(TestCase):
         """Test getting permissions as a parent."""
         self.client.login(username="myTcasser", password="myTcasdabest123")
         url = reverse("manager:user_setup")
-        response = self.client.post(url, data={"type": "parent", "exam": "false"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data={"type": "parent", "exam": "false"})
         self.assertEqual(302, response.status_code)
         self.assertRedirects(response, reverse("manager:taskboard_index"))
         self.assertTrue(self.user1.has_perm("manager.is_verified"))
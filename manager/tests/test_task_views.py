@@ -1,13 +1,18 @@
 """Test task creation, deletion, modification and redirections."""
 
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 from rest_framework import status
 from django.utils import timezone
+from django.db import connection
 from django.test import TestCase
-from manager.models import Taskboard, Task
+from django.test.utils import CaptureQueriesContext
+from manager.models import Taskboard, Task, EstimateHistory
 from typing import Any, Optional
-from .templates_for_tests import create_taskboard, create_task
+from .templates_for_tests import create_taskboard, create_task, BaseTestCase
 from django.contrib.auth.models import User
+from manager.serializers import TaskSerializer
+from manager.views.streaming import stream_json_list
 
 
 def create_task_json(
@@ -191,3 +196,191 @@ class TaskViewTests(TestCase):
         self.task_1.refresh_from_db()
         self.assertEqual(self.task_1.title, "Task 1")
         self.assertEqual(self.task_1.status, "TODO")
+
+
+class BulkTaskViewTests(BaseTestCase):
+    """Tests for the bulk action of TaskViewSet."""
+
+    def setUp(self):
+        """Create 2 Taskboards with some tasks."""
+        super().setUp()
+        self.taskboard_1 = create_taskboard(self.user1, "Today")
+        self.taskboard_2 = create_taskboard(self.user1, "Today but number 2")
+        self.task_1 = create_task("Task 1", "TODO", self.taskboard_1)
+        self.task_2 = create_task("Task 2", "INPROGRESS", self.taskboard_1)
+        self.task_3 = create_task("Task 3", "TODO", self.taskboard_2)
+
+    def post_bulk(self, data):
+        """Send a bulk request with the given data."""
+        return self.client.post(
+            "/api/tasks/bulk/", data, content_type="application/json"
+        )
+
+    def time_remaining(self, taskboard: Taskboard) -> int:
+        """Return today's time remaining of a taskboard."""
+        return EstimateHistory.objects.get(
+            taskboard=taskboard, date=timezone.localdate()
+        ).time_remaining
+
+    def test_bulk_create_update_delete(self):
+        """Test creating, updating and deleting tasks in one request."""
+        self.task_1.time_estimate = 4
+        self.task_1.save()
+        self.task_3.time_estimate = 6
+        self.task_3.save()
+        new_tasks = []
+        for i in range(100):
+            task = create_task_json(f"Syllabus {i}", "TODO", self.taskboard_2)
+            task["time_estimate"] = 1
+            new_tasks.append(task)
+        data = {
+            "create": new_tasks,
+            "update": [{"id": self.task_1.id, "status": "DONE"}],
+            "delete": [self.task_3.id],
+        }
+        response = self.post_bulk(data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["create"]), 100)
+        self.assertEqual(response.data["delete"], [self.task_3.id])
+        self.assertEqual(Task.objects.count(), 3 + 100 - 1)
+        self.task_1.refresh_from_db()
+        self.assertEqual(self.task_1.status, "DONE")
+        self.assertEqual(self.time_remaining(self.taskboard_1), 0)
+        self.assertEqual(self.time_remaining(self.taskboard_2), 100)
+
+    def test_bulk_query_count(self):
+        """The number of queries should not grow with the number of tasks."""
+        new_tasks = [
+            create_task_json(f"Syllabus {i}", "TODO", self.taskboard_2)
+            for i in range(50)
+        ]
+        with CaptureQueriesContext(connection) as one_task:
+            self.post_bulk({"create": new_tasks[:1], "update": []})
+        with self.assertNumQueries(len(one_task.captured_queries)):
+            response = self.post_bulk({"create": new_tasks, "update": []})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_moving_task_between_taskboards(self):
+        """Moving a task moves its time estimate to the other taskboard."""
+        self.task_1.time_estimate = 5
+        self.task_1.save()
+        response = self.post_bulk(
+            {"update": [{"id": self.task_1.id, "taskboard": self.taskboard_2.id}]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.time_remaining(self.taskboard_1), 0)
+        self.assertEqual(self.time_remaining(self.taskboard_2), 5)
+
+    def test_bulk_reports_errors_per_item(self):
+        """Invalid items are reported in place and nothing is written."""
+        data = {
+            "create": [create_task_json("Valid", "TODO", self.taskboard_1), {}],
+            "update": [{"id": 9999, "title": "missing"}],
+            "delete": [self.task_2.id, "abc"],
+        }
+        response = self.post_bulk(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["create"][0], {})
+        self.assertIn("title", response.data["create"][1])
+        self.assertEqual(response.data["update"][0], {"error": "Task not found"})
+        self.assertEqual(response.data["delete"][0], {})
+        self.assertEqual(response.data["delete"][1], {"error": "Task not found"})
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_bulk_delete_done_task(self):
+        """Deleting a DONE task leaves the time remaining as it is."""
+        self.task_1.time_estimate = 4
+        self.task_1.save()
+        self.task_2.time_estimate = 6
+        self.task_2.status = "DONE"
+        self.task_2.save()
+        response = self.post_bulk({"delete": [self.task_2.id]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.time_remaining(self.taskboard_1), 4)
+
+    def test_bulk_update_and_delete_same_task(self):
+        """A task cannot be updated and deleted in the same request."""
+        self.task_1.time_estimate = 4
+        self.task_1.save()
+        data = {
+            "update": [{"id": self.task_1.id, "time_estimate": 10}],
+            "delete": [self.task_1.id],
+        }
+        response = self.post_bulk(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["update"][0], {"error": "Task is also deleted"})
+        self.assertEqual(response.data["delete"][0], {"error": "Task is also updated"})
+        self.assertTrue(Task.objects.filter(pk=self.task_1.pk).exists())
+        self.assertEqual(self.time_remaining(self.taskboard_1), 4)
+
+    def test_bulk_other_users_tasks(self):
+        """Tasks and taskboards of other users cannot be changed."""
+        other = User.objects.create_user(username="other")
+        other_tb = create_taskboard(other)
+        other_task = create_task("Other", "TODO", other_tb)
+        data = {
+            "create": [create_task_json("Sneaky", "TODO", other_tb)],
+            "delete": [other_task.id],
+        }
+        response = self.post_bulk(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("taskboard", response.data["create"][0])
+        self.assertEqual(response.data["delete"][0], {"error": "Task not found"})
+        self.assertTrue(Task.objects.filter(pk=other_task.pk).exists())
+
+
+class StreamTaskViewTests(BaseTestCase):
+    """Tests for streaming the task list."""
+
+    def test_stream_matches_list(self):
+        """Streamed tasks have the same content and order as the normal list."""
+        tb = create_taskboard(self.user1)
+        for i in range(7):
+            create_task(f"Task {i}", "TODO", tb, timezone.now() + timedelta(days=-i))
+        response = self.client.get("/api/tasks/?exclude=DONE")
+        streamed = self.client.get("/api/tasks/?exclude=DONE&stream=1")
+        self.assertEqual(streamed["Content-Type"], "application/json")
+        content = b"".join(streamed.streaming_content)
+        self.assertEqual(json.loads(content), response.json())
+
+    def test_stream_in_chunks(self):
+        """Objects are fetched and serialized in chunks."""
+        tb = create_taskboard(self.user1)
+        for i in range(5):
+            create_task(f"Task {i}", "TODO", tb)
+        queryset = Task.objects.order_by("pk")
+        streamed = stream_json_list(queryset, TaskSerializer, chunk_size=2)
+        content = b"".join(streamed.streaming_content)
+        self.assertEqual(json.loads(content), TaskSerializer(queryset, many=True).data)
+
+
+class DateWindowTaskViewTests(BaseTestCase):
+    """Tests for listing tasks inside a date window."""
+
+    def test_get_tasks_in_window(self):
+        """Only tasks due inside the start/end window are listed."""
+        tb = create_taskboard(self.user1)
+        create_task("October", "TODO", tb, timezone.make_aware(datetime(2024, 10, 31)))
+        create_task("November", "TODO", tb, timezone.make_aware(datetime(2024, 11, 5)))
+        create_task("Done", "DONE", tb, timezone.make_aware(datetime(2024, 11, 6)))
+        create_task("December", "TODO", tb, timezone.make_aware(datetime(2024, 12, 1)))
+        response = self.client.get(
+            "/api/tasks/?exclude=DONE&start=2024-11-01&end=2024-12-01"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task["title"] for task in response.json()], ["November"])
+
+    def test_get_tasks_in_window_with_offset(self):
+        """The datetimes with an offset sent by FullCalendar are accepted."""
+        tb = create_taskboard(self.user1)
+        create_task("November", "TODO", tb, timezone.make_aware(datetime(2024, 11, 5)))
+        response = self.client.get(
+            "/api/tasks/",
+            {"start": "2024-11-01T00:00:00+07:00", "end": "2024-12-01T00:00:00+07:00"},
+        )
+        self.assertEqual(len(response.json()), 1)
+
+    def test_get_tasks_invalid_window(self):
+        """An invalid start or end returns 400."""
+        response = self.client.get("/api/tasks/?end=not-a-date")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
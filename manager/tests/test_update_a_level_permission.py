@@ -41,7 +41,8 @@ class UpdateALevelPermissionTest(ProfileTestCase):
         )
         self.assertTrue(self.student.has_perm("manager.is_taking_A_levels"))
         form_data = {"choice": "No"}
-        response = self.client.post(self.url, form_data, follow=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, form_data, follow=True)
         self.assertRedirects(
             response, self.profile, status_code=302, target_status_code=200
         )
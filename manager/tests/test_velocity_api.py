@@ -1,11 +1,14 @@
 """Test Burndown chart views."""
 
+import tempfile
 from django.test import TestCase
 from django.utils import timezone
 from .templates_for_tests import create_taskboard, create_estimate_hisotry
 from django.contrib.auth.models import User
 from rest_framework import status
-from datetime import timedelta
+from datetime import date, timedelta
+from manager.models import CacheVersion, EstimateHistory, Task
+from manager.velocity_cache import velocity_cache, VelocityCache
 
 
 class EstimateHistoryViewTests(TestCase):
@@ -32,6 +35,8 @@ class EstimateHistoryViewTests(TestCase):
         self.eh1 = create_estimate_hisotry(self.tb, self.two_days_before, 70)
         self.eh2 = create_estimate_hisotry(self.tb, self.yesterday, 60)
         self.eh3 = create_estimate_hisotry(self.tb, self.today, 40)
+        velocity_cache.cache.clear()
+        velocity_cache.reset_stats()
 
     def test_get_simple_velocity(self):
         """Test getting the velocity for data that is trending downward."""
@@ -78,3 +83,162 @@ class EstimateHistoryViewTests(TestCase):
         # 40 hr left this month should finish by next month
         next_month = self.today.replace(month=max(self.today.month % 12 + 1, 1))
         self.assertEqual(response.data["x"], next_month.strftime("%Y-%m-%d"))
+
+    def get_velocity(self):
+        """Get the average velocity from the start of the history."""
+        return self.client.get(
+            f"/api/velocity/?start={self.two_days_before.strftime('%Y-%m-%d')}"
+            f"&taskboard={self.tb.id}&mode=average"
+        )
+
+    def test_velocity_is_cached(self):
+        """Getting the same velocity twice only computes it once."""
+        first = self.get_velocity()
+        with self.assertNumQueries(3):  # session, user and version
+            second = self.get_velocity()
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(velocity_cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_task_changes_invalidate_velocity(self):
+        """Changing the time remaining of the taskboard recomputes the velocity."""
+        self.assertEqual(self.get_velocity().data["velocity"], 15.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title="new", taskboard=self.tb, time_estimate=20)
+        # today's time remaining went from 40 back up to 60
+        self.assertEqual(self.get_velocity().data["velocity"], 5.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.get_velocity().data["velocity"], 15.0)
+        self.assertEqual(velocity_cache.stats(), {"hits": 0, "misses": 3})
+
+    def test_version_bumped_on_commit(self):
+        """The version of a taskboard changes once the task change is committed."""
+        version = velocity_cache.get_version(self.tb.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title="new", taskboard=self.tb, time_estimate=20)
+            self.assertEqual(velocity_cache.get_version(self.tb.id), version)
+        self.assertNotEqual(velocity_cache.get_version(self.tb.id), version)
+
+    def test_velocity_stats_is_admin_only(self):
+        """Only admins can see the cache counters."""
+        response = self.client.get("/api/velocity/stats/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        self.get_velocity()
+        response = self.client.get("/api/velocity/stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"hits": 0, "misses": 1})
+
+
+class VelocityVersionTests(TestCase):
+    """Tests for the velocity versions kept in the database."""
+
+    def setUp(self):
+        """Create a taskboard."""
+        super().setUp()
+        self.tb = create_taskboard(User.objects.create_user(username="Tester"))
+
+    def test_bump_is_one_query(self):
+        """Creating and increasing a version is a single upsert."""
+        versions = []
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                with self.captureOnCommitCallbacks(execute=True):
+                    velocity_cache.bump_version(self.tb.id)
+            versions.append(velocity_cache.get_version(self.tb.id))
+        self.assertEqual(versions[1], versions[0] + 1)
+        self.assertEqual(CacheVersion.objects.count(), 1)
+
+    def test_deleted_taskboard(self):
+        """The version of a taskboard is removed with it."""
+        with self.captureOnCommitCallbacks(execute=True):
+            velocity_cache.bump_version(self.tb.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tb.delete()
+        self.assertFalse(CacheVersion.objects.exists())
+
+
+class VelocityCacheBackendTests(TestCase):
+    """Tests for VelocityCache with a file-based backend shared by processes."""
+
+    def test_file_based_cache(self):
+        """Results are stored in the file-based cache."""
+        with tempfile.TemporaryDirectory() as location:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+            with self.settings(
+                CACHES={"velocity": {"BACKEND": backend, "LOCATION": location}}
+            ):
+                cache = VelocityCache()
+                self.assertEqual(cache.get_or_compute(1, ("a",), lambda: 1), 1)
+                self.assertEqual(cache.get_or_compute(1, ("a",), lambda: 2), 1)
+                # another process sees the same results
+                self.assertEqual(
+                    VelocityCache().get_or_compute(1, ("a",), lambda: 3), 1
+                )
+                with self.captureOnCommitCallbacks(execute=True):
+                    cache.bump_version(1)
+                self.assertEqual(cache.get_or_compute(1, ("a",), lambda: 4), 4)
+                self.assertEqual(cache.stats(), {"hits": 1, "misses": 2})
+
+
+class WorkDoneTests(TestCase):
+    """Benchmark EstimateHistoryManager.work_done on a long history."""
+
+    YEARS = 5
+
+    def setUp(self):
+        """Create a taskboard with 5 years of daily EstimateHistory."""
+        super().setUp()
+        user = User.objects.create_user(username="Tester")
+        self.tb = create_taskboard(user, "Long Taskboard")
+        self.start = date(2019, 1, 1)
+        self.days = 365 * self.YEARS
+        # work goes down by 3 each day and 20 more is added every 10 days
+        EstimateHistory.objects.bulk_create(
+            EstimateHistory(
+                taskboard=self.tb,
+                date=self.start + timedelta(days=i),
+                time_remaining=10000 - 3 * i + 20 * (i // 10),
+            )
+            for i in range(self.days)
+        )
+
+    def work_done_in_python(self, interval: str):
+        """Compute work_done with the fallback for databases without windows."""
+        manager = EstimateHistory.objects
+        start = self.start + timedelta(days=30)
+        return manager._work_done_in_python(
+            manager.filter(taskboard=self.tb, date__lte=start)
+            .order_by("-date")
+            .values("date", "time_remaining")[:1],
+            manager.filter(taskboard=self.tb, date__gte=start),
+            interval,
+        )
+
+    def test_work_done_in_one_query(self):
+        """Each interval is computed with one query."""
+        start = self.start + timedelta(days=30)
+        for interval in ("day", "week", "month"):
+            with self.subTest(interval=interval), self.assertNumQueries(1):
+                result = EstimateHistory.objects.work_done(self.tb, start, interval)
+            self.assertEqual(result, self.work_done_in_python(interval))
+
+    def test_daily_work_done(self):
+        """Only decreases count as work done."""
+        total_work, time_remaining = EstimateHistory.objects.work_done(
+            self.tb, self.start
+        )
+        # every day except the ones where work is added
+        decreasing_days = self.days - 1 - (self.days - 1) // 10
+        self.assertEqual(total_work, 3 * decreasing_days)
+        self.assertEqual(time_remaining, 10000 - 3 * (self.days - 1) + 20 * 182)
+
+    def test_no_history(self):
+        """There is no work done without history before and after the start."""
+        self.assertIsNone(
+            EstimateHistory.objects.work_done(self.tb, date(2010, 1, 1), "week")
+        )
+        self.assertIsNone(
+            EstimateHistory.objects.work_done(self.tb, date(2030, 1, 1), "week")
+        )
@@ -0,0 +1,81 @@
+"""Module for caching the velocity of taskboards.
+
+Velocity results are cached per taskboard and invalidated by a version
+that is bumped whenever the time remaining of the taskboard changes. The
+version is a CacheVersion row, so a change is seen by every process at
+once, and it is removed with the taskboard. The results are kept in the
+"velocity" entry of settings.CACHES, which can be the local-memory cache,
+a shared file-based cache or any other Django cache backend such as Redis.
+"""
+
+from typing import Any, Callable
+from asgiref.sync import sync_to_async
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .versioned_cache import VersionedCache
+
+CACHE_ALIAS = "velocity"
+
+
+class VelocityCache(VersionedCache):
+    """A cache for velocity results with hit and miss counters."""
+
+    def __init__(self, alias: str = CACHE_ALIAS):
+        """Create a cache using the given settings.CACHES alias."""
+        super().__init__("velocity", alias)
+
+    def _version_name(self, taskboard_id) -> str:
+        return f"velocity:taskboard:{taskboard_id}"
+
+    def get_version(self, taskboard_id) -> int:
+        """Return the current version of a taskboard."""
+        return self.get_versions([self._version_name(taskboard_id)])[0]
+
+    def bump_version(self, taskboard_id) -> None:
+        """Invalidate all cached results of a taskboard."""
+        self.bump(self._version_name(taskboard_id))
+
+    def get_or_compute(
+        self, taskboard_id, params: tuple, compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached result for the params or compute and cache it.
+
+        The current date is part of the key since velocity depends on it.
+
+        :param taskboard_id: The id of the taskboard of the result.
+        :param params: The parameters the result depends on.
+        :param compute: A function that computes the result.
+        :return: The result.
+        """
+        return self.get_or_set(
+            [self._version_name(taskboard_id)],
+            (taskboard_id, timezone.localdate(), *params),
+            compute,
+        )
+
+    async def aget_or_compute(
+        self, taskboard_id, params: tuple, compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached result for the params or compute it in an async view.
+
+        :param taskboard_id: The id of the taskboard of the result.
+        :param params: The parameters the result depends on.
+        :param compute: A sync function that computes the result, it is
+            called in a thread.
+        :return: The result.
+        """
+        return await self.aget_or_set(
+            [self._version_name(taskboard_id)],
+            (taskboard_id, timezone.localdate(), *params),
+            sync_to_async(compute),
+        )
+
+
+velocity_cache = VelocityCache()
+
+
+@receiver(post_delete, sender="manager.Taskboard")
+def forget_taskboard_version(sender, instance, **kwargs):
+    """Remove the velocity version of a deleted taskboard."""
+    velocity_cache.forget([velocity_cache._version_name(instance.pk)])
@@ -0,0 +1,138 @@
+"""Module for caches whose entries are invalidated by versions in the database.
+
+An entry is stored under a key made of the current versions of the data it
+was computed from, so bumping one of these versions makes the older entries
+unreachable. The versions are CacheVersion rows shared by every process, while
+the entries can be kept in any Django cache backend: with the local-memory
+cache each process computes its own entries, but never reads one of an old
+version.
+"""
+
+from threading import Lock
+from typing import Any, Awaitable, Callable, Iterable
+from django.core.cache import caches
+from django.db import transaction
+from .models.cache_version import CacheVersion
+
+
+class VersionedCache:
+    """A cache with versioned keys and hit and miss counters.
+
+    The counters are kept in the memory of the current process.
+    """
+
+    def __init__(self, prefix: str, alias: str):
+        """Create a cache.
+
+        :param prefix: The first part of every key of this cache.
+        :param alias: The settings.CACHES alias of the backend of the entries.
+        """
+        self.prefix = prefix
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    @property
+    def cache(self):
+        """Return the Django cache backend."""
+        return caches[self.alias]
+
+    def get_versions(self, names: Iterable[str]) -> tuple[int, ...]:
+        """Return the current versions of some data with a single query.
+
+        :param names: The CacheVersion names.
+        :return: The versions in the same order, 0 for those never bumped.
+        """
+        names = list(names)
+        versions = dict(_versions_query(names))
+        return tuple(versions.get(name, 0) for name in names)
+
+    async def aget_versions(self, names: Iterable[str]) -> tuple[int, ...]:
+        """Return the current versions of some data in an async view."""
+        names = list(names)
+        versions = {name: version async for name, version in _versions_query(names)}
+        return tuple(versions.get(name, 0) for name in names)
+
+    def bump(self, name: str) -> None:
+        """Invalidate every entry computed from some data.
+
+        Call it after changing the data. Inside a transaction the version is
+        bumped once the transaction commits, so other processes never see the
+        new version before the new data.
+
+        :param name: The CacheVersion name of the data.
+        """
+        transaction.on_commit(lambda: CacheVersion.objects.bump(name))
+
+    def forget(self, names: Iterable[str]) -> None:
+        """Remove the versions of data that was deleted, once the deletion commits.
+
+        :param names: The CacheVersion names of the data.
+        """
+        names = list(names)
+        transaction.on_commit(lambda: CacheVersion.objects.forget(names))
+
+    def get_or_set(
+        self, names: Iterable[str], parts: tuple, compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached entry for the current versions or compute and cache it.
+
+        :param names: The CacheVersion names the entry depends on.
+        :param parts: The other values the entry depends on.
+        :param compute: A function that computes the entry, it must not return None.
+        :return: The entry.
+        """
+        key = self._key(self.get_versions(names), parts)
+        value = self.cache.get(key)
+        self._count(value)
+        if value is None:
+            value = compute()
+            self.cache.set(key, value)
+        return value
+
+    async def aget_or_set(
+        self,
+        names: Iterable[str],
+        parts: tuple,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached entry for the current versions in an async view.
+
+        :param names: The CacheVersion names the entry depends on.
+        :param parts: The other values the entry depends on.
+        :param compute: An async function that computes the entry.
+        :return: The entry.
+        """
+        key = self._key(await self.aget_versions(names), parts)
+        value = await self.cache.aget(key)
+        self._count(value)
+        if value is None:
+            value = await compute()
+            await self.cache.aset(key, value)
+        return value
+
+    def _key(self, versions: tuple[int, ...], parts: tuple) -> str:
+        return ":".join(str(i) for i in (self.prefix, *versions, *parts))
+
+    def _count(self, value: Any) -> None:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of hits and misses of this process."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        """Set the hit and miss counters back to 0."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+def _versions_query(names: list[str]):
+    return CacheVersion.objects.filter(name__in=names).values_list("name", "version")
@@ -6,3 +6,4 @@ from .taskboard import *
 from .default_role import *
 from .dashboard import *
 from .profile import *
+from .database import *
@@ -0,0 +1,90 @@
+"""Async versions of the read-only manager API endpoints for the ASGI mode.
+
+Each function answers the same GET requests as the list method of a
+ViewSet with the async ORM and is turned into a view by
+mysite.async_api.async_read_view, which sends the rest to the ViewSet.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpRequest, HttpResponse
+from manager.models import EstimateHistory, Event
+from manager.serializers import (
+    EstimateHistorySerializer,
+    EventSerializer,
+    TaskSerializer,
+)
+from manager.velocity_cache import velocity_cache
+from mysite.async_api import json_response
+from .burndown import VelocityViewSet
+from .date_range import get_date_range
+from .tasks import get_task_queryset
+
+
+async def task_list(request: HttpRequest, user: User) -> HttpResponse:
+    """List Tasks like TaskViewSet.list.
+
+    The Tasks and the access to them are checked in a thread by the same
+    function as TaskViewSet.list, only the list is read with the async ORM.
+
+    :param request: The HTTP request with the taskboard, exclude, user,
+        start and end query parameters.
+    :param user: The current user.
+    :return: Response with tasks.
+    """
+    try:
+        queryset = await sync_to_async(get_task_queryset)(request, user)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+    if queryset is None:
+        return HttpResponse(status=404)
+    tasks = [task async for task in queryset]
+    return json_response(TaskSerializer(tasks, many=True).data)
+
+
+async def event_list(request: HttpRequest, user: User) -> HttpResponse:
+    """List the Events of the current user like EventViewSet.list.
+
+    :param request: The HTTP request with the start and end query parameters.
+    :param user: The current user.
+    :return: Response with events.
+    """
+    try:
+        start, end = get_date_range(request)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+    queryset = Event.objects.filter(user=user)
+    if start:
+        queryset = queryset.filter(end_date__gt=start)
+    if end:
+        queryset = queryset.filter(start_date__lt=end)
+    events = [event async for event in queryset]
+    return json_response(EventSerializer(events, many=True).data)
+
+
+async def estimate_history_list(request: HttpRequest, user: User) -> HttpResponse:
+    """List the EstimateHistory objects of a taskboard.
+
+    :param request: The HTTP request with the taskboard query parameter.
+    :param user: The current user.
+    :return: Response with the estimate history.
+    """
+    queryset = EstimateHistory.objects.filter(
+        taskboard=request.GET.get("taskboard")
+    ).order_by("date")
+    history = [estimate async for estimate in queryset]
+    return json_response(EstimateHistorySerializer(history, many=True).data)
+
+
+async def velocity(request: HttpRequest, user: User) -> HttpResponse:
+    """Get a velocity like VelocityViewSet.list.
+
+    Cached results are read without a thread, a missing one is computed
+    in a thread.
+
+    :param request: The HTTP request with the velocity query parameters.
+    :param user: The current user.
+    :return: Response with the velocity.
+    """
+    args = VelocityViewSet().get_velocity_args(request.GET)
+    return json_response(await velocity_cache.aget_or_compute(*args))
@@ -1,35 +1,62 @@
 """Module for views relating to burndown chart pages."""
 
 from manager.serializers import EstimateHistorySerializer
-from manager.models import EstimateHistory
+from manager.models import EstimateHistory, BurndownSeries
+from manager.models.burndown_series import INTERVALS
+from django.http import QueryDict
 from django.views import generic
 from manager.models import Taskboard
+from manager.velocity_cache import velocity_cache
+from mysite.pagination import KeysetPagination
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable
 from math import ceil
-from django.db.models import Max
-from django.db.models.functions import TruncMonth, TruncWeek
 
 
 class VelocityViewSet(viewsets.ViewSet):
     """Viewset for getting velocity."""
 
     def list(self, request):
-        """Get a velocity depending on the given query parameters."""
-        mode = request.query_params.get("mode")
-        start_date = request.query_params.get(
-            "start", timezone.now().strftime("%Y-%m-%d")
+        """Get a velocity depending on the given query parameters.
+
+        Results are cached until the time remaining of the taskboard changes.
+        """
+        data = velocity_cache.get_or_compute(
+            *self.get_velocity_args(request.query_params)
         )
-        taskboard_id = request.query_params.get("taskboard")
-        interval = request.query_params.get("interval", "day")
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_velocity_args(self, params: QueryDict) -> tuple[str, tuple, Callable]:
+        """
+        Get what the velocity depends on from the query parameters.
+
+        :param params: The query parameters mode, start, taskboard and interval.
+        :return: The taskboard id, the cache parameters and a function that
+            computes the velocity.
+        """
+        mode = params.get("mode")
+        start_date = params.get("start", timezone.now().strftime("%Y-%m-%d"))
+        taskboard_id = params.get("taskboard")
+        interval = params.get("interval", "day")
         if mode == "average":
-            data = self.compute_average_velocity(start_date, interval, taskboard_id)
+            compute = self.compute_average_velocity
         else:
-            data = self.compute_basic_velocity(start_date, interval, taskboard_id)
-        return Response(data, status=status.HTTP_200_OK)
+            compute = self.compute_basic_velocity
+        return (
+            taskboard_id,
+            (start_date, interval, mode),
+            lambda: compute(start_date, interval, taskboard_id),
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def stats(self, request):
+        """Get the hit and miss counters of the velocity cache."""
+        return Response(velocity_cache.stats(), status=status.HTTP_200_OK)
 
     def compute_basic_velocity(
         self, start_date: str, unit: str, taskboard_id: int
@@ -48,7 +75,11 @@ class VelocityViewSet(viewsets.ViewSet):
         """
         start_day = timezone.make_aware(datetime.fromisoformat(start_date))
         start_estimate = (
-            EstimateHistory.objects.filter(date__lte=start_day).order_by("date").last()
+            EstimateHistory.objects.filter(
+                taskboard__id=taskboard_id, date__lte=start_day
+            )
+            .order_by("date")
+            .last()
         )
         end_estimate = (
             EstimateHistory.objects.filter(taskboard__id=taskboard_id)
@@ -101,28 +132,19 @@ class VelocityViewSet(viewsets.ViewSet):
         :return: The average work done per unit of time and finishing date.
         """
         start_day = timezone.make_aware(datetime.fromisoformat(start_date))
-        start_estimate = (
-            EstimateHistory.objects.filter(date__lte=start_day).order_by("date").last()
-        )
         length = self.get_timeframe(start_day, unit)
         if length == 0:
             return {"x": "", "velocity": 0}
-        history = self.aggregate_history_data(start_day, taskboard_id, unit)
-        total_work = 0
-        if not history or not start_estimate:
+        work_done = EstimateHistory.objects.work_done(
+            taskboard_id, start_day.date(), unit
+        )
+        if work_done is None:
             return {"x": "", "velocity": 0}
-        diff = start_estimate.time_remaining - history[0].time_remaining
-        if diff > 0:
-            total_work += diff
-        for day in range(1, len(history)):
-            diff = history[day - 1].time_remaining - history[day].time_remaining
-            if 0 < diff:
-                total_work += diff
+        total_work, time_remaining = work_done
         velocity = total_work / length
-        today = history.last()
         if velocity == 0:
             return {"x": "", "velocity": velocity}
-        units_needed = ceil(today.time_remaining / velocity)
+        units_needed = ceil(time_remaining / velocity)
         day = self.get_finishing_date(units_needed, unit)
         return {"x": day, "velocity": velocity}
 
@@ -144,48 +166,6 @@ class VelocityViewSet(viewsets.ViewSet):
             return finish_date.strftime("%Y-%m-%d")
         return (today + timezone.timedelta(days=units)).strftime("%Y-%m-%d")
 
-    def aggregate_history_data(
-        self, start_day: datetime, taskboard_id: int, interval: str
-    ):
-        """
-        Group the data for each estimateHistory object based on the given interval.
-
-        :param start_day: The first recorded date from the chart.
-        :param taskboard_id: The taskboard which contains the EstimateHistory.
-        :param interval: The interval to group data to.
-        :return: A Query set containing aggregated EstimatedHistory objects.
-        """
-        taskboard_data = EstimateHistory.objects.filter(
-            taskboard__id=taskboard_id, date__gte=start_day
-        ).order_by("date")
-        if interval == "week":
-            # get the latest history objects for each week
-            latest_entries = (
-                taskboard_data.annotate(weeks=TruncWeek("date"))
-                .values("weeks")
-                .annotate(most_recent=Max("date"))
-                .values_list("most_recent", flat=True)
-            )
-            # filter the db again for objects that are in the above query
-            data = EstimateHistory.objects.filter(
-                date__in=latest_entries, taskboard=taskboard_id
-            )
-            return data.order_by("date")
-        elif interval == "month":
-            # get the latest history objects for each month
-            latest_entries = (
-                taskboard_data.annotate(months=TruncMonth("date"))
-                .values("months")
-                .annotate(most_recent=Max("date"))
-                .values_list("most_recent", flat=True)
-            )
-            # filter the db again for objects that are in the above query
-            data = EstimateHistory.objects.filter(
-                date__in=latest_entries, taskboard=taskboard_id
-            )
-            return data.order_by("date")
-        return taskboard_data
-
 
 class BurndownView(generic.TemplateView):
     """A view for the burndown chart page."""
@@ -219,6 +199,8 @@ class EstimateHistoryViewset(viewsets.ModelViewSet):
     """A viewset for EstimateHistory."""
 
     serializer_class = EstimateHistorySerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ("date", "id")
 
     def get_queryset(self):
         """Return EstimateHistory objects based on taskboard id."""
@@ -229,9 +211,38 @@ class EstimateHistoryViewset(viewsets.ModelViewSet):
         """
         List EstimateHistory objects of a certain taskboard.
 
+        Add page_size or cursor to the query parameters to get one page
+        of the list at a time.
+
         :param request: The HTTP request.
         :return: Response with tasks.
         """
         queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = EstimateHistorySerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = EstimateHistorySerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def series(self, request):
+        """
+        Get the gap-filled burndown series of a taskboard.
+
+        There are 2 query parameters: taskboard and interval.
+        :taskboard: the id of the taskboard.
+        :interval:  day, week or month, defaults to day.
+
+        :param request: The HTTP request.
+        :return: Response with a list of [date, time remaining].
+        """
+        taskboard_id = request.query_params.get("taskboard")
+        interval = request.query_params.get("interval", "day")
+        if not taskboard_id or not taskboard_id.isdigit() or interval not in INTERVALS:
+            return Response(
+                {"error": "Invalid taskboard or interval"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        data = BurndownSeries.objects.get_series(int(taskboard_id), interval)
+        return Response({"interval": interval, "data": data}, status=status.HTTP_200_OK)
@@ -1,10 +1,44 @@
 """Views for the parent dashboard."""
 
-from django.db.models import Q
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, QuerySet
 from django.shortcuts import redirect, reverse
 from django.utils import timezone
 from django.views import generic
-from manager.models import Task
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+from manager.models import StudentInfo
+from manager.roles import get_role
+from manager.serializers import ChildStatisticsSerializer
+
+
+def get_children_statistics(parent: User) -> QuerySet[StudentInfo]:
+    """
+    Return the children of a parent with statistics of their tasks.
+
+    Each StudentInfo is annotated with the number of tasks that are
+    due today, late and finished. All counts are computed in one query.
+
+    :param parent: The parent user.
+    :return: A QuerySet of StudentInfo with today, late and fin annotations.
+    """
+    now = timezone.now()
+    tasks = "user__taskboard__task"
+    return (
+        parent.student_set.select_related("user")
+        .annotate(
+            today=Count(
+                tasks, filter=Q(**{f"{tasks}__end_date__date": timezone.localdate()})
+            ),
+            late=Count(
+                tasks,
+                filter=~Q(**{f"{tasks}__status": "DONE"})
+                & Q(**{f"{tasks}__end_date__lte": now}),
+            ),
+            fin=Count(tasks, filter=Q(**{f"{tasks}__status": "DONE"})),
+        )
+        .order_by("pk")
+    )
 
 
 class DashboardView(generic.ListView):
@@ -14,39 +48,8 @@ class DashboardView(generic.ListView):
     context_object_name = "child_list"
 
     def get_queryset(self):
-        """Return all children associated with the user."""
-        return self.request.user.student_set.all()
-
-    def get_context_data(self, **kwargs):
-        """Pass more task data for all related students."""
-        students = self.request.user.student_set.all()
-        context = super().get_context_data(**kwargs)
-        if students:
-            today = []
-            late = []
-            fin = []
-            for student in students:
-                today.append(
-                    Task.objects.filter(
-                        taskboard__user=student.user, end_date__day=timezone.now().day
-                    ).count()
-                )
-                late.append(
-                    Task.objects.filter(
-                        ~Q(status="DONE"),
-                        taskboard__user=student.user,
-                        end_date__lte=timezone.now(),
-                    ).count()
-                )
-                fin.append(
-                    Task.objects.filter(
-                        taskboard__user=student.user, status="DONE"
-                    ).count()
-                )
-            context["today"] = today
-            context["late"] = late
-            context["fin"] = fin
-        return context
+        """Return all children associated with the user and their statistics."""
+        return get_children_statistics(self.request.user)
 
     def get(self, request, *args, **kwargs):
         """
@@ -58,6 +61,25 @@ class DashboardView(generic.ListView):
         if not self.request.user.is_authenticated:
             return redirect(reverse("manager:main_login"))
         # check if user is a parent
-        if not self.request.user.has_perm("manager.is_parent"):
+        if not get_role(self.request.user).is_parent:
             return redirect(reverse("manager:taskboard_index"))
         return super().get(request, *args, **kwargs)
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """ViewSet for the statistics shown on the parent dashboard."""
+
+    def list(self, request):
+        """
+        List the children of the current user and their task statistics.
+
+        :param request: The HTTP request.
+        :return: Response with the statistics of each child,
+            404 if the user is not a parent.
+        """
+        if not get_role(request.user).is_parent:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        serializer = ChildStatisticsSerializer(
+            get_children_statistics(request.user), many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
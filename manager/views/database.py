@@ -0,0 +1,26 @@
+"""Views for monitoring the database connections."""
+
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from mysite.db_stats import database_stats
+
+
+class DatabaseStatsViewSet(viewsets.ViewSet):
+    """Viewset for the connection pool statistics of the databases."""
+
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        """
+        Get the connection settings and statistics of each database.
+
+        With a pool, this includes the connections in use and idle and the
+        time requests waited for a connection, which shows if there are
+        too many workers for the database. The numbers are of the process
+        that answers the request.
+
+        :param request: The HTTP request.
+        :return: Response with the statistics of each database alias.
+        """
+        return Response(database_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,49 @@
+"""Helpers for filtering list views by a date window."""
+
+import datetime
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_range_param(value: str | None) -> datetime.datetime | None:
+    """
+    Parse a start or end query parameter into an aware datetime.
+
+    Both dates ("2024-11-01") and datetimes with or without an offset
+    ("2024-11-01T00:00:00+07:00") are accepted, as sent by FullCalendar.
+
+    :param value: The raw query parameter.
+    :return: The datetime, or None if the parameter was not given.
+    :raises ValueError: If the parameter is not a valid date.
+    """
+    if not value:
+        return None
+    # a "+" in an unencoded query string is decoded as a space
+    value = value.strip().replace(" ", "+")
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.datetime.combine(date, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def get_date_range(
+    request,
+) -> tuple[datetime.datetime | None, datetime.datetime | None]:
+    """
+    Get the date window from the start and end query parameters.
+
+    :param request: The DRF or Django HTTP request.
+    :return: A tuple of (start, end), either can be None if not given.
+    :raises ValueError: If a parameter is invalid or end is before start.
+    """
+    params = getattr(request, "query_params", request.GET)
+    start = parse_range_param(params.get("start"))
+    end = parse_range_param(params.get("end"))
+    if start and end and end < start:
+        raise ValueError("end must be after start")
+    return start, end
@@ -1,12 +1,12 @@
 """A view to create default roles upon user creation."""
 
-from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import redirect
 from django.urls import reverse
-from manager.models import StudentInfo, UserPermissions, ParentInfo
+from manager.models import StudentInfo, ParentInfo
+from manager.roles import get_role, get_role_permissions
 from django.dispatch import receiver
 from django.db.models.signals import post_save
-from django.contrib.auth.models import User, Permission
+from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_not_required
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
@@ -46,7 +46,7 @@ class UserSetupView(TemplateView):
         if not self.request.user.is_authenticated:
             return redirect(reverse("manager:main_login"))
         # check if user has already set up their account
-        if self.request.user.has_perm("manager.is_verified"):
+        if get_role(self.request.user).is_verified:
             return redirect(reverse("manager:taskboard_index"))
         return super().get(request, *args, **kwargs)
 
@@ -56,18 +56,13 @@ class UserSetupView(TemplateView):
         if not self.request.user.is_authenticated:
             return redirect(reverse("manager:main_login"))
         # check if user has already set up their account
-        if self.request.user.has_perm("manager.is_verified"):
+        if get_role(self.request.user).is_verified:
             return redirect(reverse("manager:taskboard_index"))
-        content_type = ContentType.objects.get_for_model(UserPermissions)
-        verified, created = Permission.objects.get_or_create(
-            codename="is_verified", content_type=content_type
-        )
-        parent, created = Permission.objects.get_or_create(
-            codename="is_parent", content_type=content_type
-        )
-        calc_access, created = Permission.objects.get_or_create(
-            codename="is_taking_A_levels", content_type=content_type
-        )
+        # the permissions are created by migrate
+        permissions = get_role_permissions()
+        verified = permissions["is_verified"]
+        parent = permissions["is_parent"]
+        calc_access = permissions["is_taking_A_levels"]
         if request.POST["type"] == "parent":
             info = StudentInfo.objects.get(user=self.request.user)
             new_info = ParentInfo.objects.create(
@@ -5,19 +5,44 @@ from manager.models import Event
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from manager.serializers import EventSerializer
+from mysite.pagination import KeysetPagination
+from .date_range import get_date_range
+from .streaming import stream_json_list, wants_stream
 
 
 class EventViewSet(viewsets.ViewSet):
     """ViewSet fot handling Event-related operations."""
 
+    cursor_ordering = ("start_date", "id")
+
     def list(self, request):
         """
         List all Event objects related to the user who submitted the request.
 
+        The query parameters start and end limit the list to events that
+        overlap the given window, e.g. the month shown on the calendar.
+        Add the query parameter stream=1 to stream the list instead of
+        building it in memory, or page_size/cursor to get one page at a time.
+
         :param request: The HTTP request.
         :return: Response with events.
         """
+        try:
+            start, end = get_date_range(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         queryset = Event.objects.filter(user=request.user)
+        if start:
+            queryset = queryset.filter(end_date__gt=start)
+        if end:
+            queryset = queryset.filter(start_date__lt=end)
+        if wants_stream(request):
+            return stream_json_list(queryset.order_by("pk"), EventSerializer)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, self)
+        if page is not None:
+            serializer = EventSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = EventSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -6,8 +6,8 @@ from django.urls import reverse
 from django.http import HttpResponseRedirect
 from django.contrib import messages
 from django.views.generic import ListView
-from django.contrib.auth.models import Permission
 from manager.models import ParentInfo, StudentInfo, User
+from manager.roles import get_role, get_role_permissions
 
 
 class ProfileView(ListView):
@@ -19,7 +19,7 @@ class ProfileView(ListView):
     def get_queryset(self) -> models.QuerySet[Any]:
         """Return a query set of children if the user is a parent and vice versa."""
         user = self.request.user
-        if user.has_perm("manager.is_parent"):
+        if get_role(user).is_parent:
             return user.student_set.all()
         else:
             student_info = StudentInfo.objects.get(user=self.request.user)
@@ -29,7 +29,7 @@ class ProfileView(ListView):
         """Add user's displayed name to context."""
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        if user.has_perm("manager.is_parent"):
+        if get_role(user).is_parent:
             info = ParentInfo.objects.get(user=user)
         else:
             info = StudentInfo.objects.get(user=user)
@@ -46,7 +46,7 @@ def update_displayed_name(request):
     if request.method != "POST":
         return HttpResponseRedirect(reverse("manager:profile"))
     user = request.user
-    if user.has_perm("manager.is_parent"):
+    if get_role(user).is_parent:
         info = ParentInfo.objects.get(user=user)
     else:
         info = StudentInfo.objects.get(user=user)
@@ -72,7 +72,7 @@ def add_parent(request):
     except User.DoesNotExist:
         messages.error(request, f"There is no user with email: {email}.")
         return HttpResponseRedirect(reverse("manager:profile"))
-    if not parent_user.has_perm("manager.is_parent"):
+    if not get_role(parent_user).is_parent:
         messages.error(request, f"User with email: {email} is not a parent.")
         return HttpResponseRedirect(reverse("manager:profile"))
     if info.parent.filter(email=email).exists():
@@ -133,12 +133,11 @@ def update_a_level_permission(request):
     if request.method != "POST":
         return HttpResponseRedirect(reverse("manager:profile"))
     user = request.user
+    calc_access = get_role_permissions()["is_taking_A_levels"]
     if request.POST["choice"] == "Yes":
-        user.user_permissions.add(Permission.objects.get(codename="is_taking_A_levels"))
+        user.user_permissions.add(calc_access)
         messages.success(request, "You can now access A-level calculator.")
     if request.POST["choice"] == "No":
-        user.user_permissions.remove(
-            Permission.objects.get(codename="is_taking_A_levels")
-        )
+        user.user_permissions.remove(calc_access)
         messages.success(request, "Access to A-level calculator has been removed.")
     return HttpResponseRedirect(reverse("manager:profile"))
@@ -0,0 +1,45 @@
+"""Helpers for streaming large lists from the API."""
+
+import json
+from itertools import islice
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.serializers import Serializer
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_SIZE = 500
+
+
+def wants_stream(request) -> bool:
+    """Return True if the request asks for a streamed response with ?stream=1."""
+    return request.query_params.get("stream", "").lower() in ("1", "true")
+
+
+def stream_json_list(
+    queryset: QuerySet,
+    serializer_class: type[Serializer],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingHttpResponse:
+    """
+    Stream a queryset as a JSON array.
+
+    The queryset is read from the database and serialized chunk_size objects
+    at a time, so the whole list is never held in memory.
+    The output is the same as serializing the queryset with many=True.
+
+    :param queryset: The objects to list.
+    :param serializer_class: The serializer for each object.
+    :param chunk_size: The number of objects to fetch and serialize at once.
+    :return: A StreamingHttpResponse with the JSON array.
+    """
+
+    def generate():
+        objects = queryset.iterator(chunk_size=chunk_size)
+        separator = "["
+        while chunk := list(islice(objects, chunk_size)):
+            for data in serializer_class(chunk, many=True).data:
+                yield separator + json.dumps(data, cls=JSONEncoder)
+                separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    return StreamingHttpResponse(generate(), content_type="application/json")
@@ -3,6 +3,7 @@
 from rest_framework.authtoken.admin import User
 from rest_framework.response import Response
 from manager.models import Taskboard
+from manager.roles import get_role
 from django.views import generic
 from rest_framework import viewsets, status
 from manager.serializers import TaskboardSerializer
@@ -21,7 +22,7 @@ class TaskboardViewSet(viewsets.ModelViewSet):
         child's Taskboards, if not return all Taskboards of the current user.
         """
         # if the user is not a parent
-        if not self.request.user.has_perm("manager.is_parent"):
+        if not get_role(self.request.user).is_parent:
             return Taskboard.objects.filter(user=self.request.user)
         query = self.request.GET.get("user_id", None)
         if query:
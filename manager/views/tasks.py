@@ -1,25 +1,102 @@
 """Views for handling task creation, deletion and updates."""
 
+from collections import defaultdict
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
-from manager.models import Task, StudentInfo, Taskboard
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from manager.models import Task, StudentInfo, Taskboard, EstimateHistory
+from manager.roles import get_role
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from manager.serializers import TaskSerializer
+from mysite.pagination import KeysetPagination
+from .date_range import get_date_range
+from .streaming import stream_json_list, wants_stream
+
+
+def to_id(value) -> int | None:
+    """Convert a Task id from the request data into an int, None if invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def is_user_authorized(requesting_user: User, user_id: int) -> bool:
     """Check if the current user has access to another user's content."""
-    if not requesting_user.has_perm("manager.is_parent"):
+    if not get_role(requesting_user).is_parent:
         return False
-    info = StudentInfo.objects.get(user=user_id)
-    return info.parent.filter(email=requesting_user.email).exists()
+    return StudentInfo.objects.filter(
+        user=user_id, parent__email=requesting_user.email
+    ).exists()
+
+
+def get_task_queryset(request, user: User) -> QuerySet | None:
+    """
+    Get the Tasks listed by a request, for the sync and async views.
+
+    See TaskViewSet.list for the query parameters.
+
+    :param request: The DRF or Django HTTP request.
+    :param user: The current user.
+    :return: The Tasks in cursor order, not evaluated yet. None if the
+        taskboard or user does not exist or the user has no access to it.
+    :raises ValueError: If the start or end parameter is invalid.
+    """
+    params = getattr(request, "query_params", request.GET)
+    taskboard_id = params.get("taskboard")
+    ignore_status = params.get("exclude")
+    other_user = params.get("user")
+    start, end = get_date_range(request)
+    # get all non-finished tasks from the taskboard.
+    if ignore_status and taskboard_id:
+        queryset = Task.objects.filter(~Q(status=ignore_status), taskboard=taskboard_id)
+    # get tasks in a taskboard.
+    elif taskboard_id:
+        # see if the taskboard exists
+        owner = (
+            Taskboard.objects.filter(pk=taskboard_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+        if owner is None:
+            return None
+        if user.id != owner and not is_user_authorized(user, owner):
+            return None
+        queryset = Task.objects.filter(taskboard=taskboard_id)
+    # get non-finished tasks for the calendar.
+    elif ignore_status:
+        queryset = Task.objects.filter(~Q(status=ignore_status), taskboard__user=user)
+    # get all tasks of the given user, if self should have access
+    elif other_user:
+        if not is_user_authorized(user, other_user):
+            return None
+        queryset = Task.objects.filter(taskboard__user=other_user)
+    # get all tasks belonging to the current user
+    else:
+        queryset = Task.objects.filter(taskboard__user=user)
+    if start:
+        queryset = queryset.filter(end_date__gte=start)
+    if end:
+        queryset = queryset.filter(end_date__lt=end)
+    return queryset.order_by(*TaskViewSet.cursor_ordering)
 
 
 class TaskViewSet(viewsets.ViewSet):
     """ViewSet fot handling Task-related operations."""
 
+    cursor_ordering = ("end_date", "id")
+    BULK_UPDATE_FIELDS = (
+        "title",
+        "status",
+        "end_date",
+        "details",
+        "taskboard",
+        "time_estimate",
+    )
+
     def list(self, request):
         """
         List Tasks based on query parameters.
@@ -30,42 +107,27 @@ class TaskViewSet(viewsets.ViewSet):
                     and Tasks that belonged to other user.
         :user:      used to get all tasks belonging to the given user.
         If none of the query parameters are given, it will list all Tasks.
+        The start and end parameters limit the list to Tasks whose end date
+        is inside the given window.
+        Add stream=1 to stream the list instead of building it in memory,
+        or page_size/cursor to get one page of the list at a time.
 
         :param request: The HTTP request.
         :return: Response with tasks.
         """
-        taskboard_id = request.query_params.get("taskboard")
-        ignore_status = request.query_params.get("exclude")
-        user = request.query_params.get("user")
-        # get all non-finished tasks from the taskboard.
-        if ignore_status and taskboard_id:
-            queryset = Task.objects.filter(
-                ~Q(status=ignore_status), taskboard=taskboard_id
-            )
-        # get tasks in a taskboard.
-        elif taskboard_id:
-            # see if the taskboard exists
-            try:
-                owner = Taskboard.objects.get(pk=taskboard_id).user.id
-            except Taskboard.DoesNotExist:
-                return Response(status=status.HTTP_404_NOT_FOUND)
-            if request.user.id != owner and not is_user_authorized(request.user, owner):
-                return Response(status=status.HTTP_404_NOT_FOUND)
-            queryset = Task.objects.filter(taskboard=taskboard_id)
-        # get non-finished tasks for the calendar.
-        elif ignore_status:
-            queryset = Task.objects.filter(
-                ~Q(status=ignore_status), taskboard__user=request.user
-            )
-        # get all tasks of the given user, if self should have access
-        elif user:
-            if not is_user_authorized(request.user, user):
-                return Response(status=status.HTTP_404_NOT_FOUND)
-            queryset = Task.objects.filter(taskboard__user=user)
-        # get all tasks belonging to the current user
-        else:
-            queryset = Task.objects.filter(taskboard__user=request.user)
-        queryset = queryset.order_by("end_date")
+        try:
+            queryset = get_task_queryset(request, request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if queryset is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if wants_stream(request):
+            return stream_json_list(queryset, TaskSerializer)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, self)
+        if page is not None:
+            serializer = TaskSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = TaskSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -134,3 +196,114 @@ class TaskViewSet(viewsets.ViewSet):
             )
         event.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create, update and delete many Tasks of the current user at once.
+
+        The request data may contain 3 lists: create, update and delete.
+        :create: Task data to create, in the same format as create.
+        :update: Task data to update, each item must contain the Task's id.
+        :delete: ids of the Tasks to delete.
+        Every item is validated before anything is written. If any item is
+        invalid, nothing is written and the errors of each item are returned
+        in the same position as the item. A Task cannot be both updated and
+        deleted.
+        The time remaining of each affected taskboard is adjusted once.
+
+        :param request: The HTTP request with the lists of tasks.
+        :return: Response with the created and updated tasks and deleted ids.
+        """
+        to_create = request.data.get("create", [])
+        to_update = request.data.get("update", [])
+        to_delete = request.data.get("delete", [])
+        if not all(isinstance(i, list) for i in (to_create, to_update, to_delete)):
+            return Response(
+                {"error": "create, update and delete must be lists"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        update_ids = [
+            to_id(item.get("id")) if isinstance(item, dict) else None
+            for item in to_update
+        ]
+        delete_ids = [to_id(task_id) for task_id in to_delete]
+        own_tasks = Task.objects.filter(taskboard__user=request.user)
+        existing = own_tasks.in_bulk([i for i in update_ids if i is not None])
+        deleted = own_tasks.in_bulk([i for i in delete_ids if i is not None])
+        context = {"taskboards": Taskboard.objects.filter(user=request.user).in_bulk()}
+        errors = {"create": [], "update": [], "delete": []}
+
+        create_serializer = TaskSerializer(data=to_create, many=True, context=context)
+        create_serializer.is_valid()
+        create_errors = create_serializer.errors
+        if isinstance(create_errors, dict):
+            # newer versions of DRF only report the indexes of invalid items
+            create_errors = [create_errors.get(i, {}) for i in range(len(to_create))]
+        errors["create"] = create_errors or [{}] * len(to_create)
+
+        update_serializers = []
+        delete_id_set = set(delete_ids)
+        for task_id, item in zip(update_ids, to_update):
+            task = existing.get(task_id)
+            if task is None:
+                errors["update"].append({"error": "Task not found"})
+                continue
+            if task_id in delete_id_set:
+                errors["update"].append({"error": "Task is also deleted"})
+                continue
+            serializer = TaskSerializer(task, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors["update"].append(serializer.errors)
+                continue
+            errors["update"].append({})
+            update_serializers.append(serializer)
+
+        for task_id in delete_ids:
+            if task_id not in deleted:
+                errors["delete"].append({"error": "Task not found"})
+            elif task_id in existing:
+                errors["delete"].append({"error": "Task is also updated"})
+            else:
+                errors["delete"].append({})
+
+        if any(error for items in errors.values() for error in items):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        deltas = defaultdict(int)
+        new_tasks = [Task(**item) for item in create_serializer.validated_data]
+        for task in new_tasks:
+            deltas[task.taskboard_id] += Task.remaining_time(
+                task.status, task.time_estimate
+            )
+        updated_tasks = []
+        for serializer in update_serializers:
+            task = serializer.instance
+            deltas[task.taskboard_id] -= Task.remaining_time(
+                task.status, task.time_estimate
+            )
+            for field, value in serializer.validated_data.items():
+                setattr(task, field, value)
+            deltas[task.taskboard_id] += Task.remaining_time(
+                task.status, task.time_estimate
+            )
+            updated_tasks.append(task)
+        for task in deleted.values():
+            deltas[task.taskboard_id] -= Task.remaining_time(
+                task.status, task.time_estimate
+            )
+
+        with transaction.atomic():
+            Task.objects.bulk_create(new_tasks)
+            Task.objects.bulk_update(updated_tasks, self.BULK_UPDATE_FIELDS)
+            Task.objects.filter(pk__in=deleted.keys()).delete()
+            for taskboard_id, delta in deltas.items():
+                EstimateHistory.objects.add_time_remaining(taskboard_id, delta)
+        return Response(
+            {
+                "create": TaskSerializer(new_tasks, many=True).data,
+                "update": TaskSerializer(updated_tasks, many=True).data,
+                "delete": list(deleted.keys()),
+            },
+            status=status.HTTP_200_OK,
+        )
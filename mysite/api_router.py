@@ -1,5 +1,5 @@
 from rest_framework.routers import DefaultRouter
-from manager.views import TaskboardViewSet, EventViewSet, TaskViewSet, VelocityViewSet, EstimateHistoryViewset
+from manager.views import TaskboardViewSet, EventViewSet, TaskViewSet, VelocityViewSet, EstimateHistoryViewset, DashboardViewSet, DatabaseStatsViewSet
 from calculator.views import (
     ExamsViewSet,
     UniversityViewSet,
@@ -7,7 +7,8 @@ from calculator.views import (
     MajorViewSet,
     CriteriaViewSet,
     StudentExamScoreViewSet,
-    ScoreHistoryViewSet
+    ScoreHistoryViewSet,
+    CatalogViewSet
 )
 
 
@@ -20,7 +21,10 @@ router.register(r'universities', UniversityViewSet, basename="universities")
 router.register(r'faculties', FacultyViewSet, basename="faculties")
 router.register(r'majors', MajorViewSet, basename="majors")
 router.register(r'criteria', CriteriaViewSet, basename="criteria")
+router.register(r'catalog', CatalogViewSet, basename="catalog")
 router.register(r'exam_score', StudentExamScoreViewSet, basename="exam_score")
 router.register(r'score_history', ScoreHistoryViewSet, basename="score_history")
 router.register(r'velocity', VelocityViewSet, basename='velocity')
 router.register(r'estimate_history', EstimateHistoryViewset, basename='estimate_histories')
+router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'db_stats', DatabaseStatsViewSet, basename='db_stats')
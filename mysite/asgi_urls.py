@@ -0,0 +1,30 @@
+"""
+URL configuration of the ASGI mode.
+
+The hot read-only API endpoints are answered by async views, which send
+the requests they do not handle to the DRF views of mysite.urls.
+Everything else is routed by mysite.urls as usual.
+"""
+from django.urls import path, re_path
+from calculator.views.async_views import reference_data
+from manager.views.async_views import (
+    estimate_history_list,
+    event_list,
+    task_list,
+    velocity,
+)
+from mysite.async_api import async_read_view
+from .urls import urlpatterns as sync_urlpatterns
+
+
+urlpatterns = [
+    path('api/tasks/', async_read_view(task_list)),
+    path('api/events/', async_read_view(event_list)),
+    path('api/estimate_history/', async_read_view(estimate_history_list)),
+    path('api/velocity/', async_read_view(velocity)),
+    re_path(
+        r'^api/(?:universities|faculties|majors|exams|criteria)/(?:\d+/)?$',
+        async_read_view(reference_data, public=True),
+    ),
+    *sync_urlpatterns,
+]
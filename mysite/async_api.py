@@ -0,0 +1,102 @@
+"""Helpers for the async versions of the hot read-only API endpoints.
+
+When the site runs under ASGI (settings.ASYNC_API), the GET requests of the
+task, event, velocity, estimate history and reference data lists are
+answered by async views that use Django's async ORM, so a worker does not
+need a thread per request while it waits for the database or the cache.
+
+Everything else goes to the DRF view of the same URL, called in a thread:
+other methods, streamed and paginated lists, the browsable API, and requests
+without a session such as JWT or Basic auth, which only DRF understands.
+An async read can also return None to hand a request over to the DRF view,
+e.g. on a cache miss, so both always return the same responses.
+"""
+
+from typing import Awaitable, Callable
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.urls import resolve
+from rest_framework.utils.encoders import JSONEncoder
+
+SYNC_URLCONF = "mysite.urls"
+# query parameters that only the DRF views handle
+SYNC_PARAMS = {"stream", "cursor", "page_size", "format"}
+
+AsyncRead = Callable[..., Awaitable[HttpResponse | None]]
+
+
+def json_response(data, status: int = 200, headers: dict | None = None) -> JsonResponse:
+    """Render data the same way as the JSON renderer of DRF.
+
+    :param data: the serialized data.
+    :param status: the status code.
+    :param headers: extra headers.
+    :return: the response.
+    """
+    return JsonResponse(
+        data,
+        status=status,
+        headers=headers,
+        safe=False,
+        encoder=JSONEncoder,
+        json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+    )
+
+
+def wants_sync(request: HttpRequest) -> bool:
+    """Check if a request must be answered by the DRF view.
+
+    :param request: the request.
+    :return: True for requests the async views do not handle.
+    """
+    return (
+        request.method != "GET"
+        or not SYNC_PARAMS.isdisjoint(request.GET.keys())
+        or "text/html" in request.headers.get("Accept", "")
+    )
+
+
+async def call_sync_view(request: HttpRequest) -> HttpResponse:
+    """Answer a request with the DRF view of its URL in a thread.
+
+    :param request: the request.
+    :return: the rendered response of the DRF view.
+    """
+    match = resolve(request.path_info, urlconf=SYNC_URLCONF)
+
+    def view() -> HttpResponse:
+        response = match.func(request, *match.args, **match.kwargs)
+        # DRF responses are rendered lazily, render them in the thread too
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    return await sync_to_async(view)()
+
+
+def async_read_view(read: AsyncRead, public: bool = False) -> Callable:
+    """Make an async view from an async read function.
+
+    :param read: an async function of the request, the user and the URL
+        arguments that returns a response, or None to use the DRF view.
+    :param public: True if anonymous users can read it too, otherwise their
+        requests go to the DRF view, which also knows tokens.
+    :return: the view.
+    """
+
+    async def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not wants_sync(request):
+            user: AbstractBaseUser | AnonymousUser = await request.auser()
+            if public or user.is_authenticated:
+                response = await read(request, user, *args, **kwargs)
+                if response is not None:
+                    return response
+        return await call_sync_view(request)
+
+    # DRF views are exempt from these, the async views are too
+    view.csrf_exempt = True
+    view.login_required = False
+    view.__name__ = view.__qualname__ = read.__name__
+    view.__doc__ = read.__doc__
+    return view
@@ -0,0 +1,83 @@
+"""Module for the connection statistics of the databases.
+
+With DB_POOL, every process has a psycopg pool per database and its
+statistics come from the pool: the connections in use and idle, the
+requests waiting for a connection and how long they waited. Without a
+pool every thread keeps its own persistent connection, so the number of
+connections opened by the process shows if they are reused.
+
+All numbers are of the current process, like the velocity cache counters.
+"""
+
+from collections import Counter
+from threading import Lock
+from typing import Any
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_opened = Counter()
+_lock = Lock()
+
+
+def count_connection(sender, connection, **kwargs) -> None:
+    """Count a new database connection of this process."""
+    with _lock:
+        _opened[connection.alias] += 1
+
+
+connection_created.connect(count_connection)
+
+
+def pool_stats(pool) -> dict[str, Any]:
+    """Summarize the statistics of a psycopg pool.
+
+    :param pool: a psycopg_pool.ConnectionPool.
+    :return: the connections in use and idle, the waiting requests and the
+        total and mean time requests waited for a connection.
+    """
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "min_size": stats["pool_min"],
+        "max_size": stats["pool_max"],
+        "in_use": stats["pool_size"] - stats["pool_available"],
+        "idle": stats["pool_available"],
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "wait_ms": wait_ms,
+        "mean_wait_ms": wait_ms / requests if requests else 0.0,
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def database_stats() -> dict[str, dict[str, Any]]:
+    """Return the connection settings and statistics of each database."""
+    result = {}
+    for alias in connections:
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        # only the PostgreSQL backend has a pool, created on first use
+        pool = getattr(connection, "pool", None)
+        stats = {
+            "vendor": connection.vendor,
+            "pooled": pool is not None,
+            "conn_max_age": settings_dict["CONN_MAX_AGE"],
+            "health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+        }
+        if pool is not None:
+            stats.update(pool_stats(pool))
+        else:
+            with _lock:
+                stats["connections_opened"] = _opened[alias]
+        result[alias] = stats
+    return result
+
+
+def reset_stats() -> None:
+    """Forget the connection counters of this process."""
+    with _lock:
+        _opened.clear()
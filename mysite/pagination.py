@@ -0,0 +1,149 @@
+"""Opt-in keyset (cursor) pagination for the list APIs."""
+
+import base64
+import binascii
+import datetime
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def to_json(value):
+    """
+    Convert an ordering value that json cannot encode.
+
+    Dates are encoded with full precision, so a cursor compares equal to the
+    value stored in the database.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot use {type(value).__name__} in a cursor")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate a list by the values of its ordering fields instead of an offset.
+
+    Pagination is only used when the request has a cursor or page_size query
+    parameter, so clients that expect a plain list keep working.
+    A view sets cursor_ordering to the fields to order by, e.g.
+    ("end_date", "id"). The last field must be unique and all fields are
+    sorted in ascending order. Each page is fetched with a
+    WHERE (end_date, id) > (last end_date, last id) query, so the cost of a
+    page does not depend on how deep it is in the list.
+    """
+
+    ordering = ("id",)
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_requested(self, request) -> bool:
+        """Return True if the client asked for a paginated response."""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request) -> int:
+        """Get the page size from the request, bounded by max_page_size."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, values: list) -> str:
+        """Encode the ordering values of the last object in a page."""
+        data = json.dumps(values, default=to_json)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request) -> list | None:
+        """
+        Decode the cursor of the request.
+
+        :param request: The HTTP request.
+        :return: The ordering values to continue after, None on the first page.
+        :raises NotFound: If the cursor is not valid.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def after(self, values: list) -> Q:
+        """
+        Build a filter for rows that come after the given ordering values.
+
+        For ordering (a, b) this is a > va OR (a = va AND b > vb).
+        """
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            equal = {name: value for name, value in zip(self.ordering[:i], values)}
+            condition |= Q(**equal, **{f"{field}__gt": values[i]})
+        return condition
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list | None:
+        """
+        Get one page of the queryset.
+
+        :param queryset: The objects to paginate.
+        :param request: The HTTP request.
+        :param view: The view, its cursor_ordering is used if it has one.
+        :return: The objects in the page, None if pagination was not requested.
+        """
+        if not self.is_requested(request):
+            return None
+        self.ordering = tuple(getattr(view, "cursor_ordering", self.ordering))
+        self.request = request
+        page_size = self.get_page_size(request)
+        values = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            try:
+                queryset = queryset.filter(self.after(values))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        page = list(queryset[: page_size + 1])
+        self.next_values = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            last = page[-1]
+            self.next_values = [getattr(last, field) for field in self.ordering]
+        return page
+
+    def get_next_link(self) -> str | None:
+        """Get the URL of the next page, None if this is the last page."""
+        if self.next_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_values)
+        )
+
+    def get_paginated_response(self, data) -> Response:
+        """Wrap a serialized page with the link to the next page."""
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        """Describe the paginated response for schema generation."""
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -72,7 +72,11 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
-ROOT_URLCONF = 'mysite.urls'
+# The ASGI mode answers the hot read-only API endpoints with async views,
+# mysite/asgi.py turns it on.
+ASYNC_API = config('ASYNC_API', cast=bool, default=False)
+
+ROOT_URLCONF = 'mysite.asgi_urls' if ASYNC_API else 'mysite.urls'
 
 TEMPLATES = [
     {
@@ -96,6 +100,30 @@ WSGI_APPLICATION = 'mysite.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# In production, connections are kept open for DB_CONN_MAX_AGE seconds and
+# checked before reuse, so a request does not pay for a new connection.
+# DB_POOL=True uses a psycopg connection pool per process instead, which
+# needs psycopg 3 with the pool extra (pip install "psycopg[binary,pool]").
+# Under ASGI the async ORM runs in threads that Django does not clean up at
+# the end of a request, so persistent connections would pile up: they are
+# off by default there, use DB_POOL to reuse connections.
+# Queries running longer than DB_STATEMENT_TIMEOUT milliseconds are cancelled.
+DB_POOL = config('DB_POOL', cast=bool, default=False)
+
+POSTGRES_OPTIONS = {
+    'connect_timeout': config('DB_CONNECT_TIMEOUT', cast=int, default=5),
+    'options': '-c statement_timeout={}'.format(
+        config('DB_STATEMENT_TIMEOUT', cast=int, default=30000)
+    ),
+}
+
+if DB_POOL:
+    POSTGRES_OPTIONS['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', cast=int, default=2),
+        'max_size': config('DB_POOL_MAX_SIZE', cast=int, default=10),
+        'timeout': config('DB_POOL_TIMEOUT', cast=float, default=10),
+    }
+
 DATABASES = {
     'default': ({
         'ENGINE': 'django.db.backends.postgresql',
@@ -103,7 +131,14 @@ DATABASES = {
         'USER': config('DB_USERNAME', default='username'),
         'PASSWORD': config('DB_PASSWORD', default='password'),
         'HOST': config('DB_HOST', default='123.345.678.1'),
-        'PORT': config('DB_PORT', default='111111')
+        'PORT': config('DB_PORT', default='111111'),
+        # the pool keeps the connections, Django must close them after use
+        'CONN_MAX_AGE': 0 if DB_POOL else config(
+            'DB_CONN_MAX_AGE', cast=int, default=0 if ASYNC_API else 60
+        ),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', cast=bool,
+                                     default=True),
+        'OPTIONS': POSTGRES_OPTIONS,
     } if PRODUCTION else
         {
             'ENGINE': 'django.db.backends.sqlite3',
@@ -111,6 +146,39 @@ DATABASES = {
         })
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The velocity results are invalidated by versions kept in the database, so
+# every worker sees a change at once even with the local-memory cache. The
+# results can also be shared between workers by using the file-based backend
+# (django.core.cache.backends.filebased.FileBasedCache) with a directory as
+# the location, or Redis (django.core.cache.backends.redis.RedisCache).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'velocity': {
+        'BACKEND': config('VELOCITY_CACHE_BACKEND',
+                          default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('VELOCITY_CACHE_LOCATION', default='velocity'),
+        'TIMEOUT': config('VELOCITY_CACHE_TIMEOUT', cast=int, default=60 * 60 * 24),
+    },
+    # like the velocity results, the permissions of users are invalidated by
+    # versions kept in the database
+    'roles': {
+        'BACKEND': config('ROLE_CACHE_BACKEND',
+                          default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('ROLE_CACHE_LOCATION', default='roles'),
+        'TIMEOUT': config('ROLE_CACHE_TIMEOUT', cast=int, default=60),
+    },
+}
+
+# How long clients may cache reference data such as universities and exams,
+# and how often each process checks if the reference data version changed.
+REFERENCE_CACHE_MAX_AGE = config('REFERENCE_CACHE_MAX_AGE', cast=int, default=300)
+REFERENCE_VERSION_TTL = config('REFERENCE_VERSION_TTL', cast=float, default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,7 +199,7 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    'manager.roles.CachedPermissionBackend',
     'allauth.account.auth_backends.AuthenticationBackend'
 ]
 
@@ -165,8 +233,24 @@ SITE_ID = config('SITE_ID', cast=int, default=3)
 LOGIN_URL = 'manager:main_login'
 LOGOUT_REDIRECT_URL = 'manager:main_login'
 
-#  The maximum difference between the iat and server time allowed in seconds
+#  The maximum difference between the Google and server clocks allowed in
+#  seconds, used as the leeway when checking the iat and exp of id tokens
 ABSOLUTE_TOLERATED_TIME_DIFF = config('DELTA_TIME', cast=float, default=5)
+#  Google's public keys for checking id tokens, and how long they are cached
+GOOGLE_JWKS_URL = config(
+    'GOOGLE_JWKS_URL', default='https://www.googleapis.com/oauth2/v3/certs'
+)
+GOOGLE_JWKS_LIFESPAN = config('GOOGLE_JWKS_LIFESPAN', cast=int, default=60 * 60)
+GOOGLE_JWKS_TIMEOUT = config('GOOGLE_JWKS_TIMEOUT', cast=float, default=5)
+#  The URL the Google login callback exchanges the code at
+BASE_URL = config('BASE_URL', default='http://localhost:8000/')
+#  Timeouts in seconds, retries of failed connections and the number of
+#  pooled connections per host of outbound requests of the auth app
+OUTBOUND_CONNECT_TIMEOUT = config('OUTBOUND_CONNECT_TIMEOUT', cast=float, default=3.05)
+OUTBOUND_READ_TIMEOUT = config('OUTBOUND_READ_TIMEOUT', cast=float, default=10)
+OUTBOUND_RETRIES = config('OUTBOUND_RETRIES', cast=int, default=2)
+OUTBOUND_BACKOFF = config('OUTBOUND_BACKOFF', cast=float, default=0.2)
+OUTBOUND_POOL_SIZE = config('OUTBOUND_POOL_SIZE', cast=int, default=10)
 GOOGLE_CALLBACK_URI = config("CALLBACK", default="api/callmelater/")
 GOOGLE_CLIENT_ID = config("CLIENT_ID", default="bogusID.google.com")
 